@@ -3,8 +3,10 @@ import sys
 from PyQt6.QtWidgets import QApplication
 
 from app.ui.main_window import DatabaseEditorWindow
+from app.utils.profiler import start_from_env
 
 if __name__ == "__main__":
+    start_from_env()
     app = QApplication(sys.argv)
     window = DatabaseEditorWindow()
     window.show()
@@ -0,0 +1,106 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
+                             QPushButton, QCheckBox, QProgressBar, QFileDialog, QMessageBox)
+
+from app.utils.worker import Worker
+
+
+class CloneTableDialog(QDialog):
+    def __init__(self, db_controller, table_name, parent=None):
+        super().__init__(parent)
+        self.db_controller = db_controller
+        self.table_name = table_name
+        self.worker = None
+        self.setWindowTitle(f"Clone Table - {table_name}")
+        self.setMinimumWidth(450)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        grid = QGridLayout()
+        self.name_input = QLineEdit(f"{self.table_name}_copy")
+        self.target_input = QLineEdit()
+        self.target_input.setPlaceholderText("Current database")
+        self.browse_btn = QPushButton("Browse")
+        grid.addWidget(QLabel("New table name:"), 0, 0)
+        grid.addWidget(self.name_input, 0, 1, 1, 2)
+        grid.addWidget(QLabel("Target database:"), 1, 0)
+        grid.addWidget(self.target_input, 1, 1)
+        grid.addWidget(self.browse_btn, 1, 2)
+        layout.addLayout(grid)
+
+        self.schema_only_check = QCheckBox("Structure only (no rows)")
+        layout.addWidget(self.schema_only_check)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        self.clone_btn = QPushButton("Clone")
+        self.cancel_btn = QPushButton("Cancel")
+        btn_layout.addWidget(self.clone_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        layout.addLayout(btn_layout)
+
+        self.browse_btn.clicked.connect(self.browse_target)
+        self.clone_btn.clicked.connect(self.start_clone)
+        self.cancel_btn.clicked.connect(self.reject)
+
+    def browse_target(self):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "Target Database", "", "SQLite Databases (*.db *.sqlite);;All Files (*)",
+            options=QFileDialog.Option.DontConfirmOverwrite
+        )
+        if path:
+            self.target_input.setText(path)
+
+    def target_path(self):
+        return self.target_input.text().strip() or None
+
+    def start_clone(self):
+        new_name = self.name_input.text().strip()
+        if not new_name:
+            QMessageBox.warning(self, "Error", "New table name is required")
+            return
+
+        # Our own uncommitted edits must be visible to the worker connection
+        self.db_controller.commit()
+        self.clone_btn.setEnabled(False)
+        self.progress_bar.setVisible(True)
+        self.progress_bar.setRange(0, 0)
+        self.worker = Worker(self.db_controller.clone_table, self.table_name, new_name,
+                             not self.schema_only_check.isChecked(), self.target_path())
+        self.worker.signals.progress.connect(self.on_progress)
+        self.worker.signals.result.connect(self.on_result)
+        self.worker.signals.error.connect(self.on_error)
+        self.worker.start()
+
+    def on_progress(self, done, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def on_result(self, skipped):
+        self.worker = None
+        if skipped is None:
+            self.reject()
+            return
+        if skipped:
+            QMessageBox.warning(self, "Clone Table",
+                                "These triggers use the table in a way that cannot be rewritten for the copy, "
+                                "or use tables the target database lacks, and were not cloned:\n\n"
+                                + "\n".join(skipped))
+        self.accept()
+
+    def on_error(self, message):
+        self.worker = None
+        self.clone_btn.setEnabled(True)
+        self.progress_bar.setVisible(False)
+        QMessageBox.critical(self, "Clone Failed", message)
+
+    def reject(self):
+        if self.worker:
+            self.worker.cancel()
+            return  # on_result closes the dialog once the worker has rolled back
+        super().reject()
@@ -0,0 +1,140 @@
+from PyQt6.QtCore import QSettings, Qt
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QComboBox,
+                             QListWidget, QListWidgetItem, QInputDialog, QLineEdit)
+
+
+def load_column_sets(table_name):
+    return QSettings("YourCompany", "DatabaseEditor").value(f"column_sets/{table_name}", {}) or {}
+
+
+def save_column_sets(table_name, column_sets):
+    QSettings("YourCompany", "DatabaseEditor").setValue(f"column_sets/{table_name}", column_sets)
+
+
+def active_column_set(table_name):
+    """Columns of the set last applied to ``table_name``, or None to show all"""
+    name = QSettings("YourCompany", "DatabaseEditor").value(f"active_column_set/{table_name}", "")
+    return load_column_sets(table_name).get(name) if name else None
+
+
+def set_active_column_set(table_name, name):
+    QSettings("YourCompany", "DatabaseEditor").setValue(f"active_column_set/{table_name}", name or "")
+
+
+class ColumnSetDialog(QDialog):
+    """Pick the columns to show; named sets are saved per table and the applied one is remembered"""
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.table_name = model.table_name
+        self.column_sets = load_column_sets(self.table_name)
+        self.all_columns = model.db_controller.get_column_names(self.table_name)
+        self.setWindowTitle(f"Column Sets - {self.table_name}")
+        self.setMinimumSize(400, 500)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        set_row = QHBoxLayout()
+        self.set_combo = QComboBox()
+        self.set_combo.addItem("All columns", "")
+        for name in sorted(self.column_sets):
+            self.set_combo.addItem(name, name)
+        current = QSettings("YourCompany", "DatabaseEditor").value(f"active_column_set/{self.table_name}", "")
+        self.set_combo.setCurrentIndex(max(0, self.set_combo.findData(current)))
+        self.delete_btn = QPushButton("Delete Set")
+        set_row.addWidget(QLabel("Set:"))
+        set_row.addWidget(self.set_combo, 1)
+        set_row.addWidget(self.delete_btn)
+        layout.addLayout(set_row)
+
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter columns...")
+        layout.addWidget(self.filter_input)
+
+        self.column_list = QListWidget()
+        for name in self.all_columns:
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            self.column_list.addItem(item)
+        layout.addWidget(self.column_list)
+
+        check_row = QHBoxLayout()
+        self.check_all_btn = QPushButton("Check All")
+        self.check_none_btn = QPushButton("Check None")
+        check_row.addWidget(self.check_all_btn)
+        check_row.addWidget(self.check_none_btn)
+        check_row.addStretch()
+        layout.addLayout(check_row)
+
+        btn_layout = QHBoxLayout()
+        self.save_btn = QPushButton("Save As...")
+        self.apply_btn = QPushButton("Apply")
+        self.cancel_btn = QPushButton("Cancel")
+        btn_layout.addWidget(self.save_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.apply_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        layout.addLayout(btn_layout)
+
+        self.show_set()
+        self.set_combo.currentIndexChanged.connect(self.show_set)
+        self.filter_input.textChanged.connect(self.filter_columns)
+        self.check_all_btn.clicked.connect(lambda: self.check_visible(True))
+        self.check_none_btn.clicked.connect(lambda: self.check_visible(False))
+        self.delete_btn.clicked.connect(self.delete_set)
+        self.save_btn.clicked.connect(self.save_set)
+        self.apply_btn.clicked.connect(self.apply)
+        self.cancel_btn.clicked.connect(self.reject)
+
+    def items(self):
+        return [self.column_list.item(i) for i in range(self.column_list.count())]
+
+    def show_set(self):
+        name = self.set_combo.currentData()
+        columns = set(self.column_sets.get(name, self.all_columns)) if name else set(self.all_columns)
+        for item in self.items():
+            item.setCheckState(Qt.CheckState.Checked if item.text() in columns else Qt.CheckState.Unchecked)
+        self.delete_btn.setEnabled(bool(name))
+
+    def filter_columns(self, text):
+        text = text.lower()
+        for item in self.items():
+            item.setHidden(text not in item.text().lower())
+
+    def check_visible(self, checked):
+        state = Qt.CheckState.Checked if checked else Qt.CheckState.Unchecked
+        for item in self.items():
+            if not item.isHidden():
+                item.setCheckState(state)
+
+    def checked_columns(self):
+        return [item.text() for item in self.items() if item.checkState() == Qt.CheckState.Checked]
+
+    def save_set(self):
+        name, ok = QInputDialog.getText(self, "Save Column Set", "Name:", text=self.set_combo.currentData() or "")
+        if ok and name.strip():
+            name = name.strip()
+            self.column_sets[name] = self.checked_columns()
+            save_column_sets(self.table_name, self.column_sets)
+            if self.set_combo.findData(name) < 0:
+                self.set_combo.addItem(name, name)
+            self.set_combo.setCurrentIndex(self.set_combo.findData(name))
+
+    def delete_set(self):
+        name = self.set_combo.currentData()
+        if name:
+            self.column_sets.pop(name, None)
+            save_column_sets(self.table_name, self.column_sets)
+            self.set_combo.removeItem(self.set_combo.currentIndex())
+
+    def apply(self):
+        name = self.set_combo.currentData()
+        columns = self.checked_columns()
+        if name and columns != self.column_sets.get(name):
+            name = ""  # edited but not saved: apply as a one-off selection
+        set_active_column_set(self.table_name, name)
+        self.model.set_column_set(None if len(columns) == len(self.all_columns) else columns)
+        self.accept()
@@ -0,0 +1,94 @@
+import os
+
+from PyQt6.QtGui import QColor
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView)
+
+from app.utils.database.diff import sort_key
+from app.utils.worker import Worker
+
+
+class CompareDialog(QDialog):
+    COLORS = {'Inserted': QColor(200, 240, 200), 'Deleted': QColor(245, 200, 200), 'Changed': QColor(250, 235, 180)}
+
+    def __init__(self, db_controller, table_name, other_path, parent=None):
+        super().__init__(parent)
+        self.db_controller = db_controller
+        self.table_name = table_name
+        self.other_path = other_path
+        self.setWindowTitle(f"Compare {table_name} with {os.path.basename(other_path)}")
+        self.setMinimumSize(800, 500)
+        self.setup_ui()
+        self.start_compare()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        self.status_label = QLabel()
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        self.result_table = QTableWidget()
+        self.result_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.result_table)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        self.cancel_btn = QPushButton("Cancel")
+        self.close_btn = QPushButton("Close")
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.close_btn)
+        layout.addLayout(btn_layout)
+
+        self.close_btn.clicked.connect(self.accept)
+
+    def start_compare(self):
+        self.status_label.setText("Comparing...")
+        self.worker = Worker(self.db_controller.compare_table, self.table_name, self.other_path)
+        self.worker.signals.progress.connect(
+            lambda done, total: self.status_label.setText(f"Comparing... {done:,} rows hashed"))
+        self.worker.signals.result.connect(self.show_result)
+        self.worker.signals.error.connect(lambda message: self.status_label.setText(f"Compare failed: {message}"))
+        self.worker.signals.finished.connect(lambda: self.cancel_btn.setEnabled(False))
+        self.cancel_btn.clicked.connect(self.worker.cancel)
+        self.worker.start()
+
+    def show_result(self, result):
+        if result is None:
+            self.status_label.setText("Compare cancelled")
+            return
+
+        counts = result['counts']
+        summary = (f"Compared by {result['key']} against {self.other_path}\n"
+                   f"{counts['inserted']:,} inserted, {counts['deleted']:,} deleted, {counts['changed']:,} changed")
+        if result['added_columns'] or result['removed_columns']:
+            summary += (f"\nColumns added: {', '.join(result['added_columns']) or '-'}; "
+                        f"removed: {', '.join(result['removed_columns']) or '-'}")
+        shown = sum(len(result[kind]) for kind in ('inserted', 'deleted', 'changed'))
+        if shown < sum(counts.values()):
+            summary += f"\nShowing the first {shown:,} differences"
+        self.status_label.setText(summary)
+
+        rows = ([('Inserted', key, values) for key, values in result['inserted']] +
+                [('Deleted', key, values) for key, values in result['deleted']] +
+                [('Changed', key, (before, after)) for key, before, after in result['changed']])
+        rows.sort(key=lambda item: sort_key(item[1]))
+
+        columns = result['columns']
+        self.result_table.setColumnCount(len(columns) + 2)
+        self.result_table.setHorizontalHeaderLabels(["Change", result['key']] + columns)
+        self.result_table.setRowCount(len(rows))
+        for r, (kind, key, values) in enumerate(rows):
+            if kind == 'Changed':
+                before, after = values
+                cells = [str(new) if old == new else f"{old} → {new}" for old, new in zip(before, after)]
+            else:
+                cells = [str(value) for value in values]
+            for c, text in enumerate([kind, str(key)] + cells):
+                item = QTableWidgetItem(text)
+                item.setBackground(self.COLORS[kind])
+                self.result_table.setItem(r, c, item)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+
+    def done(self, result):
+        self.worker.cancel()
+        super().done(result)
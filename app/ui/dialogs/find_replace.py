@@ -0,0 +1,152 @@
+import re
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QLineEdit,
+                             QPushButton, QComboBox, QCheckBox, QMessageBox, QApplication)
+
+from app.utils.database.find_replace import FindSpec
+from app.utils.worker import Worker
+
+
+class FindReplaceDialog(QDialog):
+    def __init__(self, main_window, replace=True):
+        super().__init__(main_window)
+        self.main_window = main_window
+        self.model = main_window.model
+        self.worker = None
+        self.setWindowTitle("Find & Replace" if replace else "Find")
+        self.setMinimumWidth(450)
+        self.setup_ui(replace)
+
+    def setup_ui(self, replace):
+        layout = QVBoxLayout(self)
+
+        grid = QGridLayout()
+        self.find_input = QLineEdit()
+        self.replace_input = QLineEdit()
+        self.column_combo = QComboBox()
+        self.column_combo.addItem("All Columns")
+        self.column_combo.addItems(self.model.columns)
+        grid.addWidget(QLabel("Find:"), 0, 0)
+        grid.addWidget(self.find_input, 0, 1)
+        grid.addWidget(QLabel("Replace with:"), 1, 0)
+        grid.addWidget(self.replace_input, 1, 1)
+        grid.addWidget(QLabel("Column:"), 2, 0)
+        grid.addWidget(self.column_combo, 2, 1)
+        layout.addLayout(grid)
+
+        self.regex_check = QCheckBox("Regular expression")
+        self.case_check = QCheckBox("Match case")
+        self.filter_check = QCheckBox("Only rows matching current filter")
+        self.filter_check.setEnabled(bool(self.model.where))
+        self.filter_check.setChecked(bool(self.model.where))
+        layout.addWidget(self.regex_check)
+        layout.addWidget(self.case_check)
+        layout.addWidget(self.filter_check)
+
+        self.result_label = QLabel()
+        self.result_label.setWordWrap(True)
+        layout.addWidget(self.result_label)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        self.count_btn = QPushButton("Count Matches")
+        self.show_btn = QPushButton("Show Matches")
+        self.replace_btn = QPushButton("Replace All")
+        self.close_btn = QPushButton("Close")
+        btn_layout.addWidget(self.count_btn)
+        btn_layout.addWidget(self.show_btn)
+        btn_layout.addWidget(self.replace_btn)
+        btn_layout.addWidget(self.close_btn)
+        layout.addLayout(btn_layout)
+
+        grid.itemAtPosition(1, 0).widget().setVisible(replace)
+        self.replace_input.setVisible(replace)
+        self.replace_btn.setVisible(replace)
+
+        self.count_btn.clicked.connect(self.count_matches)
+        self.show_btn.clicked.connect(self.show_matches)
+        self.replace_btn.clicked.connect(self.replace_all)
+        self.close_btn.clicked.connect(self.reject)
+
+    def selected_columns(self):
+        if self.column_combo.currentIndex() == 0:
+            return list(self.model.columns)
+        return [self.column_combo.currentText()]
+
+    def scope(self):
+        if self.filter_check.isChecked():
+            return self.model.where, self.model.params
+        return None, ()
+
+    def build_spec(self):
+        if not self.find_input.text():
+            self.result_label.setText("Enter text to find")
+            return None
+        try:
+            return FindSpec(self.find_input.text(), self.replace_input.text(),
+                            regex=self.regex_check.isChecked(), match_case=self.case_check.isChecked())
+        except re.error as e:
+            self.result_label.setText(f"Invalid regular expression: {str(e)}")
+            return None
+
+    def count_matches(self):
+        """Dry run on a worker connection: one scan counts matches for every column"""
+        if not (spec := self.build_spec()):
+            return
+        where, params = self.scope()
+        self.result_label.setText("Counting matches...")
+        self.count_btn.setEnabled(False)
+        self.worker = Worker(self.main_window.db_controller.find_matches, self.model.table_name,
+                             self.selected_columns(), spec, where, params)
+        self.worker.signals.result.connect(self.on_counts)
+        self.worker.signals.error.connect(lambda message: self.result_label.setText(f"Count failed: {message}"))
+        self.worker.signals.finished.connect(lambda: self.count_btn.setEnabled(True))
+        self.worker.start()
+
+    def on_counts(self, counts):
+        matching = {col: n for col, n in counts.items() if n}
+        if not matching:
+            self.result_label.setText("No matches")
+            return
+        details = ', '.join(f"{col}: {n:,}" for col, n in matching.items())
+        self.result_label.setText(f"{sum(matching.values()):,} matching cells ({details})")
+
+    def show_matches(self):
+        """Filter the table view down to rows containing a match"""
+        if not (spec := self.build_spec()):
+            return
+        clauses, params = [], []
+        for column in self.selected_columns():
+            match, match_params = spec.match_sql(column)
+            clauses.append(match)
+            params.extend(match_params)
+        where = '(' + ' OR '.join(clauses) + ')'
+        scope_where, scope_params = self.scope()
+        if scope_where:
+            where = f'{where} AND ({scope_where})'
+            params.extend(scope_params)
+        self.main_window.apply_filter(where, params)
+
+    def replace_all(self):
+        if not (spec := self.build_spec()):
+            return
+        where, params = self.scope()
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            changed = self.main_window.db_controller.replace_text(
+                self.model.table_name, self.selected_columns(), spec, where, params)
+        except Exception as e:
+            QMessageBox.critical(self, "Replace Failed", str(e))
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+
+        self.model.refresh()
+        self.main_window.update_page_count()
+        self.result_label.setText(f"Replaced in {sum(changed.values()):,} cells (Undo to revert)")
+
+    def done(self, result):
+        if self.worker:
+            self.worker.cancel()
+        super().done(result)
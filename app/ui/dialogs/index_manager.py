@@ -0,0 +1,200 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox, QMessageBox,
+                             QAbstractItemView)
+
+from app.utils.worker import Worker
+
+
+def format_size(size):
+    if size is None:
+        return "n/a"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+
+class IndexManagerDialog(QDialog):
+    INDEX_HEADERS = ["Name", "Columns", "Unique", "Origin", "Size"]
+    SUGGESTION_HEADERS = ["Columns", "Uses", "Current Plan", "Plan With Index"]
+
+    def __init__(self, db_controller, table_name, parent=None):
+        super().__init__(parent)
+        self.db_controller = db_controller
+        self.table_name = table_name
+        self.indexes = []
+        self.suggestions = []
+        self.worker = None
+        self.suggest_worker = None
+        self.setWindowTitle(f"Indexes - {table_name}")
+        self.setMinimumSize(800, 500)
+        self.setup_ui()
+        self.load_indexes()
+        self.load_suggestions()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.table_size_label = QLabel()
+        layout.addWidget(self.table_size_label)
+
+        self.index_table = self.create_table(self.INDEX_HEADERS)
+        layout.addWidget(self.index_table)
+
+        create_row = QHBoxLayout()
+        self.columns_input = QLineEdit()
+        self.columns_input.setPlaceholderText("Columns, comma separated")
+        self.unique_check = QCheckBox("Unique")
+        self.create_btn = QPushButton("Create")
+        self.drop_btn = QPushButton("Drop Selected")
+        create_row.addWidget(self.columns_input)
+        create_row.addWidget(self.unique_check)
+        create_row.addWidget(self.create_btn)
+        create_row.addWidget(self.drop_btn)
+        layout.addLayout(create_row)
+
+        layout.addWidget(QLabel("Suggested from recent queries:"))
+        self.suggestion_table = self.create_table(self.SUGGESTION_HEADERS)
+        layout.addWidget(self.suggestion_table)
+
+        btn_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        self.create_suggested_btn = QPushButton("Create Suggested")
+        self.cancel_btn = QPushButton("Cancel Build")
+        self.cancel_btn.setEnabled(False)
+        self.close_btn = QPushButton("Close")
+        btn_layout.addWidget(self.status_label)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.create_suggested_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.close_btn)
+        layout.addLayout(btn_layout)
+
+        self.create_btn.clicked.connect(self.create_custom)
+        self.drop_btn.clicked.connect(self.drop_selected)
+        self.create_suggested_btn.clicked.connect(self.create_suggested)
+        self.cancel_btn.clicked.connect(self.cancel_build)
+        self.close_btn.clicked.connect(self.reject)
+
+    def create_table(self, headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        table.horizontalHeader().setStretchLastSection(True)
+        table.verticalHeader().setVisible(False)
+        table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        return table
+
+    def load_indexes(self):
+        self.indexes = self.db_controller.list_indexes(self.table_name)
+        self.table_size_label.setText(
+            f"Table data: {format_size(self.db_controller.index_size(self.table_name))}")
+        self.index_table.setRowCount(len(self.indexes))
+        for row, index in enumerate(self.indexes):
+            values = [index['name'], ", ".join(index['columns']), "Yes" if index['unique'] else "",
+                      index['origin'], format_size(index['size'])]
+            for col, value in enumerate(values):
+                self.index_table.setItem(row, col, QTableWidgetItem(value))
+
+    def load_suggestions(self):
+        self.status_label.setText("Analysing recorded queries...")
+        self.suggest_worker = Worker(self.db_controller.suggest_indexes, self.table_name)
+        self.suggest_worker.signals.result.connect(self.show_suggestions)
+        self.suggest_worker.signals.error.connect(self.status_label.setText)
+        self.suggest_worker.start()
+
+    def show_suggestions(self, suggestions):
+        self.suggestions = suggestions
+        self.status_label.setText("" if suggestions else "No suggestions for the queries seen so far")
+        self.suggestion_table.setRowCount(len(suggestions))
+        for row, suggestion in enumerate(suggestions):
+            values = [", ".join(suggestion['columns']), str(suggestion['uses']),
+                      "; ".join(suggestion['before']), "; ".join(suggestion['after'])]
+            for col, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                item.setToolTip(suggestion['sql'])
+                self.suggestion_table.setItem(row, col, item)
+
+    def selected_rows(self, table):
+        return sorted({index.row() for index in table.selectionModel().selectedRows()})
+
+    def create_custom(self):
+        columns = [col.strip() for col in self.columns_input.text().split(",") if col.strip()]
+        if not columns:
+            QMessageBox.warning(self, "Error", "Enter at least one column")
+            return
+        self.build([(columns, self.unique_check.isChecked())])
+
+    def create_suggested(self):
+        rows = self.selected_rows(self.suggestion_table) or range(len(self.suggestions))
+        self.build([(self.suggestions[row]['columns'], False) for row in rows])
+
+    def build(self, pending):
+        """Create indexes one after another on a worker connection"""
+        if self.worker or not pending:
+            return
+        # Our own uncommitted edits must not hold a write lock against the builder
+        self.db_controller.commit()
+        columns, unique = pending[0]
+        self.status_label.setText(f"Building index on {', '.join(columns)}...")
+        self.set_building(True)
+        self.worker = Worker(self.db_controller.create_index, self.table_name, columns, unique=unique)
+        self.worker.signals.result.connect(lambda name: self.on_built(name, pending[1:]))
+        self.worker.signals.error.connect(self.on_error)
+        self.worker.start()
+
+    def on_built(self, name, remaining):
+        self.worker = None
+        self.set_building(False)
+        self.load_indexes()
+        if name is None:
+            self.status_label.setText("Index build cancelled")
+            return
+        self.status_label.setText(f"Created {name}")
+        if remaining:
+            self.build(remaining)
+        else:
+            self.load_suggestions()
+
+    def on_error(self, message):
+        self.worker = None
+        self.set_building(False)
+        self.status_label.setText("")
+        QMessageBox.critical(self, "Index Build Failed", message)
+
+    def set_building(self, building):
+        self.create_btn.setEnabled(not building)
+        self.create_suggested_btn.setEnabled(not building)
+        self.drop_btn.setEnabled(not building)
+        self.cancel_btn.setEnabled(building)
+
+    def cancel_build(self):
+        if self.worker:
+            self.worker.cancel()
+
+    def drop_selected(self):
+        names = [self.indexes[row]['name'] for row in self.selected_rows(self.index_table)
+                 if self.indexes[row]['origin'] == 'c']
+        if not names:
+            QMessageBox.information(self, "Drop Index", "Select indexes created with CREATE INDEX")
+            return
+        reply = QMessageBox.question(
+            self, "Drop Index", f"Drop {', '.join(names)}?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            for name in names:
+                self.db_controller.drop_index(name)
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Drop failed: {str(e)}")
+        self.load_indexes()
+        self.load_suggestions()
+
+    def reject(self):
+        if self.worker:
+            self.worker.cancel()
+            return  # the dialog can be closed once the build has stopped
+        super().reject()
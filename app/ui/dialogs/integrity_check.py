@@ -0,0 +1,169 @@
+import json
+import os
+
+from PyQt6.QtCore import QSettings
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QCheckBox, QProgressBar,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QPlainTextEdit, QFileDialog,
+                             QAbstractItemView)
+
+from app.utils.worker import Worker
+
+
+def baseline_key(path, full):
+    return f"integrity_baseline/{'integrity_check' if full else 'quick_check'}/{os.path.abspath(path)}"
+
+
+class IntegrityCheckDialog(QDialog):
+    """Per-table integrity and foreign key checks on a worker, with an optional fast re-check"""
+    HEADERS = ["Table", "Status", "Problems", "Time (ms)"]
+
+    def __init__(self, db_controller, parent=None):
+        super().__init__(parent)
+        self.db_controller = db_controller
+        self.path = db_controller.config['path']
+        self.report = None
+        self.worker = None
+        self.setWindowTitle("Check Integrity")
+        self.setMinimumSize(700, 500)
+        self.setup_ui()
+        self.update_fast_option()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.full_check = QCheckBox("Full integrity_check (slower; also verifies index contents)")
+        self.fast_check = QCheckBox("Only re-check tables changed since the last clean check")
+        layout.addWidget(self.full_check)
+        layout.addWidget(self.fast_check)
+
+        self.progress_bar = QProgressBar()
+        layout.addWidget(self.progress_bar)
+
+        self.result_table = QTableWidget(0, len(self.HEADERS))
+        self.result_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.result_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.result_table.verticalHeader().setVisible(False)
+        self.result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.result_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        layout.addWidget(self.result_table)
+
+        self.details_text = QPlainTextEdit()
+        self.details_text.setReadOnly(True)
+        self.details_text.setMaximumHeight(140)
+        layout.addWidget(self.details_text)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        btn_layout = QHBoxLayout()
+        self.save_btn = QPushButton("Save Report...")
+        self.save_btn.setEnabled(False)
+        self.start_btn = QPushButton("Start")
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        self.close_btn = QPushButton("Close")
+        btn_layout.addWidget(self.save_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.start_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        btn_layout.addWidget(self.close_btn)
+        layout.addLayout(btn_layout)
+
+        self.full_check.toggled.connect(self.update_fast_option)
+        self.result_table.currentCellChanged.connect(lambda row, *_: self.show_details(row))
+        self.save_btn.clicked.connect(self.save_report)
+        self.start_btn.clicked.connect(self.start)
+        self.cancel_btn.clicked.connect(self.cancel)
+        self.close_btn.clicked.connect(self.reject)
+
+    def baseline(self):
+        return QSettings("YourCompany", "DatabaseEditor").value(
+            baseline_key(self.path, self.full_check.isChecked()), {}) or {}
+
+    def update_fast_option(self):
+        has_baseline = bool(self.baseline())
+        self.fast_check.setEnabled(has_baseline)
+        self.fast_check.setChecked(has_baseline)
+
+    def set_running(self, running):
+        for widget in (self.full_check, self.start_btn):
+            widget.setEnabled(not running)
+        self.fast_check.setEnabled(not running and bool(self.baseline()))
+        self.cancel_btn.setEnabled(running)
+
+    def start(self):
+        # Our own uncommitted edits are invisible to the checking connection
+        self.db_controller.commit()
+        baseline = self.baseline() if self.fast_check.isChecked() else None
+        self.status_label.setText("Checking...")
+        self.progress_bar.setValue(0)
+        self.set_running(True)
+        worker = self.worker = Worker(self.db_controller.check_integrity, self.full_check.isChecked(), baseline)
+        worker.signals.progress.connect(self.on_progress)
+        worker.signals.result.connect(lambda report: self.on_result(worker, report))
+        worker.signals.error.connect(lambda message: self.on_error(worker, message))
+        worker.start()
+
+    def cancel(self):
+        if self.worker:
+            self.worker.cancel()
+            self.worker = None
+            self.status_label.setText("Check cancelled")
+        self.set_running(False)
+
+    def on_progress(self, done, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def on_result(self, worker, report):
+        if worker is not self.worker:
+            return
+        self.worker = None
+        self.set_running(False)
+        if report is None:
+            return
+        self.report = report
+        QSettings("YourCompany", "DatabaseEditor").setValue(
+            baseline_key(self.path, report['mode'] == 'integrity_check'), report['digests'])
+        self.show_report(report)
+
+    def on_error(self, worker, message):
+        if worker is self.worker:
+            self.worker = None
+            self.set_running(False)
+            self.status_label.setText(f"Check failed: {message}")
+
+    def show_report(self, report):
+        self.result_table.setRowCount(len(report['tables']))
+        for row, result in enumerate(report['tables']):
+            cells = [result['table'], result['status'], str(len(result['problems']) + len(result['foreign_keys'])),
+                     f"{result['seconds'] * 1000:.0f}"]
+            for col, value in enumerate(cells):
+                self.result_table.setItem(row, col, QTableWidgetItem(value))
+        verdict = "No problems found" if report['ok'] else "Problems found"
+        self.status_label.setText(f"{verdict} - {report['checked']} tables checked, {report['skipped']} unchanged "
+                                  f"({report['mode']}, {report['seconds']:.1f} s)")
+        self.save_btn.setEnabled(True)
+        self.details_text.clear()
+
+    def show_details(self, row):
+        if not self.report or not 0 <= row < len(self.report['tables']):
+            return
+        result = self.report['tables'][row]
+        lines = list(result['problems'])
+        lines += [f"Row {fk['rowid']}: no matching row in {fk['parent']} (foreign key {fk['constraint']})"
+                  for fk in result['foreign_keys']]
+        if result['status'] == 'unchanged':
+            lines.append("Pages unchanged since the last clean check; not re-checked")
+        self.details_text.setPlainText('\n'.join(lines) or "ok")
+
+    def save_report(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Report", "integrity_report.json", "JSON Files (*.json)")
+        if path:
+            report = {key: value for key, value in self.report.items() if key != 'digests'}
+            with open(path, 'w') as f:
+                json.dump({'database': os.path.abspath(self.path), **report}, f, indent=2, default=str)
+
+    def done(self, result):
+        self.cancel()
+        super().done(result)
@@ -0,0 +1,203 @@
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QListWidget, QPlainTextEdit,
+                             QInputDialog, QMessageBox, QProgressBar, QAbstractItemView)
+
+from app.utils.worker import Worker
+
+COLUMN_TYPES = ["TEXT", "INTEGER", "REAL", "NUMERIC", "BLOB"]
+
+
+class SchemaEditorDialog(QDialog):
+    """Queue column changes, preview the DDL, then apply them as one migration"""
+    HEADERS = ["Column", "Type", "Not Null", "Default"]
+
+    def __init__(self, db_controller, table_name, parent=None):
+        super().__init__(parent)
+        self.db_controller = db_controller
+        self.table_name = table_name
+        self.edit = db_controller.schema_edit(table_name)
+        self.worker = None
+        self.setWindowTitle(f"Edit Schema - {table_name}")
+        self.setMinimumSize(800, 550)
+        self.setup_ui()
+        self.show_edit()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        grid = QGridLayout()
+
+        self.column_table = QTableWidget(0, len(self.HEADERS))
+        self.column_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.column_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.column_table.verticalHeader().setVisible(False)
+        self.column_table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.column_table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.column_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        grid.addWidget(self.column_table, 0, 0)
+
+        column_buttons = QVBoxLayout()
+        self.add_btn = QPushButton("Add...")
+        self.drop_btn = QPushButton("Drop")
+        self.rename_btn = QPushButton("Rename...")
+        self.retype_btn = QPushButton("Change Type...")
+        self.up_btn = QPushButton("Move Up")
+        self.down_btn = QPushButton("Move Down")
+        for btn in (self.add_btn, self.drop_btn, self.rename_btn, self.retype_btn, self.up_btn, self.down_btn):
+            column_buttons.addWidget(btn)
+        column_buttons.addStretch()
+        grid.addLayout(column_buttons, 0, 1)
+
+        grid.addWidget(QLabel("Queued changes:"), 1, 0)
+        self.operation_list = QListWidget()
+        self.operation_list.setMaximumHeight(110)
+        grid.addWidget(self.operation_list, 2, 0)
+        layout.addLayout(grid)
+
+        layout.addWidget(QLabel("SQL to run:"))
+        self.preview_text = QPlainTextEdit()
+        self.preview_text.setReadOnly(True)
+        layout.addWidget(self.preview_text)
+
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        layout.addWidget(self.progress_bar)
+
+        btn_layout = QHBoxLayout()
+        self.reset_btn = QPushButton("Reset")
+        self.apply_btn = QPushButton("Apply")
+        self.cancel_btn = QPushButton("Cancel")
+        btn_layout.addWidget(self.reset_btn)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.apply_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        layout.addLayout(btn_layout)
+
+        self.add_btn.clicked.connect(self.add_column)
+        self.drop_btn.clicked.connect(lambda: self.queue(self.edit.drop_column, self.selected_column()))
+        self.rename_btn.clicked.connect(self.rename_column)
+        self.retype_btn.clicked.connect(self.retype_column)
+        self.up_btn.clicked.connect(lambda: self.move_column(-1))
+        self.down_btn.clicked.connect(lambda: self.move_column(1))
+        self.reset_btn.clicked.connect(self.reset)
+        self.apply_btn.clicked.connect(self.apply)
+        self.cancel_btn.clicked.connect(self.reject)
+
+    def show_edit(self, select=None):
+        self.column_table.setRowCount(len(self.edit.columns))
+        for row, col in enumerate(self.edit.columns):
+            values = [col['name'], col['type'], "Yes" if col['notnull'] else "",
+                      "" if col['default'] is None else col['default']]
+            for c, value in enumerate(values):
+                self.column_table.setItem(row, c, QTableWidgetItem(value))
+            if col['name'] == select:
+                self.column_table.selectRow(row)
+        self.operation_list.clear()
+        self.operation_list.addItems(self.edit.describe())
+        try:
+            self.preview_text.setPlainText(self.edit.preview(self.db_controller.conn))
+        except Exception as e:
+            self.preview_text.setPlainText(f"-- Preview failed: {str(e)}")
+        self.apply_btn.setEnabled(bool(self.edit.operations))
+
+    def selected_column(self):
+        row = self.column_table.currentRow()
+        return self.edit.columns[row]['name'] if 0 <= row < len(self.edit.columns) else None
+
+    def queue(self, operation, *args, select=None):
+        if None in args:
+            return
+        try:
+            operation(*args)
+        except ValueError as e:
+            QMessageBox.warning(self, "Edit Schema", str(e))
+            return
+        self.show_edit(select)
+
+    def ask_type(self, current="TEXT"):
+        types = COLUMN_TYPES if current in COLUMN_TYPES else [current] + COLUMN_TYPES
+        column_type, ok = QInputDialog.getItem(self, "Column Type", "Type:", types,
+                                               types.index(current), True)
+        return column_type.strip() if ok else None
+
+    def add_column(self):
+        name, ok = QInputDialog.getText(self, "Add Column", "Column name:")
+        if not ok or not name.strip():
+            return
+        column_type = self.ask_type()
+        if column_type is None:
+            return
+        default, ok = QInputDialog.getText(self, "Add Column", "Default value (leave empty for NULL):")
+        if not ok:
+            return
+        self.queue(self.edit.add_column, name.strip(), column_type, default or None, select=name.strip())
+
+    def rename_column(self):
+        if (old_name := self.selected_column()) is None:
+            return
+        new_name, ok = QInputDialog.getText(self, "Rename Column", "New name:", text=old_name)
+        if ok and new_name.strip():
+            self.queue(self.edit.rename_column, old_name, new_name.strip(), select=new_name.strip())
+
+    def retype_column(self):
+        if (name := self.selected_column()) is None:
+            return
+        column_type = self.ask_type(self.edit.columns[self.column_table.currentRow()]['type'] or "TEXT")
+        if column_type:
+            self.queue(self.edit.retype_column, name, column_type, select=name)
+
+    def move_column(self, step):
+        if (name := self.selected_column()) is None:
+            return
+        self.queue(self.edit.move_column, name, self.column_table.currentRow() + step, select=name)
+
+    def reset(self):
+        self.edit = self.db_controller.schema_edit(self.table_name)
+        self.show_edit()
+
+    def apply(self):
+        if skipped := self.edit.skipped(self.db_controller.conn):
+            reply = QMessageBox.question(
+                self, "Edit Schema",
+                "The rebuilt table will not keep:\n\n" + "\n".join(skipped) + "\n\nApply anyway?",
+                QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                return
+        # The migration runs on its own connection, which needs our pending edits committed
+        self.db_controller.commit()
+        self.set_busy(True)
+        self.worker = Worker(self.db_controller.apply_schema_edit, self.edit)
+        self.worker.signals.progress.connect(self.on_progress)
+        self.worker.signals.result.connect(self.on_result)
+        self.worker.signals.error.connect(self.on_error)
+        self.worker.start()
+
+    def set_busy(self, busy):
+        for widget in (self.add_btn, self.drop_btn, self.rename_btn, self.retype_btn, self.up_btn,
+                       self.down_btn, self.reset_btn, self.apply_btn):
+            widget.setEnabled(not busy)
+        self.progress_bar.setVisible(busy)
+        self.progress_bar.setRange(0, 0)
+
+    def on_progress(self, done, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
+    def on_result(self, result):
+        self.worker = None
+        self.db_controller.schema_changed()
+        if result:
+            self.accept()
+        else:
+            self.set_busy(False)
+            self.reset()
+
+    def on_error(self, message):
+        self.worker = None
+        self.set_busy(False)
+        QMessageBox.critical(self, "Schema Change Failed", message)
+
+    def reject(self):
+        if self.worker:
+            self.worker.cancel()
+            return  # on_result closes or resets the dialog once the worker has rolled back
+        super().reject()
@@ -0,0 +1,198 @@
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton, QComboBox,
+                             QListWidget, QListWidgetItem, QTableWidget, QTableWidgetItem, QAbstractItemView)
+
+from app.utils.database.summary import AGGREGATES, aggregate_label, drill_down_filter
+from app.utils.worker import Worker
+
+
+class SummaryDialog(QDialog):
+    """Group-by / pivot summary of the current table and filter, computed by SQLite in the background.
+
+    Double-clicking a cell emits ``drill_down`` with the filter for the rows behind it.
+    """
+    drill_down = pyqtSignal(object, object)  # where, params
+
+    def __init__(self, db_controller, model, parent=None):
+        super().__init__(parent)
+        self.db_controller = db_controller
+        self.table_name = model.table_name
+        self.where = model.where
+        self.params = model.params
+        self.columns = db_controller.get_column_names(self.table_name)
+        self.aggregates = [('count', None)]
+        self.summary = None
+        self.query = None
+        self.worker = None
+        self.setWindowTitle(f"Summary - {self.table_name}")
+        self.setMinimumSize(850, 600)
+        self.setup_ui()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+        if self.where:
+            layout.addWidget(QLabel("Summarising rows matching the current search"))
+
+        grid = QGridLayout()
+        grid.addWidget(QLabel("Group by:"), 0, 0)
+        self.group_list = QListWidget()
+        self.group_list.setMaximumHeight(140)
+        for name in self.columns:
+            item = QListWidgetItem(name)
+            item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            item.setCheckState(Qt.CheckState.Unchecked)
+            self.group_list.addItem(item)
+        grid.addWidget(self.group_list, 1, 0)
+
+        grid.addWidget(QLabel("Aggregates:"), 0, 1)
+        self.aggregate_list = QListWidget()
+        self.aggregate_list.setMaximumHeight(140)
+        grid.addWidget(self.aggregate_list, 1, 1)
+
+        aggregate_row = QHBoxLayout()
+        self.func_combo = QComboBox()
+        self.func_combo.addItems(list(AGGREGATES))
+        self.column_combo = QComboBox()
+        self.column_combo.addItem("*", None)
+        for name in self.columns:
+            self.column_combo.addItem(name, name)
+        self.add_aggregate_btn = QPushButton("Add")
+        self.remove_aggregate_btn = QPushButton("Remove")
+        aggregate_row.addWidget(self.func_combo)
+        aggregate_row.addWidget(self.column_combo, 1)
+        aggregate_row.addWidget(self.add_aggregate_btn)
+        aggregate_row.addWidget(self.remove_aggregate_btn)
+        grid.addLayout(aggregate_row, 2, 1)
+
+        pivot_row = QHBoxLayout()
+        self.pivot_combo = QComboBox()
+        self.pivot_combo.addItem("(no pivot)", None)
+        for name in self.columns:
+            self.pivot_combo.addItem(name, name)
+        pivot_row.addWidget(QLabel("Pivot on:"))
+        pivot_row.addWidget(self.pivot_combo, 1)
+        grid.addLayout(pivot_row, 2, 0)
+        layout.addLayout(grid)
+
+        btn_layout = QHBoxLayout()
+        self.status_label = QLabel()
+        self.run_btn = QPushButton("Run")
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setEnabled(False)
+        btn_layout.addWidget(self.status_label, 1)
+        btn_layout.addWidget(self.run_btn)
+        btn_layout.addWidget(self.cancel_btn)
+        layout.addLayout(btn_layout)
+
+        self.result_table = QTableWidget()
+        self.result_table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.result_table.verticalHeader().setVisible(False)
+        layout.addWidget(self.result_table)
+
+        self.show_aggregates()
+        self.add_aggregate_btn.clicked.connect(self.add_aggregate)
+        self.remove_aggregate_btn.clicked.connect(self.remove_aggregate)
+        self.run_btn.clicked.connect(self.run)
+        self.cancel_btn.clicked.connect(self.cancel)
+        self.result_table.cellDoubleClicked.connect(self.on_cell_double_clicked)
+
+    def show_aggregates(self):
+        self.aggregate_list.clear()
+        self.aggregate_list.addItems([aggregate_label(func, column) for func, column in self.aggregates])
+
+    def add_aggregate(self):
+        func, column = self.func_combo.currentText(), self.column_combo.currentData()
+        if column is None and func != 'count':
+            self.status_label.setText(f"{func} needs a column")
+            return
+        if (func, column) not in self.aggregates:
+            self.aggregates.append((func, column))
+            self.show_aggregates()
+
+    def remove_aggregate(self):
+        row = self.aggregate_list.currentRow()
+        if 0 <= row < len(self.aggregates):
+            del self.aggregates[row]
+            self.show_aggregates()
+
+    def group_by(self):
+        return [self.group_list.item(i).text() for i in range(self.group_list.count())
+                if self.group_list.item(i).checkState() == Qt.CheckState.Checked]
+
+    def run(self):
+        """Show a cached result if the data is unchanged, otherwise compute it on a worker"""
+        self.cancel()
+        if not self.aggregates:
+            self.status_label.setText("Add at least one aggregate")
+            return
+        query = (self.table_name, self.group_by(), list(self.aggregates), self.where, self.params,
+                 self.pivot_combo.currentData())
+        cached = self.db_controller.cached_summary(*query)
+        if cached is not None:
+            self.show_summary(query, cached, "cached")
+            return
+
+        self.status_label.setText("Summarising...")
+        self.set_running(True)
+        worker = self.worker = Worker(self.db_controller.summarize, query[0], self.db_controller.change_token(),
+                                      *query[1:])
+        worker.signals.result.connect(lambda summary: self.on_result(worker, query, summary))
+        worker.signals.error.connect(lambda message: self.on_error(worker, message))
+        worker.start()
+
+    def set_running(self, running):
+        self.run_btn.setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+
+    def cancel(self):
+        if self.worker:
+            self.worker.cancel()
+            self.worker = None
+            self.status_label.setText("Summary cancelled")
+        self.set_running(False)
+
+    def on_result(self, worker, query, summary):
+        if worker is self.worker:
+            self.worker = None
+            self.set_running(False)
+            if summary is not None:
+                self.show_summary(query, summary)
+
+    def on_error(self, worker, message):
+        if worker is self.worker:
+            self.worker = None
+            self.set_running(False)
+            self.status_label.setText(f"Summary failed: {message}")
+
+    def show_summary(self, query, summary, note=""):
+        self.query = query
+        self.summary = summary
+        self.result_table.clear()
+        self.result_table.setColumnCount(len(summary['headers']))
+        self.result_table.setRowCount(len(summary['rows']))
+        self.result_table.setHorizontalHeaderLabels(summary['headers'])
+        for r, row in enumerate(summary['rows']):
+            for c, value in enumerate(row):
+                self.result_table.setItem(r, c, QTableWidgetItem("" if value is None else str(value)))
+        text = f"{len(summary['rows']):,} groups"
+        if summary['truncated']:
+            text += " (truncated)"
+        if note:
+            text += f" - {note}"
+        self.status_label.setText(text + " - double-click a cell to see its rows")
+
+    def on_cell_double_clicked(self, row, col):
+        if not self.summary:
+            return
+        _, group_by, _, where, params, pivot = self.query
+        key = self.summary['rows'][row][:len(group_by)]
+        pivot_value = None
+        if pivot and col >= len(group_by):
+            pivot_value = self.summary['pivot_values'][(col - len(group_by)) % len(self.summary['pivot_values'])]
+        else:
+            pivot = None
+        self.drill_down.emit(*drill_down_filter(group_by, key, where, params, pivot, pivot_value))
+
+    def done(self, result):
+        self.cancel()
+        super().done(result)
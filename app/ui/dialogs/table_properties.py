@@ -0,0 +1,135 @@
+from functools import partial
+
+from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
+                             QTableWidget, QTableWidgetItem, QHeaderView, QCheckBox,
+                             QDoubleSpinBox)
+
+from app.utils.worker import Worker
+
+
+class TablePropertiesDialog(QDialog):
+    HEADERS = ["Column", "Type", "Null %", "Min", "Max", "Distinct (~)", "Quartiles (~)", "Top Values (~)"]
+
+    def __init__(self, db_controller, table_name, parent=None):
+        super().__init__(parent)
+        self.db_controller = db_controller
+        self.table_name = table_name
+        self.schema = db_controller.get_schema(table_name)
+        self.worker = None
+        self.generation = 0  # bumped per run, so signals from a replaced worker are ignored
+        self.setWindowTitle(f"Table Properties - {table_name}")
+        self.setMinimumSize(800, 400)
+        self.setup_ui()
+        self.load_profiles()
+
+    def setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.summary_label = QLabel()
+        self.show_summary(*self.db_controller.row_count(self.table_name))
+        layout.addWidget(self.summary_label)
+
+        options_row = QHBoxLayout()
+        self.sample_check = QCheckBox("Sample")
+        self.sample_percent = QDoubleSpinBox()
+        self.sample_percent.setRange(0.1, 100.0)
+        self.sample_percent.setValue(1.0)
+        self.sample_percent.setSuffix(" %")
+        self.refresh_btn = QPushButton("Recompute")
+        self.cancel_btn = QPushButton("Cancel")
+        options_row.addWidget(self.sample_check)
+        options_row.addWidget(self.sample_percent)
+        options_row.addStretch()
+        options_row.addWidget(self.refresh_btn)
+        options_row.addWidget(self.cancel_btn)
+        layout.addLayout(options_row)
+
+        self.profile_table = QTableWidget(len(self.schema), len(self.HEADERS))
+        self.profile_table.setHorizontalHeaderLabels(self.HEADERS)
+        self.profile_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.profile_table.verticalHeader().setVisible(False)
+        for row, col in enumerate(self.schema):
+            self.profile_table.setItem(row, 0, QTableWidgetItem(col['name']))
+            self.profile_table.setItem(row, 1, QTableWidgetItem(col['type']))
+        layout.addWidget(self.profile_table)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        self.refresh_btn.clicked.connect(self.load_profiles)
+        self.cancel_btn.clicked.connect(self.cancel_profiling)
+
+    def show_summary(self, rows, exact):
+        self.summary_label.setText(
+            f"Name: {self.table_name}    Columns: {len(self.schema)}    "
+            f"Rows: {'...' if rows is None else ('' if exact else '~') + f'{rows:,}'}")
+
+    def sample_fraction(self):
+        if self.sample_check.isChecked():
+            return self.sample_percent.value() / 100.0
+        return None
+
+    def load_profiles(self):
+        """Show cached statistics if the table is unchanged, otherwise profile it in the background"""
+        self.cancel_profiling()
+        self.generation += 1
+        sample_fraction = self.sample_fraction()
+        cached = self.db_controller.cached_column_profiles(self.table_name, sample_fraction)
+        if cached is not None:
+            self.show_profiles(cached)
+            return
+
+        self.status_label.setText("Profiling columns...")
+        self.refresh_btn.setEnabled(False)
+        self.worker = Worker(self.db_controller.profile_columns, self.table_name,
+                             self.db_controller.change_token(), sample_fraction)
+        self.worker.signals.progress.connect(partial(self.on_progress, self.generation))
+        self.worker.signals.result.connect(partial(self.on_result, self.generation))
+        self.worker.signals.error.connect(partial(self.on_error, self.generation))
+        self.worker.signals.finished.connect(partial(self.on_finished, self.generation))
+        self.worker.start()
+
+    def cancel_profiling(self):
+        if self.worker:
+            self.worker.cancel()
+            self.worker = None
+
+    def on_progress(self, generation, done, total):
+        if generation == self.generation:
+            self.status_label.setText(f"Profiling columns... {done:,} rows read")
+
+    def on_result(self, generation, profiles):
+        if generation != self.generation:
+            return
+        if profiles is None:
+            self.status_label.setText("Profiling cancelled")
+            return
+        self.show_profiles(profiles)
+
+    def on_error(self, generation, message):
+        if generation == self.generation:
+            self.status_label.setText(f"Profiling failed: {message}")
+
+    def on_finished(self, generation):
+        if generation == self.generation:
+            self.refresh_btn.setEnabled(True)
+
+    def show_profiles(self, profiles):
+        for row, profile in enumerate(profiles):
+            quartiles = ', '.join(str(v) for v in profile['quantiles'].values())
+            top = ', '.join(f"{value} ({count})" for value, count in profile['top'][:5])
+            cells = [f"{profile['null_ratio'] * 100:.1f}", profile['min'], profile['max'],
+                     f"{profile['distinct']:,}", quartiles, top]
+            for offset, value in enumerate(cells, start=2):
+                self.profile_table.setItem(row, offset, QTableWidgetItem("" if value is None else str(value)))
+
+        rows = profiles[0]['rows'] if profiles else 0
+        if self.sample_fraction():
+            self.status_label.setText(f"Rows sampled: {rows:,}")
+        else:
+            self.show_summary(rows, True)
+            self.status_label.setText("")
+
+    def done(self, result):
+        self.cancel_profiling()
+        super().done(result)
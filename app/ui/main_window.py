@@ -1,17 +1,22 @@
 import logging
 import os.path
 
-from PyQt6.QtCore import QSettings, Qt
+from PyQt6.QtCore import QSettings, Qt, QTimer
 from PyQt6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget,
                              QTableWidget, QLabel, QPushButton, QHeaderView, QSpinBox,
-                             QMessageBox, QDialog, QTableView, QLineEdit, QSizePolicy, QComboBox)
+                             QMessageBox, QDialog, QTableView, QLineEdit, QSizePolicy, QComboBox, QTabBar)
 
+from app.ui.dialogs.column_sets import active_column_set
 from app.ui.dialogs.intial_setup import NewDatabaseDialog
 from app.ui.toolbar import DatabaseToolBar
 from app.ui.menu_bar import MenuBar
 from app.ui.table_model import TableModel
 from app.utils.auto_save import AutoSave
+from app.utils.change_watcher import ChangeWatcher
 from app.utils.database.controller import DatabaseController
+from app.utils.database.find_replace import build_search_filter
+from app.utils.profiler import timed
+from app.utils.worker import Worker
 
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
@@ -21,6 +26,13 @@ class DatabaseEditorWindow(QMainWindow):
     def __init__(self):
         super().__init__()
         self.db_controller = None
+        self.count_worker = None
+        self.sample_worker = None
+        self.transfer_worker = None
+        self.tab_models = {}  # table name -> TableModel of its tab
+        self.change_watcher = None
+        self.column_widths = {}
+        self.applying_widths = False
         # self.current_table = None
         self.setup_ui()
         self.check_first_run()
@@ -98,12 +110,25 @@ class DatabaseEditorWindow(QMainWindow):
         util_layout = QHBoxLayout()
         util_layout.setSpacing(5)
 
+        # === Table Tabs ===
+        # One view shared by every tab; each tab has its own TableModel in tab_models
+        table_layout = QVBoxLayout()
+        table_layout.setSpacing(0)
+        self.tab_bar = QTabBar()
+        self.tab_bar.setTabsClosable(True)
+        self.tab_bar.setMovable(True)
+        self.tab_bar.setExpanding(False)
+        self.tab_bar.setDocumentMode(True)
+        table_layout.addWidget(self.tab_bar)
+
         # === Main Table View ===
         self.table = QTableView()
-        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        # Fixed, cached widths: Stretch/ResizeToContents lay out every column of a wide table
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
         self.table.verticalHeader().setVisible(False)
         self.table.setEditTriggers(QTableWidget.EditTrigger.DoubleClicked)
-        main_layout.addWidget(self.table)
+        table_layout.addWidget(self.table)
+        main_layout.addLayout(table_layout)
 
         # === Pagination ===
         pagination_layout = QHBoxLayout()
@@ -111,6 +136,8 @@ class DatabaseEditorWindow(QMainWindow):
 
         self.prev_page_btn = QPushButton("Previous")
         self.next_page_btn = QPushButton("Next")
+        self.full_view_btn = QPushButton("Show All Rows")
+        self.full_view_btn.setVisible(False)
         self.page_number = QSpinBox()
         self.page_number.setMinimum(1)
         self.page_size = QSpinBox()
@@ -127,6 +154,7 @@ class DatabaseEditorWindow(QMainWindow):
         self.total_pages_label = QLabel("1")
         pagination_layout.addWidget(self.total_pages_label)
         pagination_layout.addStretch(1)
+        pagination_layout.addWidget(self.full_view_btn)
         pagination_layout.addWidget(QLabel("Page Size:"))
         pagination_layout.addWidget(self.page_size)
         pagination_layout.addWidget(self.prev_page_btn)
@@ -135,6 +163,26 @@ class DatabaseEditorWindow(QMainWindow):
 
         self.statusBar().showMessage("Ready")
 
+        # Columns are fetched for the horizontally visible window, shortly after scrolling settles
+        self.column_timer = QTimer(self)
+        self.column_timer.setSingleShot(True)
+        self.column_timer.setInterval(30)
+        self.column_timer.timeout.connect(self.fetch_visible_columns)
+        # Wrapped so the signal's int is not taken as a new timer interval by start(msec)
+        self.table.horizontalScrollBar().valueChanged.connect(lambda _: self.column_timer.start())
+        self.table.horizontalScrollBar().rangeChanged.connect(lambda *_: self.column_timer.start())
+        self.table.horizontalHeader().sectionResized.connect(self.on_section_resized)
+
+        self.tab_bar.currentChanged.connect(self.switch_tab)
+        self.tab_bar.tabCloseRequested.connect(self.close_tab)
+        self.table_combo.activated.connect(lambda index: self.load_table(self.table_combo.itemText(index)))
+        self.search_box.returnPressed.connect(self.apply_search)
+        self.page_number.valueChanged.connect(self.go_to_page)
+        self.page_size.valueChanged.connect(self.change_page_size)
+        self.prev_page_btn.clicked.connect(lambda: self.page_number.setValue(self.page_number.value() - 1))
+        self.next_page_btn.clicked.connect(lambda: self.page_number.setValue(self.page_number.value() + 1))
+        self.full_view_btn.clicked.connect(self.show_full_view)
+
         # === Connect Signals ===
         '''self.new_open_db_btn.clicked.connect(self.show_setup_dialog)
         self.close_db_btn.clicked.connect(self.close_database)
@@ -148,6 +196,17 @@ class DatabaseEditorWindow(QMainWindow):
         '''
 
 
+    @property
+    def model(self):
+        return self.table.model()
+
+    def current_table(self):
+        return self.table_combo.currentText() if self.db_controller else None
+
+    def show_error(self, message):
+        logger.error(message)
+        QMessageBox.critical(self, "Error", message)
+
     def setup_auto_save(self):
         self.auto_save = AutoSave(self.db_controller)
 
@@ -165,39 +224,112 @@ class DatabaseEditorWindow(QMainWindow):
     def show_setup_dialog(self):
         dlg = NewDatabaseDialog(mode="both")
         if dlg.exec() == QDialog.DialogCode.Accepted:
-            config = dlg.get_config()
+            config = self.connection_config(dlg.get_config())
             logger.debug(f"Database configuration: {config}")
             try:
                 self.db_controller = DatabaseController(config)
                 if config['is_new'] and config['table_name']:
                     self.db_controller.create_table(config['table_name'], config['columns'], config['initial_rows'])
-                self.db_connected_label.setText(f"{os.path.basename(config['path'])}")
-                self.load_tables()
+                self.update_ui_state()
             except Exception as e:
                 logger.error(f"Setup Error: {str(e)}")
                 QMessageBox.critical(self, "Setup Error", f"Failed to setup database: {str(e)}")
 
+    @staticmethod
+    def connection_config(config):
+        """``config`` plus the saved connection profile and cache budgets; used for every database opened"""
+        settings = QSettings("YourCompany", "DatabaseEditor")
+        return {
+            **config,
+            'profile': settings.value("connection_profile", "auto"),
+            'query_cache_mb': 64 if settings.value("query_cache", True, type=bool) else 0,
+            'row_cache_mb': settings.value("row_cache_mb", 64, type=int),
+        }
+
+    def update_ui_state(self):
+        """Show a newly opened database; tabs of the previous one are closed"""
+        self.close_all_tabs()
+        self.db_connected_label.setText(f"{os.path.basename(self.db_controller.config['path'])}")
+        self.load_tables()
+        self.start_change_watcher()
+
+    def start_change_watcher(self):
+        if self.change_watcher:
+            self.change_watcher.stop()
+            self.change_watcher = None
+        if self.db_controller and QSettings("YourCompany", "DatabaseEditor").value("watch_changes", True, type=bool):
+            self.change_watcher = ChangeWatcher(self.db_controller)
+            self.change_watcher.changed.connect(self.on_external_change)
+            self.change_watcher.start()
+
+    def on_external_change(self, schema_changed):
+        """Another connection committed: refresh what is on screen, keeping scroll and selection"""
+        if not self.model:
+            return
+        try:
+            if schema_changed:
+                self.reload_table_list()
+                return
+            first = max(self.table.rowAt(0), 0)
+            last = self.table.rowAt(self.table.viewport().height() - 1)
+            if last < 0:
+                last = self.model.rowCount() - 1
+            self.model.refresh_rows(first, last)
+            self.update_page_count()
+        except Exception as e:
+            logger.error(f"Failed to refresh after external change: {str(e)}")
+
+    def reload_table_list(self):
+        """Pick up tables created or dropped elsewhere, closing the tabs of tables that are gone"""
+        tables = self.db_controller.get_tables()
+        self.table_combo.clear()
+        self.table_combo.addItems(tables)
+        for index in reversed(range(self.tab_bar.count())):
+            if self.tab_bar.tabData(index) not in tables:
+                self.close_tab(index)
+        if self.model:
+            self.table_combo.setCurrentText(self.model.table_name)
+            self.model.refresh()
+            self.update_page_count()
+        elif tables:
+            self.load_table(tables[0])
+
     def load_tables(self):
         try:
             if self.db_controller:
-                tables = self.db_controller.get_tables()
-
-                self.table_combo.clear()
-                self.table_combo.addItems(tables)
-                if tables:
-                    self.load_table(tables[0])
+                self.reload_table_list()
         except Exception as e:
             logger.error(f"Error loading tables: {str(e)}")
             QMessageBox.warning(self, "Load Error", f"Failed to load tables: {str(e)}")
 
+    def tab_index(self, table_name):
+        for index in range(self.tab_bar.count()):
+            if self.tab_bar.tabData(index) == table_name:
+                return index
+        return -1
+
+    @timed
     def load_table(self, table_name):
+        """Show ``table_name`` in its tab, opening one if needed; an open tab is re-read"""
         try:
             if not table_name:
                 return
 
-            # self.current_table = table_name
-            self.table_model = TableModel(self.db_controller, table_name)
-            self.table.setModel(self.table_model)
+            index = self.tab_index(table_name)
+            if index < 0:
+                model = TableModel(self.db_controller, table_name, self.page_size.value(),
+                                   active_column_set(table_name))
+                model.modelReset.connect(self.on_model_reset)
+                # Not announced until the tab is set up; the first tab becomes current on its own
+                self.tab_bar.blockSignals(True)
+                self.tab_models[table_name] = model
+                index = self.tab_bar.addTab(table_name)
+                self.tab_bar.setTabData(index, table_name)
+                self.tab_bar.blockSignals(False)
+            if index == self.tab_bar.currentIndex():
+                self.switch_tab(index)
+            else:
+                self.tab_bar.setCurrentIndex(index)
 
             # Display a success message in the status bar
             self.statusBar().showMessage(f"Loaded table: {table_name}", 3000)
@@ -207,3 +339,239 @@ class DatabaseEditorWindow(QMainWindow):
             logger.error(f"Failed to load table {table_name}: {str(e)}")
             QMessageBox.critical(self, "Load Error", f"Failed to load table {table_name}: {str(e)}")
 
+    @timed
+    def switch_tab(self, index):
+        """Put tab ``index``'s model on the shared view; the tab left behind releases its rows.
+
+        Rows come back from the controller's shared row cache, so switching
+        back is instant while only the visible tab holds a page of its own.
+        """
+        previous = self.model
+        model = self.tab_models.get(self.tab_bar.tabData(index)) if index >= 0 else None
+        if model is previous:
+            if model:
+                model.refresh()
+                self.set_sample_mode()
+                self.update_page_count()
+            return
+
+        if previous is not None:
+            self.save_view_state(previous)
+            self.save_column_widths()
+        selection = self.table.selectionModel()
+        self.table.setModel(model)
+        if selection:
+            selection.deleteLater()
+        if previous is not None:
+            previous.release()
+        if model is None:
+            self.total_pages_label.setText("1")
+            self.set_sample_mode()
+            return
+
+        self.table_combo.setCurrentText(model.table_name)
+        self.column_widths = QSettings("YourCompany", "DatabaseEditor").value(
+            f"column_widths/{model.table_name}", {}) or {}
+        model.load_data()
+        self.restore_view_state(model)
+        self.set_sample_mode()
+        self.update_page_count()
+
+    def save_view_state(self, model):
+        current = self.table.currentIndex()
+        model.view_state = {
+            'scroll': (self.table.verticalScrollBar().value(), self.table.horizontalScrollBar().value()),
+            'current': (current.row(), current.column()) if current.isValid() else None,
+            'search': self.search_box.text(),
+        }
+
+    def restore_view_state(self, model):
+        """Put back the page controls, search text, selection and scroll position of a tab"""
+        state = model.view_state or {}
+        self.search_box.setText(state.get('search', ''))
+        self.page_number.blockSignals(True)
+        self.page_number.setMaximum(max(self.page_number.maximum(), model.page + 1))
+        self.page_number.setValue(model.page + 1)
+        self.page_number.blockSignals(False)
+        self.page_size.blockSignals(True)
+        self.page_size.setValue(model.page_size)
+        self.page_size.blockSignals(False)
+        current = state.get('current')
+        if current and current[0] < model.rowCount() and current[1] < model.columnCount():
+            self.table.setCurrentIndex(model.index(*current))
+        if state.get('scroll'):
+            # Scroll ranges are only updated once the view has laid out the new rows
+            QTimer.singleShot(0, lambda: self.restore_scroll(model, state['scroll']))
+
+    def restore_scroll(self, model, scroll):
+        if self.model is model:
+            self.table.verticalScrollBar().setValue(scroll[0])
+            self.table.horizontalScrollBar().setValue(scroll[1])
+
+    def close_tab(self, index):
+        model = self.tab_models.get(self.tab_bar.tabData(index))
+        if model is self.model:
+            self.save_column_widths()
+        # Closing the current tab switches to a neighbour, or to no model after the last one
+        self.tab_bar.removeTab(index)
+        self.tab_models.pop(model.table_name, None)
+
+    def close_all_tabs(self):
+        self.tab_bar.blockSignals(True)
+        while self.tab_bar.count():
+            self.tab_bar.removeTab(0)
+        self.tab_bar.blockSignals(False)
+        self.switch_tab(-1)
+        self.tab_models.clear()
+
+    def on_model_reset(self):
+        # Background tabs reset too when they release their rows
+        if self.sender() is self.model:
+            self.apply_column_widths()
+
+    COLUMN_MARGIN = 8
+
+    def fetch_visible_columns(self):
+        """Load the horizontally visible columns of the page, plus a margin either side"""
+        if not self.model or not self.model.columnCount():
+            return
+        header = self.table.horizontalHeader()
+        first = max(header.logicalIndexAt(0), 0)
+        last = header.logicalIndexAt(self.table.viewport().width() - 1)
+        if last < 0:
+            last = self.model.columnCount() - 1
+        self.model.ensure_columns(first - self.COLUMN_MARGIN, last + self.COLUMN_MARGIN)
+
+    def default_column_width(self, name):
+        return min(250, max(80, self.table.fontMetrics().horizontalAdvance(name) + 24))
+
+    def apply_column_widths(self):
+        """Size columns from the width cache without measuring any cell contents"""
+        header = self.table.horizontalHeader()
+        self.applying_widths = True
+        try:
+            for col, name in enumerate(self.model.columns):
+                width = self.column_widths.get(name) or self.default_column_width(name)
+                if header.sectionSize(col) != int(width):
+                    header.resizeSection(col, int(width))
+        finally:
+            self.applying_widths = False
+        self.column_timer.start()
+
+    def on_section_resized(self, col, old_size, new_size):
+        if not self.applying_widths and self.model and col < len(self.model.columns):
+            self.column_widths[self.model.columns[col]] = new_size
+
+    def save_column_widths(self):
+        if self.model and self.column_widths:
+            QSettings("YourCompany", "DatabaseEditor").setValue(
+                f"column_widths/{self.model.table_name}", self.column_widths)
+
+    def closeEvent(self, event):
+        self.save_column_widths()
+        super().closeEvent(event)
+
+    def apply_search(self):
+        if self.model:
+            self.apply_filter(*build_search_filter(self.model.columns, self.search_box.text().strip()))
+
+    def apply_filter(self, where=None, params=()):
+        self.page_number.blockSignals(True)
+        self.page_number.setValue(1)
+        self.page_number.blockSignals(False)
+        self.model.set_filter(where, params)
+        self.set_sample_mode()
+        self.update_page_count()
+
+    def show_sample(self, size, column=None):
+        """Replace the page with a random sample; stratified by ``column`` on a worker if given"""
+        if not self.model:
+            return
+        if self.model.read_only:
+            self.statusBar().showMessage("Sampling picks rows by rowid; WITHOUT ROWID tables have none", 5000)
+            return
+        if self.sample_worker:
+            self.sample_worker.cancel()
+            self.sample_worker = None
+        table = self.model.table_name
+        if not column:
+            self.model.set_sample(self.db_controller.sample_rowids(table, size))
+            self.set_sample_mode(f"Random sample of {self.model.rowCount():,} rows")
+            return
+        self.statusBar().showMessage(f"Sampling {table} by {column}...")
+        self.sample_worker = Worker(self.db_controller.stratified_sample, table, column, size)
+        self.sample_worker.signals.result.connect(
+            lambda strata, key=(table, column): self.on_stratified_sample(key, strata))
+        self.sample_worker.signals.error.connect(self.show_error)
+        self.sample_worker.start()
+
+    def on_stratified_sample(self, key, strata):
+        self.sample_worker = None
+        if strata is None or not self.model or self.model.table_name != key[0]:
+            return
+        self.model.set_sample([rowid for _, rowids in strata for rowid in rowids])
+        self.set_sample_mode(f"Sample of {self.model.rowCount():,} rows across {len(strata)} values of {key[1]}")
+
+    def set_sample_mode(self, message=None):
+        """Swap the page controls for the "Show All Rows" button while a sample is shown"""
+        sampling = bool(self.model and self.model.sample is not None)
+        for widget in (self.page_number, self.prev_page_btn, self.next_page_btn):
+            widget.setEnabled(not sampling)
+        self.full_view_btn.setVisible(sampling)
+        if sampling:
+            self.total_pages_label.setText("sample")
+            self.statusBar().showMessage(message or "Sample")
+
+    def show_full_view(self):
+        if self.model:
+            self.page_number.blockSignals(True)
+            self.page_number.setValue(1)
+            self.page_number.blockSignals(False)
+            self.model.set_page(0)
+            self.set_sample_mode()
+            self.update_page_count()
+
+    def go_to_page(self, page):
+        if self.model:
+            self.model.set_page(page - 1)
+
+    def change_page_size(self, page_size):
+        if self.model:
+            first_row = self.model.page * self.model.page_size
+            self.model.set_page(first_row // page_size, page_size)
+            self.page_number.blockSignals(True)
+            self.page_number.setMaximum(max(self.page_number.maximum(), self.model.page + 1))
+            self.page_number.setValue(self.model.page + 1)
+            self.page_number.blockSignals(False)
+            self.set_sample_mode()
+            self.update_page_count()
+
+    def update_page_count(self):
+        """Show an instant estimate, then replace it with an exact count from a worker"""
+        if not self.model or self.model.sample is not None:
+            return
+        table, where, params = self.model.table_name, self.model.where, self.model.params
+        count, exact = self.db_controller.row_count(table, where, params)
+        self.show_page_count(count, exact)
+        if not exact:
+            if self.count_worker:
+                self.count_worker.cancel()
+            self.count_worker = Worker(self.db_controller.count_rows, table, self.db_controller.change_token(),
+                                       where, params)
+            self.count_worker.signals.result.connect(
+                lambda n, key=(table, where, params): self.on_exact_count(key, n))
+            self.count_worker.start()
+
+    def on_exact_count(self, key, count):
+        if self.model and self.model.sample is None and \
+                (self.model.table_name, self.model.where, self.model.params) == key:
+            self.show_page_count(count, True)
+
+    def show_page_count(self, count, exact):
+        if count is None:
+            self.total_pages_label.setText("...")
+            return
+        total_pages = max(1, -(-count // self.page_size.value()))
+        self.total_pages_label.setText(f"{total_pages:,}" if exact else f"~{total_pages:,}")
+        self.page_number.setMaximum(total_pages)
+        self.statusBar().showMessage(f"{'' if exact else '~'}{count:,} rows", 3000)
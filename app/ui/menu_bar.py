@@ -1,11 +1,24 @@
-from PyQt6.QtGui import QAction
+from functools import partial
+
+from PyQt6.QtCore import QSettings
+from PyQt6.QtGui import QAction, QActionGroup, QKeySequence
 from PyQt6.QtWidgets import QMenuBar
 
+from app.utils.toolbar_functions import (find_text, replace_text, copy_cells, paste_cells, fill_down,
+                                         set_selected_cells, delete_record, delete_matching, add_row,
+                                         add_rows, duplicate_rows, set_connection_profile,
+                                         toggle_query_cache, query_cache_stats, toggle_change_watch,
+                                         column_sets, sample_rows, summarize_table, toggle_profiler,
+                                         compare_database, check_integrity, dump_database,
+                                         restore_database, import_new_table)
+from app.utils.profiler import profiler
+
 
 class MenuBar(QMenuBar):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setup_menu_bar()
+        self.connect_actions()
 
     def setup_menu_bar(self):
         # File menu
@@ -15,6 +28,9 @@ class MenuBar(QMenuBar):
         self.save_action = QAction("&Save", self)
         self.save_as_action = QAction("Save &As", self)
         self.export_action = QAction("&Export", self)
+        self.import_table_action = QAction("&Import CSV as New Table...", self)
+        self.dump_action = QAction("&Dump to SQL...", self)
+        self.restore_action = QAction("&Restore from SQL...", self)
         self.exit_action = QAction("E&xit", self)
 
         file_menu.addAction(self.new_db_action)
@@ -24,20 +40,44 @@ class MenuBar(QMenuBar):
         file_menu.addAction(self.save_as_action)
         file_menu.addSeparator()
         file_menu.addAction(self.export_action)
+        file_menu.addAction(self.import_table_action)
+        file_menu.addAction(self.dump_action)
+        file_menu.addAction(self.restore_action)
         file_menu.addSeparator()
         file_menu.addAction(self.exit_action)
 
         # Edit menu
         edit_menu = self.addMenu("&Edit")
         self.add_row_action = QAction("&Add Row", self)
+        self.add_rows_action = QAction("Add &Rows...", self)
+        self.duplicate_rows_action = QAction("D&uplicate Rows", self)
         self.delete_row_action = QAction("&Delete Row", self)
+        self.delete_matching_action = QAction("Delete Rows &Matching Filter", self)
+        self.delete_row_action.setShortcut(QKeySequence.StandardKey.Delete)
         self.add_column_action = QAction("Add &Column", self)
         self.edit_column_action = QAction("&Edit Column", self)
+        self.copy_action = QAction("&Copy", self)
+        self.paste_action = QAction("&Paste", self)
+        self.fill_down_action = QAction("Fill &Down", self)
+        self.set_cells_action = QAction("&Set Selected Cells...", self)
+        self.copy_action.setShortcut(QKeySequence.StandardKey.Copy)
+        self.paste_action.setShortcut(QKeySequence.StandardKey.Paste)
+        self.fill_down_action.setShortcut(QKeySequence("Ctrl+D"))
         self.find_action = QAction("&Find", self)
         self.replace_action = QAction("&Replace", self)
+        self.find_action.setShortcut(QKeySequence.StandardKey.Find)
+        self.replace_action.setShortcut(QKeySequence.StandardKey.Replace)
 
+        edit_menu.addAction(self.copy_action)
+        edit_menu.addAction(self.paste_action)
+        edit_menu.addAction(self.fill_down_action)
+        edit_menu.addAction(self.set_cells_action)
+        edit_menu.addSeparator()
         edit_menu.addAction(self.add_row_action)
+        edit_menu.addAction(self.add_rows_action)
+        edit_menu.addAction(self.duplicate_rows_action)
         edit_menu.addAction(self.delete_row_action)
+        edit_menu.addAction(self.delete_matching_action)
         edit_menu.addSeparator()
         edit_menu.addAction(self.add_column_action)
         edit_menu.addAction(self.edit_column_action)
@@ -48,11 +88,17 @@ class MenuBar(QMenuBar):
         # View menu
         view_menu = self.addMenu("&View")
         self.refresh_action = QAction("&Refresh", self)
+        self.column_sets_action = QAction("&Column Sets...", self)
+        self.sample_action = QAction("&Sample Rows...", self)
+        self.summary_action = QAction("S&ummary...", self)
         self.zoom_in_action = QAction("Zoom &In", self)
         self.zoom_out_action = QAction("Zoom &Out", self)
         self.reset_zoom_action = QAction("&Reset Zoom", self)
 
         view_menu.addAction(self.refresh_action)
+        view_menu.addAction(self.column_sets_action)
+        view_menu.addAction(self.sample_action)
+        view_menu.addAction(self.summary_action)
         view_menu.addSeparator()
         view_menu.addAction(self.zoom_in_action)
         view_menu.addAction(self.zoom_out_action)
@@ -63,7 +109,39 @@ class MenuBar(QMenuBar):
         self.query_editor_action = QAction("&SQL Query Editor", self)
         self.settings_action = QAction("&Preferences", self)
 
+        self.compare_action = QAction("&Compare With Database...", self)
+        self.integrity_action = QAction("Check &Integrity...", self)
+
         tools_menu.addAction(self.query_editor_action)
+        tools_menu.addAction(self.compare_action)
+        tools_menu.addAction(self.integrity_action)
+        tools_menu.addSeparator()
+
+        profile_menu = tools_menu.addMenu("Connection &Profile")
+        self.profile_group = QActionGroup(self)
+        self.profile_actions = {}
+        current_profile = QSettings("YourCompany", "DatabaseEditor").value("connection_profile", "auto")
+        for name, label in (("auto", "&Auto"), ("interactive", "&Interactive"), ("large_file", "&Large File"),
+                            ("bulk_load", "&Bulk Load"), ("read_only", "&Read-only Analytics")):
+            action = QAction(label, self, checkable=True)
+            action.setChecked(name == current_profile)
+            self.profile_group.addAction(action)
+            profile_menu.addAction(action)
+            self.profile_actions[name] = action
+
+        self.query_cache_action = QAction("Query Result &Cache", self, checkable=True)
+        self.query_cache_action.setChecked(
+            QSettings("YourCompany", "DatabaseEditor").value("query_cache", True, type=bool))
+        self.cache_stats_action = QAction("Cache &Statistics", self)
+        tools_menu.addAction(self.query_cache_action)
+        tools_menu.addAction(self.cache_stats_action)
+        self.watch_changes_action = QAction("&Watch External Changes", self, checkable=True)
+        self.watch_changes_action.setChecked(
+            QSettings("YourCompany", "DatabaseEditor").value("watch_changes", True, type=bool))
+        tools_menu.addAction(self.watch_changes_action)
+        self.profiler_action = QAction("P&rofiler", self, checkable=True)
+        self.profiler_action.setChecked(profiler.active)
+        tools_menu.addAction(self.profiler_action)
         tools_menu.addSeparator()
         tools_menu.addAction(self.settings_action)
 
@@ -75,3 +153,30 @@ class MenuBar(QMenuBar):
         help_menu.addAction(self.docs_action)
         help_menu.addSeparator()
         help_menu.addAction(self.about_action)
+
+    def connect_actions(self):
+        self.find_action.triggered.connect(partial(find_text, self.parent()))
+        self.replace_action.triggered.connect(partial(replace_text, self.parent()))
+        self.add_row_action.triggered.connect(partial(add_row, self.parent()))
+        self.add_rows_action.triggered.connect(partial(add_rows, self.parent()))
+        self.duplicate_rows_action.triggered.connect(partial(duplicate_rows, self.parent()))
+        self.delete_row_action.triggered.connect(partial(delete_record, self.parent()))
+        self.delete_matching_action.triggered.connect(partial(delete_matching, self.parent()))
+        for name, action in self.profile_actions.items():
+            action.triggered.connect(partial(set_connection_profile, self.parent(), name))
+        self.query_cache_action.toggled.connect(partial(toggle_query_cache, self.parent()))
+        self.cache_stats_action.triggered.connect(partial(query_cache_stats, self.parent()))
+        self.column_sets_action.triggered.connect(partial(column_sets, self.parent()))
+        self.sample_action.triggered.connect(partial(sample_rows, self.parent()))
+        self.summary_action.triggered.connect(partial(summarize_table, self.parent()))
+        self.watch_changes_action.toggled.connect(partial(toggle_change_watch, self.parent()))
+        self.profiler_action.toggled.connect(partial(toggle_profiler, self.parent()))
+        self.compare_action.triggered.connect(partial(compare_database, self.parent()))
+        self.integrity_action.triggered.connect(partial(check_integrity, self.parent()))
+        self.dump_action.triggered.connect(partial(dump_database, self.parent()))
+        self.restore_action.triggered.connect(partial(restore_database, self.parent()))
+        self.import_table_action.triggered.connect(partial(import_new_table, self.parent()))
+        self.copy_action.triggered.connect(partial(copy_cells, self.parent()))
+        self.paste_action.triggered.connect(partial(paste_cells, self.parent()))
+        self.fill_down_action.triggered.connect(partial(fill_down, self.parent()))
+        self.set_cells_action.triggered.connect(partial(set_selected_cells, self.parent()))
@@ -1,30 +1,186 @@
-from PyQt6.QtCore import Qt, QAbstractTableModel
+import logging
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
 
 from app.utils.database.controller import DatabaseController
+from app.utils.profiler import timed
+
+logger = logging.getLogger(__name__)
 
 
 class TableModel(QAbstractTableModel):
-    def __init__(self, db_controller: DatabaseController, table_name: str):
+    """One page of a table, reading only the columns in the visible window.
+
+    ``columns`` are the columns shown (all, or the active column set);
+    ``loaded`` are those actually fetched for the current page. The view
+    calls ensure_columns() as it scrolls sideways. In sample mode ``sample``
+    holds the rowids to show instead of a page; see set_sample(). A model
+    whose tab is in the background gives its rows up with release().
+    WITHOUT ROWID tables are ``read_only``: every column is read with the
+    page, and rows are keyed by primary key only for display.
+    """
+    INITIAL_COLUMNS = 32
+
+    def __init__(self, db_controller: DatabaseController, table_name: str, page_size: int = 100,
+                 column_set=None):
         super().__init__()
         self.db_controller = db_controller
         self.table_name = table_name
+        self.page_size = page_size
+        self.page = 0
+        self.where = None
+        self.params = ()
+        self.sample = None
+        self.column_set = column_set
+        self.window = (0, self.INITIAL_COLUMNS - 1)
         self.columns = []
-        self.data = []
+        self.loaded = set()
+        self.rowids = []
+        self.rows = []
+        # Scroll position, selection and search text, kept by the window while the tab is in the background
+        self.view_state = None
+        self.read_only = not db_controller.has_rowid(table_name)
         self.load_data()
 
+    @timed
     def load_data(self):
-        self.columns, self.data = self.db_controller.get_table_data(self.table_name)
-        self.layoutChanged.emit()
+        self.beginResetModel()
+        all_columns = self.db_controller.get_column_names(self.table_name)
+        if self.column_set:
+            self.columns = [name for name in all_columns if name in self.column_set] or all_columns
+        else:
+            self.columns = all_columns
+        first, last = self.window
+        fetch = self.columns if self.read_only else self.columns[first:last + 1]
+        if self.sample is not None:
+            current = self.db_controller.get_rows(self.table_name, self.sample, fetch) if self.sample else {}
+            self.rowids = [rowid for rowid in self.sample if rowid in current]
+            self.rows = [current[rowid] for rowid in self.rowids]
+        else:
+            _, self.rowids, self.rows = self.db_controller.get_table_page(
+                self.table_name, self.page_size, self.page * self.page_size, self.where, self.params, fetch)
+        self.loaded = set(fetch)
+        self.endResetModel()
+
+    def set_column_set(self, columns=None):
+        """Show only ``columns`` (None shows all); hidden columns are never read"""
+        self.column_set = set(columns) if columns else None
+        self.window = (0, self.INITIAL_COLUMNS - 1)
+        self.load_data()
+
+    def loaded_columns(self):
+        return [name for name in self.columns if name in self.loaded]
+
+    @timed
+    def ensure_columns(self, first, last):
+        """Fetch columns ``first..last`` for the page if they are not loaded yet.
+
+        Columns far outside the window are dropped again so scrolling across
+        a very wide table does not end up holding all of it.
+        """
+        first, last = max(0, first), min(last, len(self.columns) - 1)
+        if first > last or self.read_only:
+            return
+        self.window = (first, last)
+        missing = [name for name in self.columns[first:last + 1] if name not in self.loaded]
+        if missing:
+            current = self.db_controller.get_rows(self.table_name, self.rowids, missing) if self.rowids else {}
+            for rowid, row in zip(self.rowids, self.rows):
+                row.update(current.get(rowid, ()))
+            self.loaded.update(missing)
+            cols = [self.columns.index(name) for name in (missing[0], missing[-1])]
+            if self.rows:
+                self.dataChanged.emit(self.index(0, cols[0]), self.index(len(self.rows) - 1, cols[1]),
+                                      [Qt.ItemDataRole.DisplayRole])
+
+        width = last - first + 1
+        if len(self.loaded) > 4 * width + self.INITIAL_COLUMNS:
+            keep = set(self.columns[max(0, first - width):last + width + 1])
+            for row in self.rows:
+                for name in self.loaded - keep:
+                    row.pop(name, None)
+            self.loaded &= keep
+
+    def refresh(self):
+        self.load_data()
+
+    def release(self):
+        """Drop the page's rows but keep page, filter and columns while the tab is in the background.
+
+        load_data() reads them back, normally from the controller's shared row cache.
+        """
+        self.beginResetModel()
+        self.rowids = []
+        self.rows = []
+        self.loaded = set()
+        self.endResetModel()
+
+    def set_sample(self, rowids=None):
+        """Show exactly the rows ``rowids``, in that order; None goes back to the paged view"""
+        self.sample = list(rowids) if rowids is not None else None
+        self.page = 0
+        self.load_data()
+
+    def set_page(self, page, page_size=None):
+        self.sample = None
+        self.page = max(0, page)
+        if page_size:
+            self.page_size = page_size
+        self.load_data()
+
+    def set_filter(self, where=None, params=()):
+        self.where = where
+        self.params = tuple(params)
+        self.sample = None
+        self.page = 0
+        self.load_data()
+
+    @timed
+    def refresh_rows(self, first, last):
+        """Re-read rows ``first..last`` of the page in place after an external change.
+
+        Rows that were deleted are removed, and a short last page is topped up
+        with new rows, so nothing outside the given window is touched and the
+        view keeps its scroll position and selection.
+        """
+        if self.read_only:
+            self.load_data()
+            return
+        if self.rowids and first <= last:
+            first, last = max(0, first), min(last, len(self.rowids) - 1)
+            current = self.db_controller.get_rows(self.table_name, self.rowids[first:last + 1],
+                                                  self.loaded_columns())
+            for row in range(first, last + 1):
+                if self.rowids[row] in current:
+                    self.rows[row] = current[self.rowids[row]]
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self.columns) - 1),
+                                  [Qt.ItemDataRole.DisplayRole])
+            self.remove_rowids({rowid for rowid in self.rowids[first:last + 1] if rowid not in current})
+
+        room = self.page_size - len(self.rowids)
+        if room > 0 and self.sample is None:
+            after = self.rowids[-1] if self.rowids else None
+            if after is None and self.page > 0:
+                return
+            where = ' AND '.join(f'({clause})' for clause in (self.where, 'rowid > ?' if after is not None else None)
+                                 if clause)
+            params = (*self.params, after) if after is not None else self.params
+            _, rowids, rows = self.db_controller.get_table_page(self.table_name, room, 0, where or None, params,
+                                                                self.loaded_columns())
+            self.append_rows(rowids, rows)
 
     def rowCount(self, parent=None):
-        return len(self.data)
+        return len(self.rows)
 
     def columnCount(self, parent=None):
         return len(self.columns)
 
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
         if role == Qt.ItemDataRole.DisplayRole:
-            return str(self.data[index.row()][self.columns[index.column()]])
+            row = self.rows[index.row()]
+            name = self.columns[index.column()]
+            # A column outside the fetched window shows blank until ensure_columns() reads it
+            return str(row[name]) if name in row else None
         return None
 
     def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
@@ -32,24 +188,65 @@ class TableModel(QAbstractTableModel):
             return self.columns[section]
         return None
 
+    @timed
     def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
         if role == Qt.ItemDataRole.EditRole:
-            row = index.row()
-            column = index.column()
-            column_name = self.columns[column]
-            primary_key_col = self.columns[0]
-            primary_key_value = self.data[row][primary_key_col]
-
-            try:
-                self.db_controller.update_record(self.table_name, primary_key_col, primary_key_value, column_name,
-                                                 value)
-                self.data[row][column_name] = value
-                self.dataChanged.emit(index, index, [Qt.ItemDataRole.DisplayRole])
-                return True
-            except Exception as e:
-                print(f"Failed to update record: {str(e)}")
-                return False
+            return self.set_cells([(index.row(), index.column(), value)])
         return False
 
+    def set_cells(self, updates):
+        """Write ``(row, column, value)`` edits in one transaction and emit one dataChanged range"""
+        if not updates or self.read_only:
+            return False
+        cells = [(self.rowids[row], self.columns[col], value) for row, col, value in updates]
+        try:
+            self.db_controller.update_cells(self.table_name, cells)
+        except Exception as e:
+            logger.error(f"Failed to update records: {str(e)}")
+            return False
+
+        for row, col, value in updates:
+            self.rows[row][self.columns[col]] = value
+        rows = [row for row, _, _ in updates]
+        cols = [col for _, col, _ in updates]
+        self.dataChanged.emit(self.index(min(rows), min(cols)), self.index(max(rows), max(cols)),
+                              [Qt.ItemDataRole.DisplayRole])
+        return True
+
+    def room_at_end(self):
+        """How many newly inserted rows show at the end of this page, or None if it must be re-read.
+
+        New rows get the highest rowids, so only an unfiltered last page grows;
+        on any other page they land past its end.
+        """
+        if self.where or self.sample is not None or (not self.rows and self.page > 0):
+            return None
+        return max(0, self.page_size - len(self.rows))
+
+    def append_rows(self, rowids, rows):
+        """Show freshly inserted rows at the end of the page without re-reading it"""
+        if not rowids:
+            return
+        first = len(self.rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rowids) - 1)
+        self.rowids.extend(rowids)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def remove_rowids(self, rowids):
+        """Drop already-deleted rows from the page, one beginRemoveRows per contiguous run"""
+        doomed = [row for row, rowid in enumerate(self.rowids) if rowid in rowids]
+        while doomed:
+            last = doomed.pop()
+            first = last
+            while doomed and doomed[-1] == first - 1:
+                first = doomed.pop()
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.rowids[first:last + 1]
+            del self.rows[first:last + 1]
+            self.endRemoveRows()
+
     def flags(self, index):
+        if self.read_only:
+            return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
         return Qt.ItemFlag.ItemIsEditable | Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
@@ -31,13 +31,21 @@ class DatabaseToolBar(QToolBar):
         self.change_table_act = QAction("Change")
         self.new_table_act = QAction("New")
         self.rename_table_act = QAction("Rename")
+        self.clone_table_act = QAction("Clone")
         self.delete_table_act = QAction("Delete")
         self.properties_table_act = QAction("Properties")
+        self.indexes_table_act = QAction("Indexes")
+        self.schema_table_act = QAction("Edit Schema...")
+        self.import_table_act = QAction("Import CSV...")
         self.tables_menu.addAction(self.change_table_act)
         self.tables_menu.addAction(self.new_table_act)
         self.tables_menu.addAction(self.rename_table_act)
+        self.tables_menu.addAction(self.clone_table_act)
         self.tables_menu.addAction(self.delete_table_act)
         self.tables_menu.addAction(self.properties_table_act)
+        self.tables_menu.addAction(self.indexes_table_act)
+        self.tables_menu.addAction(self.schema_table_act)
+        self.tables_menu.addAction(self.import_table_act)
 
         self.tables_dropdown_btn.setMenu(self.tables_menu)
         self.tables_dropdown_btn.setPopupMode(QToolButton.ToolButtonPopupMode.InstantPopup)
@@ -127,8 +135,12 @@ class DatabaseToolBar(QToolBar):
         self.change_table_act.triggered.connect(partial(change_table, self.parent()))
         self.new_table_act.triggered.connect(partial(new_table, self.parent()))
         self.rename_table_act.triggered.connect(partial(rename_table, self.parent()))
+        self.clone_table_act.triggered.connect(partial(clone_table, self.parent()))
         self.delete_table_act.triggered.connect(partial(delete_table, self.parent()))
         self.properties_table_act.triggered.connect(partial(properties_table, self.parent()))
+        self.indexes_table_act.triggered.connect(partial(manage_indexes, self.parent()))
+        self.schema_table_act.triggered.connect(partial(edit_schema, self.parent()))
+        self.import_table_act.triggered.connect(partial(import_new_table, self.parent()))
 
         self.edit_record_act.triggered.connect(partial(edit_record, self.parent()))
         self.delete_record_act.triggered.connect(partial(delete_record, self.parent()))
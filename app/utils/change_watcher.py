@@ -0,0 +1,71 @@
+import logging
+import os
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+
+from app.utils.database.controller import DatabaseController
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeWatcher(QObject):
+    """Notices commits made by other processes (or our own worker connections).
+
+    Each tick only stats the database and WAL files; ``PRAGMA data_version`` is
+    read when those change, and every ``verify_every`` ticks as a safety net
+    for filesystems with coarse mtimes. An idle database therefore costs two
+    ``stat`` calls per interval.
+    """
+    changed = pyqtSignal(bool)  # True when the schema changed as well
+
+    def __init__(self, db_controller: DatabaseController, interval: int = 1000, verify_every: int = 10):
+        super().__init__()
+        self.db_controller = db_controller
+        self.verify_every = verify_every
+        self.ticks = 0
+        self.file_state = None
+        self.data_version = None
+        self.schema_version = None
+        self.timer = QTimer()
+        self.timer.setInterval(interval)
+        self.timer.timeout.connect(self.check)
+
+    def start(self):
+        self.file_state = self.read_file_state()
+        self.data_version = self.db_controller.data_version()
+        self.schema_version = self.db_controller.schema_version()
+        self.timer.start()
+
+    def stop(self):
+        self.timer.stop()
+
+    def read_file_state(self):
+        state = []
+        path = self.db_controller.config['path']
+        for name in (path, path + '-wal'):
+            try:
+                stat = os.stat(name)
+                state.append((stat.st_mtime_ns, stat.st_size))
+            except OSError:
+                state.append(None)
+        return state
+
+    def check(self):
+        self.ticks += 1
+        file_state = self.read_file_state()
+        if file_state == self.file_state and self.ticks % self.verify_every:
+            return
+        self.file_state = file_state
+
+        try:
+            data_version = self.db_controller.data_version()
+            if data_version == self.data_version:
+                return
+            self.data_version = data_version
+            schema_version = self.db_controller.schema_version()
+        except Exception as e:
+            logger.error(f"Change check failed: {str(e)}")
+            return
+        schema_changed = schema_version != self.schema_version
+        self.schema_version = schema_version
+        self.changed.emit(schema_changed)
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from app.utils.database.controller import DatabaseController
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseController:
+    """Coroutine front-end to ``DatabaseController`` for scripts and asyncio services.
+
+    Calls run on a bounded thread pool. Each pool thread lazily opens its own
+    ``DatabaseController`` (and so its own SQLite connection), so concurrent
+    reads, exports and maintenance jobs never share a connection and never
+    block the event loop.
+
+        async with AsyncDatabaseController({'type': 'SQLite', 'path': 'data.db'}) as db:
+            tables, schema = await asyncio.gather(db.get_tables(), db.get_schema('users'))
+            async for row in db.iter_rows('SELECT * FROM users'):
+                ...
+    """
+
+    def __init__(self, config, max_workers=4):
+        self.config = dict(config, check_same_thread=False)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db')
+        self._local = threading.local()
+        self._controllers = []
+        self._lock = threading.Lock()
+
+    def _controller(self):
+        controller = getattr(self._local, 'controller', None)
+        if controller is None:
+            controller = DatabaseController(self.config)
+            self._local.controller = controller
+            with self._lock:
+                self._controllers.append(controller)
+        return controller
+
+    def _call(self, method, *args, **kwargs):
+        return getattr(self._controller(), method)(*args, **kwargs)
+
+    async def _run(self, method, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(self._call, method, *args, **kwargs))
+
+    async def get_tables(self):
+        return await self._run('get_tables')
+
+    async def get_schema(self, table_name):
+        return await self._run('get_schema', table_name)
+
+    async def get_table_page(self, table_name, limit, offset=0, where=None, params=()):
+        return await self._run('get_table_page', table_name, limit, offset, where, params)
+
+    async def batch_insert(self, table_name, data):
+        return await self._run('batch_insert', table_name, data)
+
+    async def execute(self, query, params=()):
+        return await self._run('execute', query, params)
+
+    async def optimize(self):
+        return await self._run('optimize')
+
+    async def iter_chunks(self, query, params=(), chunk_size=1000, max_pending=4):
+        """Stream ``query`` results as lists of rows fetched with ``fetchmany``.
+
+        At most ``max_pending`` chunks are buffered, so a slow consumer applies
+        back-pressure to the reader thread instead of growing memory. The reader
+        occupies one pool thread until the stream is exhausted or closed.
+        """
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(max_pending)
+        stop = threading.Event()
+
+        def produce():
+            def put(item):
+                asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+            try:
+                cursor = self._controller().conn.execute(query, params)
+                while not stop.is_set():
+                    rows = cursor.fetchmany(chunk_size)
+                    put(rows)
+                    if not rows:
+                        break
+                cursor.close()
+            except Exception as e:
+                logger.error(f"Streaming query failed: {str(e)}")
+                put(e)
+
+        producer = loop.run_in_executor(self._executor, produce)
+        try:
+            while True:
+                item = await queue.get()
+                if isinstance(item, Exception):
+                    raise item
+                if not item:
+                    break
+                yield item
+        finally:
+            stop.set()
+            while not queue.empty():
+                queue.get_nowait()
+            await producer
+
+    async def iter_rows(self, query, params=(), chunk_size=1000):
+        async for rows in self.iter_chunks(query, params, chunk_size):
+            for row in rows:
+                yield row
+
+    async def close(self):
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._executor.shutdown, wait=True))
+        with self._lock:
+            for controller in self._controllers:
+                controller.close()
+            self._controllers.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
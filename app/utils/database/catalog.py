@@ -0,0 +1,65 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+WITHOUT_ROWID = re.compile(r'\)\s*(STRICT\s*,\s*)?WITHOUT\s+ROWID(\s*,\s*STRICT)?\s*;?\s*$', re.IGNORECASE)
+
+
+class SchemaCatalog:
+    """Table names and ``table_info`` rows, read once per schema version.
+
+    Every open tab asks the controller for the same table list and columns;
+    the catalog answers from memory until ``PRAGMA schema_version`` moves,
+    which happens on any DDL, from this connection or another one.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.tables = None
+        self.columns = {}
+        self.rowid = {}
+
+    def _check(self, conn):
+        version = conn.execute('PRAGMA schema_version').fetchone()[0]
+        if version != self.version:
+            if self.version is not None:
+                logger.debug(f"Schema version {self.version} -> {version}; catalog cleared")
+            self.version = version
+            self.tables = None
+            self.columns.clear()
+            self.rowid.clear()
+
+    def table_names(self, conn):
+        self._check(conn)
+        if self.tables is None:
+            self.tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        return list(self.tables)
+
+    def table_info(self, conn, table_name):
+        """``PRAGMA table_info`` rows as dicts; copies, so callers may change them"""
+        self._check(conn)
+        if table_name not in self.columns:
+            cursor = conn.execute(f'PRAGMA table_info("{table_name}")')
+            names = [description[0] for description in cursor.description]
+            self.columns[table_name] = [dict(zip(names, row)) for row in cursor.fetchall()]
+        return [dict(column) for column in self.columns[table_name]]
+
+    def column_names(self, conn, table_name):
+        self._check(conn)
+        if table_name not in self.columns:
+            self.table_info(conn, table_name)
+        return [column['name'] for column in self.columns[table_name]]
+
+    def has_rowid(self, conn, table_name):
+        """False for WITHOUT ROWID tables, which can only be addressed by their primary key"""
+        self._check(conn)
+        if table_name not in self.rowid:
+            row = conn.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (table_name,)).fetchone()
+            self.rowid[table_name] = not (row and row[0] and WITHOUT_ROWID.search(row[0]))
+        return self.rowid[table_name]
+
+    def primary_key(self, conn, table_name):
+        """Primary key column names in key order; empty if the table has none"""
+        info = [column for column in self.table_info(conn, table_name) if column['pk']]
+        return [column['name'] for column in sorted(info, key=lambda column: column['pk'])]
@@ -0,0 +1,168 @@
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+_IDENT = r'(?:"(?:[^"]|"")*"|\[[^\]]*\]|`[^`]*`|[A-Za-z_][\w$]*)'
+_QUALIFIED = rf'(?:{_IDENT}\s*\.\s*)?{_IDENT}'
+
+_CREATE_TABLE = re.compile(rf'^(\s*CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?){_QUALIFIED}', re.IGNORECASE)
+_CREATE_INDEX = re.compile(
+    rf'^(\s*CREATE\s+(?:UNIQUE\s+)?INDEX\s+(?:IF\s+NOT\s+EXISTS\s+)?){_QUALIFIED}(\s+ON\s+){_QUALIFIED}',
+    re.IGNORECASE)
+_CREATE_TRIGGER = re.compile(
+    rf'^(\s*CREATE\s+(?:TEMP\w*\s+)?TRIGGER\s+(?:IF\s+NOT\s+EXISTS\s+)?){_QUALIFIED}(.*?\s+ON\s+){_QUALIFIED}',
+    re.IGNORECASE | re.DOTALL)
+_TOKEN = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]|--[^\n]*|/\*.*?(?:\*/|$)"""
+                    r'|[A-Za-z_][\w$]*|\s+|.', re.DOTALL)
+# Words after which an identifier in a trigger body names a table
+_TABLE_POSITION = {'FROM', 'JOIN', 'INTO', 'UPDATE', 'OR', 'ROLLBACK', 'ABORT', 'REPLACE', 'FAIL', 'IGNORE'}
+_NOT_TABLES = _TABLE_POSITION | {'SELECT', 'VALUES', 'DEFAULT', 'NOT', 'EXISTS'}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _unquote(token):
+    if token[:1] in ('"', '`'):
+        return token[1:-1].replace(token[0] * 2, token[0])
+    if token[:1] == '[':
+        return token[1:-1]
+    return token
+
+
+def _rewrite_body(body, table_name, new_table, schema):
+    """``(body, tables)`` with references to ``table_name`` pointed at ``new_table``, or None.
+
+    Only table positions (after FROM, JOIN, INTO, UPDATE, or as the
+    qualifier of a column) are rewritten; if the name turns up anywhere else
+    the trigger cannot be rewritten safely and None is returned. ``tables``
+    are the lower-cased names of the other tables the body uses.
+    """
+    tokens = [match.group() for match in _TOKEN.finditer(body)]
+    words = [i for i, token in enumerate(tokens) if not token.isspace() and not token.startswith(('--', '/*'))]
+    tables = set()
+    n = 0
+    while n < len(words):
+        token = tokens[words[n]]
+        if not (token[:1] in '"`[' or token[:1].isalpha() or token[:1] == '_'):
+            n += 1
+            continue
+        previous = tokens[words[n - 1]].upper() if n else ''
+        following = tokens[words[n + 1]] if n + 1 < len(words) else ''
+        if previous in _TABLE_POSITION and following == '.' and n + 2 < len(words) and \
+                _unquote(token).lower() in ('main', schema.lower()):
+            # A schema-qualified table: the clone's triggers only see their own schema
+            tokens[words[n]] = tokens[words[n + 1]] = ''
+            n += 2
+            token, following = tokens[words[n]], tokens[words[n + 1]] if n + 1 < len(words) else ''
+        name = _unquote(token).lower()
+        if name == table_name.lower():
+            if previous not in _TABLE_POSITION and following != '.':
+                return None
+            tokens[words[n]] = _quote(new_table)
+        elif previous in _TABLE_POSITION and following != '.' and token.upper() not in _NOT_TABLES:
+            tables.add(name)
+        n += 1
+    return ''.join(tokens), tables
+
+
+def rewrite_ddl(kind, sql, new_table, new_name=None, schema='main'):
+    """Point a CREATE TABLE/INDEX/TRIGGER statement at ``schema.new_table``.
+
+    Indexes and triggers are renamed to ``new_name``. Trigger bodies are
+    rewritten separately by rewrite_trigger().
+    """
+    target = f'{_quote(schema)}.{_quote(new_table)}'
+    if kind == 'table':
+        return _CREATE_TABLE.sub(lambda m: m.group(1) + target, sql, count=1)
+    pattern = _CREATE_INDEX if kind == 'index' else _CREATE_TRIGGER
+    return pattern.sub(
+        lambda m: f'{m.group(1)}{_quote(schema)}.{_quote(new_name)}{m.group(2)}{_quote(new_table)}', sql, count=1)
+
+
+def rewrite_trigger(sql, table_name, new_table, new_name, schema, tables):
+    """A trigger's CREATE statement for the clone, or None if it cannot be carried over.
+
+    References to ``table_name`` in the body are pointed at ``new_table``,
+    so the clone's triggers never touch the original. A trigger whose body
+    uses a table missing from ``tables`` (the target schema's tables,
+    lower-cased) would fail on every write to the clone, so it is refused.
+    """
+    header = _CREATE_TRIGGER.match(sql)
+    if not header:
+        return None
+    rewritten = _rewrite_body(sql[header.end():], table_name, new_table, schema)
+    if rewritten is None or not rewritten[1] <= tables | {new_table.lower()}:
+        return None
+    return rewrite_ddl('trigger', sql[:header.end()], new_table, new_name, schema) + rewritten[0]
+
+
+def clone_table(conn, table_name, new_name, with_data=True, schema='main',
+                progress_callback=None, is_cancelled=None):
+    """Copy a table's structure, rows, indexes and triggers without rows leaving SQLite.
+
+    The indexes are created before the copy and triggers after it, so the
+    single ``INSERT INTO new SELECT * FROM old`` qualifies for SQLite's
+    transfer optimisation: records and index b-trees are copied page by page
+    rather than re-inserted row by row. Returns the names of the triggers
+    that could not be carried over (see rewrite_trigger()), or None if
+    cancelled.
+    """
+    objects = conn.execute(
+        "SELECT type, name, sql FROM main.sqlite_master WHERE tbl_name = ? AND sql IS NOT NULL "
+        "ORDER BY type = 'table' DESC, type = 'index' DESC", (table_name,)).fetchall()
+    if not objects or objects[0][0] != 'table':
+        raise ValueError(f"Table '{table_name}' not found")
+
+    steps = len(objects) + (1 if with_data else 0)
+    done = 0
+
+    def step():
+        nonlocal done
+        done += 1
+        if progress_callback:
+            progress_callback(done, steps)
+
+    def check_cancel():
+        return 1 if is_cancelled and is_cancelled() else 0
+
+    conn.set_progress_handler(check_cancel, 100000)
+    try:
+        conn.execute('BEGIN')  # DDL does not open a transaction implicitly
+        with conn:
+            for kind, name, sql in objects:
+                if kind == 'trigger':
+                    continue
+                new_object = new_name if kind == 'table' else f'{new_name}_{name}'
+                conn.execute(rewrite_ddl(kind, sql, new_name, new_object, schema))
+                step()
+
+            if with_data:
+                conn.execute(f'INSERT INTO {_quote(schema)}.{_quote(new_name)} SELECT * FROM main.{_quote(table_name)}')
+                step()
+
+            tables = {name.lower() for (name,) in conn.execute(
+                f"SELECT name FROM {_quote(schema)}.sqlite_master WHERE type IN ('table', 'view')")}
+            skipped = []
+            for kind, name, sql in objects:
+                if kind == 'trigger':
+                    trigger_sql = rewrite_trigger(sql, table_name, new_name, f'{new_name}_{name}', schema, tables)
+                    if trigger_sql is None:
+                        skipped.append(name)
+                    else:
+                        conn.execute(trigger_sql)
+                    step()
+    except Exception:
+        if check_cancel():
+            logger.info(f"Clone of '{table_name}' cancelled")
+            return None
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+
+    if skipped:
+        logger.warning(f"Triggers not cloned from '{table_name}': {', '.join(skipped)}")
+    logger.info(f"Cloned '{table_name}' to {schema}.'{new_name}'")
+    return skipped
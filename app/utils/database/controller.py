@@ -1,5 +1,29 @@
+import os
 import sqlite3
 import logging
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from app.utils.database.catalog import SchemaCatalog
+from app.utils.database.clone import clone_table
+from app.utils.database.csv_import import infer_schema, load_csv
+from app.utils.database.diff import compare_tables
+from app.utils.database.dump import PRAGMA, TRANSACTION_CONTROL, dump_sql, iter_statements
+from app.utils.database.find_replace import count_matches, register_functions, replace_all
+from app.utils.database.indexes import WorkloadRecorder, create_index, index_size, list_indexes, suggest_indexes
+from app.utils.database.integrity import check_database
+from app.utils.database.migration import SchemaEdit
+from app.utils.database.query_cache import QueryCache, is_cacheable
+from app.utils.database.row_cache import BLOCK_ROWS, RowBlockCache
+from app.utils.database.sampling import sample_rowids, stratified_rowids
+from app.utils.database.stats import profile_table
+from app.utils.database.summary import summarize
+from app.utils.database.transfer import (chunked, detect_format, iter_records, open_text, transfer_stats,
+                                         write_records)
+from app.utils.database.tuning import MB, PROFILES, apply_profile, choose_profile, database_size
+from app.utils.database.undo import MAX_UNDO_ROWS, CellSnapshot, RowSnapshot, UndoStack
+from app.utils.profiler import timed
 
 logger = logging.getLogger(__name__)
 
@@ -8,13 +32,29 @@ class DatabaseController:
     def __init__(self, config):
         self.config = config
         self.conn = None
+        self._profile_cache = {}
+        self._row_counts = {}
+        self._summaries = {}
+        self.undo_stack = UndoStack()
+        self.workload = WorkloadRecorder()
+        self.profile = config.get('profile', 'auto')
+        self.active_profile = None
+        self.query_cache = None
+        self.set_query_cache(config.get('query_cache_mb', 64))
+        # Shared by every open tab: one catalog, and one row cache with a single memory budget
+        self.catalog = SchemaCatalog()
+        self.row_cache = None
+        self.set_row_cache(config.get('row_cache_mb', 64))
         self.connect()
 
     def connect(self):
         try:
             if self.config['type'] == 'SQLite':
-                self.conn = sqlite3.connect(self.config['path'])
+                self.conn = sqlite3.connect(self.config['path'],
+                                            check_same_thread=self.config.get('check_same_thread', True))
                 self.conn.row_factory = sqlite3.Row
+                register_functions(self.conn)
+                self.apply_profile()
             else:
                 raise ValueError(f"Unsupported database type: {self.config['type']}")
 
@@ -23,20 +63,84 @@ class DatabaseController:
             logger.error(f"Failed to connect to database: {str(e)}")
             raise
 
+    def open_connection(self, read_only=False):
+        """Open an extra connection to the same database, e.g. for a worker thread."""
+        uri = Path(self.config['path']).resolve().as_uri()
+        if read_only:
+            uri += '?mode=ro'
+        conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        register_functions(conn)
+        path = self.config['path']
+        apply_profile(conn, 'read_only' if read_only else choose_profile(None, database_size(path)), path)
+        return conn
+
+    def apply_profile(self, operation=None):
+        """Apply the configured PRAGMA profile, or in auto mode the one suited to ``operation``."""
+        if self.profile == 'auto':
+            name = choose_profile(operation, database_size(self.config['path']))
+        else:
+            name = self.profile
+        if name != self.active_profile:
+            apply_profile(self.conn, name, self.config['path'])
+            self.active_profile = name
+            logger.info(f"Connection profile: {name}")
+        return name
+
+    def set_profile(self, name):
+        if name != 'auto' and name not in PROFILES:
+            raise ValueError(f"Unknown connection profile: {name}")
+        self.profile = name
+        self.apply_profile()
+
+    @contextmanager
+    def tuned_for(self, operation):
+        """Switch to the profile for ``operation`` (e.g. 'import') for the duration of a block."""
+        self.apply_profile(operation)
+        try:
+            yield
+        finally:
+            self.apply_profile()
+
+    def change_token(self):
+        """Cheap value that changes whenever the database content may have changed.
+
+        ``data_version`` moves on commits from other connections, ``total_changes``
+        on our own writes, and ``in_transaction`` on our own commit/rollback.
+        Our own DDL moves none of those, so ``schema_version`` is included too.
+        """
+        data_version, schema_version = self.conn.execute(
+            'SELECT * FROM pragma_data_version, pragma_schema_version').fetchone()
+        return data_version, schema_version, self.conn.total_changes, self.conn.in_transaction
+
+    def data_version(self):
+        """Changes whenever another connection commits to the database file."""
+        return self.conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def schema_version(self):
+        return self.conn.execute('PRAGMA schema_version').fetchone()[0]
+
     def create_table(self, table_name, columns, initial_rows=0):
         try:
             cursor = self.conn.cursor()
             columns_sql = ', '.join([f'"{name}" {type}' for name, type in columns])
             cursor.execute(f'CREATE TABLE IF NOT EXISTS "{table_name}" ({columns_sql})')
 
-            # Insert initial rows if specified
+            # Insert initial rows if specified, generated by a recursive CTE in one statement
             if initial_rows > 0:
-                placeholders = ', '.join(['?' for _ in columns])
-                insert_sql = f'INSERT INTO {table_name} VALUES ({placeholders})'
-                default_values = ['' if 'TEXT' in col[1].upper() else 0 for col in columns]
+                # INTEGER PRIMARY KEY columns are left to SQLite so each row gets its own key
+                value_cols = [col for col in columns if col[1].upper().split()[:3] != ['INTEGER', 'PRIMARY', 'KEY']]
+                if value_cols:
+                    names_sql = ', '.join(f'"{name}"' for name, _ in value_cols)
+                    placeholders = ', '.join(['?' for _ in value_cols])
+                    insert_sql = (f'WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?) '
+                                  f'INSERT INTO "{table_name}" ({names_sql}) SELECT {placeholders} FROM n')
+                    default_values = ['' if 'TEXT' in col[1].upper() else 0 for col in value_cols]
 
-                for _ in range(initial_rows):
-                    cursor.execute(insert_sql, default_values)
+                    cursor.execute(insert_sql, [initial_rows, *default_values])
+                else:
+                    # Nothing to fill in, and "INSERT INTO t () ..." is not valid SQL
+                    cursor.executemany(f'INSERT INTO "{table_name}" DEFAULT VALUES', ((),) * initial_rows)
 
             self.conn.commit()
             logger.info(f"Table '{table_name}' created successfully with {initial_rows} initial rows")
@@ -46,10 +150,7 @@ class DatabaseController:
 
     def get_tables(self):
         try:
-            cursor = self.conn.cursor()
-            cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-
-            tables = [row[0] for row in cursor.fetchall()]
+            tables = self.catalog.table_names(self.conn)
             logger.info(f"Retrieved tables: {tables}")
             return tables
         except Exception as e:
@@ -70,6 +171,437 @@ class DatabaseController:
             logger.error(f"Failed to get table data: {str(e)}")
             raise
 
+    def get_column_names(self, table_name):
+        return self.catalog.column_names(self.conn, table_name)
+
+    def has_rowid(self, table_name):
+        """False for WITHOUT ROWID tables; those are paged by primary key and shown read-only"""
+        return self.catalog.has_rowid(self.conn, table_name)
+
+    @timed
+    def get_table_page(self, table_name, limit, offset=0, where=None, params=(), columns=None):
+        """Return ``(columns, rowids, rows)`` for one page of a table in rowid order.
+
+        ``columns`` restricts the SELECT to those columns; by default all are read.
+        Pages are assembled from the shared row cache's blocks, reading only
+        the blocks, or the columns of a block, that it does not hold yet.
+        """
+        if columns is None:
+            columns = self.get_column_names(table_name)
+        if self.row_cache is None or not self.has_rowid(table_name):
+            return self._read_page(table_name, limit, offset, where, params, columns)
+        token = self.change_token()
+        end = offset + limit
+        numbers = range(offset // BLOCK_ROWS, (end - 1) // BLOCK_ROWS + 1)
+        blocks = {number: self.row_cache.get((table_name, where, tuple(params), number), token) for number in numbers}
+        missing = [number for number, block in blocks.items() if block is None]
+        if missing:
+            # One query for the whole run: each OFFSET has to step over every row before it
+            first, last = missing[0], missing[-1]
+            _, rowids, rows = self._read_page(table_name, (last - first + 1) * BLOCK_ROWS, first * BLOCK_ROWS,
+                                              where, params, columns)
+            for number in range(first, last + 1):
+                i = (number - first) * BLOCK_ROWS
+                blocks[number] = self.row_cache.put((table_name, where, tuple(params), number), token,
+                                                    rowids[i:i + BLOCK_ROWS], rows[i:i + BLOCK_ROWS], columns)
+
+        rowids, rows = [], []
+        for number in numbers:
+            block = blocks[number]
+            if lacking := [name for name in columns if name not in block.columns]:
+                values = self.get_rows(table_name, block.rowids, lacking) if block.rowids else {}
+                self.row_cache.add_columns((table_name, where, tuple(params), number), block, values, lacking)
+            start = number * BLOCK_ROWS
+            rowids += block.rowids[max(offset - start, 0):end - start]
+            rows += [{name: row.get(name) for name in columns}
+                     for row in block.rows[max(offset - start, 0):end - start]]
+            if len(block.rowids) < BLOCK_ROWS:
+                break
+        return columns, rowids, rows
+
+    def _read_page(self, table_name, limit, offset, where, params, columns):
+        try:
+            if self.has_rowid(table_name):
+                keys = ['rowid']
+            else:
+                # WITHOUT ROWID: page in primary key order; the keys stand in for rowids
+                keys = [f'"{name}"' for name in self.catalog.primary_key(self.conn, table_name)]
+            key_sql = ', '.join(keys)
+            cols_sql = ''.join(f', "{name}"' for name in columns)
+            width = len(keys)
+
+            where_sql = f' WHERE {where}' if where else ''
+            query = f'SELECT {key_sql}{cols_sql} FROM "{table_name}"{where_sql} ORDER BY {key_sql} LIMIT ? OFFSET ?'
+            if where:
+                self.workload.record(query, (*params, limit, offset))
+            cursor = self.conn.execute(query, (*params, limit, offset))
+            rowids, rows = [], []
+            for row in cursor.fetchall():
+                rowids.append(row[0] if width == 1 else tuple(row[:width]))
+                rows.append(dict(zip(columns, tuple(row)[width:])))
+            return columns, rowids, rows
+        except Exception as e:
+            logger.error(f"Failed to get table page: {str(e)}")
+            raise
+
+    def get_rows(self, table_name, rowids, columns):
+        """Current values of specific rows as ``{rowid: row_dict}``; rows that no longer exist are absent."""
+        try:
+            cols_sql = ''.join(f', "{name}"' for name in columns)
+            placeholders = ', '.join('?' for _ in rowids)
+            cursor = self.conn.execute(
+                f'SELECT rowid{cols_sql} FROM "{table_name}" WHERE rowid IN ({placeholders})', list(rowids))
+            return {row[0]: dict(zip(columns, tuple(row)[1:])) for row in cursor.fetchall()}
+        except Exception as e:
+            logger.error(f"Failed to get rows: {str(e)}")
+            raise
+
+    @timed
+    def sample_rowids(self, table_name, size):
+        """Rowids of about ``size`` random rows, found by rowid probes; fast enough for the main thread."""
+        try:
+            return sample_rowids(self.conn, table_name, size)
+        except sqlite3.Error as e:
+            logger.error(f"Sampling failed: {str(e)}")
+            raise
+
+    def stratified_sample(self, table_name, column, size, progress_callback=None, is_cancelled=None):
+        """Rowids sampled evenly per value of ``column`` on a private read-only connection, for a worker."""
+        conn = self.open_connection(read_only=True)
+        try:
+            return stratified_rowids(conn, table_name, column, size,
+                                     progress_callback=progress_callback, is_cancelled=is_cancelled)
+        finally:
+            conn.close()
+
+    def estimate_row_count(self, table_name):
+        """Instant row count estimate from ANALYZE statistics, else max(rowid); None if neither exists."""
+        try:
+            has_stats = self.conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type='table' AND name='sqlite_stat1'").fetchone()
+            if has_stats:
+                row = self.conn.execute(
+                    'SELECT stat FROM sqlite_stat1 WHERE tbl = ? ORDER BY idx IS NOT NULL LIMIT 1',
+                    (table_name,)).fetchone()
+                if row and row[0]:
+                    return int(row[0].split()[0])
+            if not self.has_rowid(table_name):
+                return None  # no max(rowid) to go by; the exact count follows from a worker
+            row = self.conn.execute(f'SELECT max(rowid) FROM "{table_name}"').fetchone()
+            return row[0] or 0
+        except (sqlite3.Error, ValueError) as e:
+            logger.error(f"Row count estimate failed: {str(e)}")
+            return 0
+
+    def cached_row_count(self, table_name, where=None, params=()):
+        entry = self._row_counts.get((table_name, where, tuple(params)))
+        if entry and entry[0] == self.change_token():
+            return entry[1]
+        return None
+
+    def row_count(self, table_name, where=None, params=()):
+        """Return ``(count, exact)`` without scanning the table.
+
+        Filtered counts, and unanalyzed WITHOUT ROWID tables, have no cheap
+        estimate, so ``count`` is ``None`` until ``count_rows`` has run.
+        """
+        count = self.cached_row_count(table_name, where, params)
+        if count is not None:
+            return count, True
+        if where:
+            return None, False
+        return self.estimate_row_count(table_name), False
+
+    def count_rows(self, table_name, token, where=None, params=(), progress_callback=None, is_cancelled=None):
+        """Exact COUNT(*) on a private connection; cached until the next write."""
+        conn = self.open_connection(read_only=True)
+        try:
+            where_sql = f' WHERE {where}' if where else ''
+            count = conn.execute(f'SELECT COUNT(*) FROM "{table_name}"{where_sql}', params).fetchone()[0]
+        finally:
+            conn.close()
+        self._row_counts[(table_name, where, tuple(params))] = (token, count)
+        return count
+
+    def _track_row_delta(self, table_name, token_before, delta):
+        # Keep an exact count valid across our own inserts/deletes instead of recounting
+        entry = self._row_counts.get((table_name, None, ()))
+        if entry and entry[0] == token_before:
+            self._row_counts[(table_name, None, ())] = (self.change_token(), entry[1] + delta)
+
+    def cached_column_profiles(self, table_name, sample_fraction=None):
+        entry = self._profile_cache.get((table_name, sample_fraction))
+        if entry and entry[0] == self.change_token():
+            return entry[1]
+        return None
+
+    def profile_columns(self, table_name, token, sample_fraction=None,
+                        progress_callback=None, is_cancelled=None):
+        """Compute column statistics on a private read-only connection.
+
+        Safe to call from a worker thread; ``token`` must come from
+        ``change_token()`` on the main thread before the job was started.
+        """
+        conn = self.open_connection(read_only=True)
+        try:
+            columns = [row['name'] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+            profiles = profile_table(conn, table_name, columns, sample_fraction,
+                                     progress_callback=progress_callback, is_cancelled=is_cancelled)
+        finally:
+            conn.close()
+
+        if profiles is not None:
+            self._profile_cache[(table_name, sample_fraction)] = (token, profiles)
+            if not sample_fraction:
+                self._row_counts[(table_name, None, ())] = (token, profiles[0]['rows'] if profiles else 0)
+            logger.info(f"Profiled {len(profiles)} columns of '{table_name}'")
+        return profiles
+
+    def cached_summary(self, table_name, group_by, aggregates, where=None, params=(), pivot=None):
+        entry = self._summaries.get((table_name, tuple(group_by), tuple(aggregates), where, tuple(params), pivot))
+        if entry and entry[0] == self.change_token():
+            return entry[1]
+        return None
+
+    @timed
+    def summarize(self, table_name, token, group_by, aggregates, where=None, params=(), pivot=None,
+                  progress_callback=None, is_cancelled=None):
+        """GROUP BY summary on a private read-only connection; cached until the data changes.
+
+        Safe to call from a worker thread; ``token`` must come from
+        ``change_token()`` on the main thread before the job was started.
+        """
+        conn = self.open_connection(read_only=True)
+        try:
+            summary = summarize(conn, table_name, group_by, aggregates, where, params, pivot, is_cancelled)
+        finally:
+            conn.close()
+        if summary is not None:
+            key = (table_name, tuple(group_by), tuple(aggregates), where, tuple(params), pivot)
+            self._summaries[key] = (token, summary)
+            # Keep only results for the current data; older tokens can never match again
+            for stale in [k for k, (t, _) in self._summaries.items() if t != token]:
+                del self._summaries[stale]
+        return summary
+
+    def find_matches(self, table_name, columns, spec, where=None, params=(),
+                     progress_callback=None, is_cancelled=None):
+        """Dry run for find & replace; safe to call from a worker thread."""
+        conn = self.open_connection(read_only=True)
+        try:
+            return count_matches(conn, table_name, columns, spec, where, params)
+        finally:
+            conn.close()
+
+    def replace_text(self, table_name, columns, spec, where=None, params=()):
+        """Set-based replace: one UPDATE per column inside a single transaction."""
+        snapshot = CellSnapshot(self.conn, table_name, f"Replace '{spec.find}' in {table_name}")
+        try:
+            with self.conn:
+                changed = replace_all(self.conn, table_name, columns, spec, snapshot, where, params)
+        except sqlite3.Error as e:
+            snapshot.discard(self.conn)
+            logger.error(f"Replace failed: {str(e)}")
+            raise
+        self.undo_stack.push(self.conn, snapshot)
+        logger.info(f"Replaced '{spec.find}' in {sum(changed.values())} cells of '{table_name}'")
+        return changed
+
+    def update_cells(self, table_name, cells):
+        """Apply many ``(rowid, column, value)`` edits as one undoable transaction.
+
+        Edits are grouped per column so each group is a single executemany.
+        """
+        by_column = {}
+        for rowid, column, value in cells:
+            by_column.setdefault(column, []).append((value, rowid))
+
+        snapshot = CellSnapshot(self.conn, table_name, f"Edit {len(cells)} cells in {table_name}")
+        try:
+            with self.conn:
+                for column, updates in by_column.items():
+                    snapshot.capture_rows(self.conn, column, [rowid for _, rowid in updates])
+                    self.conn.executemany(
+                        f'UPDATE "{table_name}" SET "{column}" = ? WHERE rowid = ?', updates)
+        except sqlite3.Error as e:
+            snapshot.discard(self.conn)
+            logger.error(f"Failed to update cells: {str(e)}")
+            raise
+        self.undo_stack.push(self.conn, snapshot)
+        logger.info(f"Updated {len(cells)} cells in table '{table_name}'")
+
+    def delete_undoable(self, count):
+        """Whether deleting ``count`` rows can keep a snapshot for undo."""
+        return count <= MAX_UNDO_ROWS
+
+    def delete_rows(self, table_name, rowids=None, where=None, params=(), undoable=True):
+        """Delete the given rowids, or every row matching ``where``, with one DELETE.
+
+        Rowids are staged in a TEMP table so the statement size does not grow
+        with the selection. Deleted rows are kept for undo unless ``undoable``
+        is false (see ``delete_undoable``). Returns the count.
+        """
+        if rowids is not None:
+            self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS delete_ids (rid INTEGER PRIMARY KEY)')
+            where, params = 'rowid IN (SELECT rid FROM temp.delete_ids)', ()
+        elif not where:
+            raise ValueError("delete_rows needs rowids or a filter")
+
+        token = self.change_token()
+        snapshot = None
+        if undoable:
+            snapshot = RowSnapshot(self.conn, table_name, f"Delete rows from {table_name}", removed=True)
+        try:
+            with self.conn:
+                if rowids is not None:
+                    self.conn.execute('DELETE FROM temp.delete_ids')
+                    self.conn.executemany('INSERT OR IGNORE INTO temp.delete_ids (rid) VALUES (?)',
+                                          ((rowid,) for rowid in rowids))
+                if snapshot:
+                    snapshot.capture(self.conn, where, params)
+                deleted = self.conn.execute(f'DELETE FROM "{table_name}" WHERE {where}', params).rowcount
+                if rowids is not None:
+                    self.conn.execute('DELETE FROM temp.delete_ids')
+        except sqlite3.Error as e:
+            if snapshot:
+                snapshot.discard(self.conn)
+            logger.error(f"Failed to delete rows: {str(e)}")
+            raise
+        if snapshot:
+            self.undo_stack.push(self.conn, snapshot)
+        else:
+            self.undo_stack.clear_redo(self.conn)
+        self._track_row_delta(table_name, token, -deleted)
+        logger.info(f"Deleted {deleted} rows from table '{table_name}'")
+        return deleted
+
+    def insert_rows(self, table_name, count=1, source_rowids=None, limit=None):
+        """Insert ``count`` rows of column defaults, or copies of ``source_rowids``.
+
+        Returns ``(inserted, rowids, rows)``. ``rowids`` and ``rows`` are the
+        first ``limit`` new rows (all by default), so callers can append what
+        fits on screen without re-reading the table or every inserted row.
+        """
+        token = self.change_token()
+        schema = self.get_schema(table_name)
+        columns = [col['name'] for col in schema]
+        if source_rowids is not None:
+            self.conn.execute('CREATE TEMP TABLE IF NOT EXISTS copy_ids (rid INTEGER PRIMARY KEY)')
+
+        snapshot = RowSnapshot(self.conn, table_name, f"Insert rows into {table_name}", removed=False)
+        try:
+            with self.conn:
+                last_rowid = self.conn.execute(f'SELECT max(rowid) FROM "{table_name}"').fetchone()[0] or 0
+                # Leave the INTEGER PRIMARY KEY (rowid alias) column out so copies get fresh keys;
+                # INTEGER members of a composite key are ordinary columns and are copied
+                key = [col for col in schema if col['pk']]
+                alias = key[0]['name'] if len(key) == 1 and key[0]['type'].upper() == 'INTEGER' else None
+                copy_cols = ', '.join(f'"{col["name"]}"' for col in schema if col['name'] != alias)
+                if source_rowids is not None and copy_cols:
+                    self.conn.execute('DELETE FROM temp.copy_ids')
+                    self.conn.executemany('INSERT OR IGNORE INTO temp.copy_ids (rid) VALUES (?)',
+                                          ((rowid,) for rowid in source_rowids))
+                    inserted = self.conn.execute(
+                        f'INSERT INTO "{table_name}" ({copy_cols}) SELECT {copy_cols} FROM "{table_name}" '
+                        f'WHERE rowid IN (SELECT rid FROM temp.copy_ids) ORDER BY rowid').rowcount
+                else:
+                    # A copy of a row that is nothing but its key is a row of defaults
+                    if source_rowids is not None:
+                        count = len(set(source_rowids))
+                    inserted = self.conn.executemany(
+                        f'INSERT INTO "{table_name}" DEFAULT VALUES', ((),) * count).rowcount
+                snapshot.capture(self.conn, 'rowid > ?', (last_rowid,))
+
+                cols_sql = ', '.join(f'"{name}"' for name in columns)
+                cursor = self.conn.execute(
+                    f'SELECT rowid, {cols_sql} FROM "{table_name}" WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                    (last_rowid, -1 if limit is None else limit))
+                rowids, rows = [], []
+                for row in cursor.fetchall():
+                    rowids.append(row[0])
+                    rows.append(dict(zip(columns, tuple(row)[1:])))
+        except sqlite3.Error as e:
+            snapshot.discard(self.conn)
+            logger.error(f"Failed to insert rows: {str(e)}")
+            raise
+        self.undo_stack.push(self.conn, snapshot)
+        self._track_row_delta(table_name, token, inserted)
+        logger.info(f"Inserted {inserted} rows into table '{table_name}'")
+        return inserted, rowids, rows
+
+    def undo(self):
+        with self.conn:
+            return self.undo_stack.undo(self.conn)
+
+    def redo(self):
+        with self.conn:
+            return self.undo_stack.redo(self.conn)
+
+    def compare_table(self, table_name, other_path, other_table=None,
+                      progress_callback=None, is_cancelled=None):
+        """Diff a table against its counterpart in another database file; worker-safe."""
+        conn = self.open_connection(read_only=True)
+        try:
+            return compare_tables(conn, table_name, other_path, other_table,
+                                  progress_callback=progress_callback, is_cancelled=is_cancelled)
+        finally:
+            conn.close()
+
+    def clone_table(self, table_name, new_name, with_data=True, target_path=None,
+                    progress_callback=None, is_cancelled=None):
+        """Clone a table inside SQLite on a private connection; worker-safe.
+
+        With ``target_path`` the clone goes into that database file via ATTACH.
+        Returns the triggers that were not cloned, or None if cancelled.
+        """
+        conn = self.open_connection()
+        try:
+            apply_profile(conn, 'bulk_load', self.config['path'])
+            schema = 'main'
+            if target_path:
+                conn.execute('ATTACH DATABASE ? AS target', (target_path,))
+                schema = 'target'
+            return clone_table(conn, table_name, new_name, with_data, schema,
+                               progress_callback=progress_callback, is_cancelled=is_cancelled)
+        finally:
+            conn.close()
+
+    def list_indexes(self, table_name):
+        try:
+            return list_indexes(self.conn, table_name)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to list indexes: {str(e)}")
+            raise
+
+    def index_size(self, name):
+        return index_size(self.conn, name)
+
+    def suggest_indexes(self, table_name, progress_callback=None, is_cancelled=None):
+        """Index suggestions for the queries recorded against ``table_name``; worker-safe."""
+        conn = self.open_connection(read_only=True)
+        try:
+            return suggest_indexes(conn, self.workload, table_name)
+        finally:
+            conn.close()
+
+    def create_index(self, table_name, columns, name=None, unique=False,
+                     progress_callback=None, is_cancelled=None):
+        """Build an index on a private connection so the UI stays responsive; worker-safe."""
+        conn = self.open_connection()
+        try:
+            return create_index(conn, table_name, columns, name, unique, is_cancelled=is_cancelled)
+        finally:
+            conn.close()
+
+    def drop_index(self, index_name):
+        try:
+            self.conn.execute(f'DROP INDEX "{index_name}"')
+            self.conn.commit()
+            logger.info(f"Index '{index_name}' dropped")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to drop index: {str(e)}")
+            raise
+
     def update_record(self, table_name, primary_key_col, primary_key_value, column_name, new_value):
         try:
             cursor = self.conn.cursor()
@@ -107,6 +639,19 @@ class DatabaseController:
             logger.error(f"Optimization failed: {str(e)}")
             return False
 
+    @timed
+    def check_integrity(self, full=False, baseline=None, progress_callback=None, is_cancelled=None):
+        """Per-table quick_check (or integrity_check) and foreign_key_check on a read-only connection.
+
+        Safe to call from a worker thread. Pass the ``digests`` of an earlier
+        report as ``baseline`` to skip tables whose pages have not changed.
+        """
+        conn = self.open_connection(read_only=True)
+        try:
+            return check_database(conn, self.config['path'], full, baseline, progress_callback, is_cancelled)
+        finally:
+            conn.close()
+
     def drop_table(self, table_name):
         try:
             with self.conn:
@@ -126,72 +671,314 @@ class DatabaseController:
             logger.error(f"Rename table failed: {str(e)}")
             return False
 
-    def remove_column(self, table_name, column_name):
+    def schema_edit(self, table_name):
+        """Start a batch of column changes to ``table_name``; see SchemaEdit."""
+        return SchemaEdit(self.conn, table_name)
+
+    def apply_schema_edit(self, edit, progress_callback=None, is_cancelled=None):
+        """Apply a SchemaEdit on a private connection so a large rebuild can run on a worker.
+
+        Call schema_changed() on the main thread afterwards.
+        """
+        conn = self.open_connection()
         try:
-            with self.conn:
-                # SQLite doesn't support DROP COLUMN directly
-                cols = [col for col in self.get_schema(table_name) if col['name'] != column_name]
-                cols_sql = ', '.join([f'"{col["name"]}" {col["type"]}' for col in cols])
+            apply_profile(conn, 'bulk_load', self.config['path'])
+            return edit.apply(conn, progress_callback, is_cancelled)
+        finally:
+            conn.close()
 
-                self.conn.execute(f'ALTER TABLE "{table_name}" RENAME TO temp_table')
-                self.conn.execute(f'CREATE TABLE "{table_name}" ({cols_sql})')
-                self.conn.execute(
-                    f'INSERT INTO "{table_name}" SELECT {",".join([col["name"] for col in cols])} FROM temp_table')
-                self.conn.execute('DROP TABLE temp_table')
+    def schema_changed(self):
+        """Forget undo history, whose snapshots refer to the old columns."""
+        self.undo_stack.clear(self.conn)
+
+    def remove_column(self, table_name, column_name):
+        try:
+            self.conn.commit()
+            edit = self.schema_edit(table_name)
+            edit.drop_column(column_name)
+            edit.apply(self.conn)
+            self.schema_changed()
             return True
-        except sqlite3.Error as e:
+        except (sqlite3.Error, ValueError) as e:
             logger.error(f"Remove column failed: {str(e)}")
             return False
 
     def rename_column(self, table_name, old_name, new_name):
         try:
-            with self.conn:
-                # SQLite doesn't support RENAME COLUMN directly
-                schema = self.get_schema(table_name)
-                cols_sql = ', '.join([
-                    f'"{col["name"] if col["name"] != old_name else new_name}" {col["type"]}'
-                    for col in schema
-                ])
-
-                self.conn.execute(f'ALTER TABLE "{table_name}" RENAME TO temp_table')
-                self.conn.execute(f'CREATE TABLE "{table_name}" ({cols_sql})')
-                self.conn.execute(f'INSERT INTO "{table_name}" SELECT * FROM temp_table')
-                self.conn.execute('DROP TABLE temp_table')
+            self.conn.commit()
+            edit = self.schema_edit(table_name)
+            edit.rename_column(old_name, new_name)
+            edit.apply(self.conn)
+            self.schema_changed()
             return True
-        except sqlite3.Error as e:
+        except (sqlite3.Error, ValueError) as e:
             logger.error(f"Rename column failed: {str(e)}")
             return False
 
     def get_schema(self, table_name):
         try:
-            cursor = self.conn.execute(f'PRAGMA table_info("{table_name}")')
-            return [dict(row) for row in cursor.fetchall()]
+            return self.catalog.table_info(self.conn, table_name)
         except sqlite3.Error as e:
             logger.error(f"Get schema failed: {str(e)}")
             return []
 
+    @timed
     def batch_insert(self, table_name, data):
         try:
-            with self.conn:
+            token = self.change_token()
+            changes = self.conn.total_changes
+            with self.tuned_for('import'), self.conn:
                 columns = self.get_schema(table_name)
                 col_names = [col['name'] for col in columns if col['name'].lower() != 'id']
                 placeholders = ', '.join(['?' for _ in col_names])
-                insert_sql = f'INSERT INTO "{table_name}" ({", ".join(col_names)}) VALUES ({placeholders})'
+                names_sql = ', '.join(f'"{name}"' for name in col_names)
+                insert_sql = f'INSERT INTO "{table_name}" ({names_sql}) VALUES ({placeholders})'
 
-                for row in data:
-                    values = [row.get(col) for col in col_names]
-                    self.conn.execute(insert_sql, values)
+                self.conn.executemany(insert_sql, ([row.get(col) for col in col_names] for row in data))
+            self._track_row_delta(table_name, token, self.conn.total_changes - changes)
             return True
         except sqlite3.Error as e:
             logger.error(f"Batch insert failed: {str(e)}")
             return False
 
-    def execute(self, query):
+    @timed
+    def import_file(self, table_name, path, chunk_size=5000, progress_callback=None, is_cancelled=None):
+        """Stream records from a CSV, JSON or NDJSON file into a table; worker-safe.
+
+        Records are parsed incrementally and inserted with one ``executemany``
+        per chunk inside a single transaction, so memory use does not depend on
+        the file size. ``.gz``/``.xz``/``.bz2`` files are decompressed on a
+        separate thread. Progress is reported in KiB of the file read. Returns
+        transfer stats, or None if cancelled (nothing is kept).
+        """
+        fmt = detect_format(path)
+        started = time.perf_counter()
+        total_kb = max(1, os.path.getsize(path) // 1024)
+
+        conn = self.open_connection()
         try:
+            apply_profile(conn, 'bulk_load', self.config['path'])
+            # ``id`` is left to SQLite, as in batch_insert
+            col_names = [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')
+                         if row[1].lower() != 'id']
+            names_sql = ', '.join(f'"{name}"' for name in col_names)
+            insert_sql = f'INSERT INTO "{table_name}" ({names_sql}) VALUES ({", ".join("?" for _ in col_names)})'
+            text, raw = open_text(path, 'r')
+            inserted = 0
+            with text, conn:
+                for records in chunked(iter_records(text, fmt), chunk_size):
+                    if is_cancelled and is_cancelled():
+                        conn.rollback()
+                        logger.info(f"Import into '{table_name}' cancelled")
+                        return None
+                    conn.executemany(insert_sql, ([record.get(col) for col in col_names] for record in records))
+                    inserted += len(records)
+                    if progress_callback:
+                        progress_callback(min(raw.tell() // 1024, total_kb), total_kb)
+            stats = transfer_stats(inserted, os.path.getsize(path), time.perf_counter() - started)
+            logger.info(f"Imported {inserted} rows from {path} into '{table_name}' "
+                        f"({stats['rows_per_sec']:,.0f} rows/s, {stats['bytes_per_sec'] / MB:.1f} MB/s in)")
+            return stats
+        finally:
+            conn.close()
+
+    @timed
+    def import_new_table(self, table_name, path, workers=None, progress_callback=None, is_cancelled=None):
+        """Create ``table_name`` from a CSV file with column types inferred from a sample; worker-safe.
+
+        Records are parsed and converted in worker processes and inserted by
+        this thread (see ``load_csv``). The table is created in the same
+        transaction as the rows, so a cancelled or failed import leaves
+        nothing behind. Returns transfer stats plus the inferred ``columns``
+        as ``[(name, type)]``, or None if cancelled.
+        """
+        started = time.perf_counter()
+        columns, types, ranges = infer_schema(path)
+        conn = self.open_connection()
+        try:
+            apply_profile(conn, 'bulk_load', self.config['path'])
+            columns_sql = ', '.join('"' + name.replace('"', '""') + f'" {kind}' for name, kind in zip(columns, types))
+            with conn:
+                conn.execute('BEGIN')  # sqlite3 would otherwise commit the CREATE TABLE on its own
+                conn.execute(f'CREATE TABLE "{table_name}" ({columns_sql})')
+                inserted = load_csv(conn, path, table_name, columns, types, ranges, workers,
+                                    progress_callback, is_cancelled)
+                if inserted is None:
+                    conn.rollback()
+                    logger.info(f"Import into new table '{table_name}' cancelled")
+                    return None
+            stats = transfer_stats(inserted, os.path.getsize(path), time.perf_counter() - started)
+            stats['columns'] = list(zip(columns, types))
+            logger.info(f"Imported {inserted} rows from {path} into new table '{table_name}' "
+                        f"({stats['rows_per_sec']:,.0f} rows/s, {stats['bytes_per_sec'] / MB:.1f} MB/s in)")
+            return stats
+        finally:
+            conn.close()
+
+    @timed
+    def export_table(self, table_name, path, chunk_size=5000, progress_callback=None, is_cancelled=None):
+        """Stream a table to a CSV, JSON or NDJSON file with ``fetchmany``; worker-safe.
+
+        A ``.gz``/``.xz``/``.bz2`` suffix compresses the output on a separate
+        thread while rows are still being fetched. Returns transfer stats, or
+        None if cancelled (the partial file is removed).
+        """
+        fmt = detect_format(path)
+        started = time.perf_counter()
+        conn = self.open_connection(read_only=True)
+        try:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+            try:
+                total = conn.execute(f'SELECT max(rowid) FROM "{table_name}"').fetchone()[0] or 0
+            except sqlite3.Error:
+                total = 0  # WITHOUT ROWID: no cheap estimate; progress just follows the rows written
+            cols_sql = ', '.join(f'"{name}"' for name in columns)
+            cursor = conn.execute(f'SELECT {cols_sql} FROM "{table_name}"')
+            written = 0
+
+            def chunks():
+                while rows := cursor.fetchmany(chunk_size):
+                    if is_cancelled and is_cancelled():
+                        return
+                    yield [tuple(row) for row in rows]
+
+            def on_chunk(rows):
+                nonlocal written
+                written += len(rows)
+                if progress_callback:
+                    progress_callback(written, max(total, written))
+
+            text, _ = open_text(path, 'w')
+            with text:
+                write_records(text, fmt, columns, chunks(), on_chunk)
+            if is_cancelled and is_cancelled():
+                os.remove(path)
+                logger.info(f"Export of '{table_name}' cancelled")
+                return None
+            stats = transfer_stats(written, os.path.getsize(path), time.perf_counter() - started)
+            logger.info(f"Exported {written} rows from '{table_name}' to {path} "
+                        f"({stats['rows_per_sec']:,.0f} rows/s, {stats['bytes_per_sec'] / MB:.1f} MB/s out)")
+            return stats
+        finally:
+            conn.close()
+
+    @timed
+    def dump_sql(self, path, tables=None, batch_rows=500, progress_callback=None, is_cancelled=None):
+        """Stream a SQL script for ``tables`` (default: the whole database) to ``path``; worker-safe.
+
+        A ``.gz``/``.xz``/``.bz2`` suffix compresses the script. Returns
+        transfer stats, or None if cancelled (the partial file is removed).
+        """
+        started = time.perf_counter()
+        conn = self.open_connection(read_only=True)
+        try:
+            text, _ = open_text(path, 'w')
+            with text:
+                # One read transaction, so the script is a consistent snapshot
+                conn.execute('BEGIN')
+                written = dump_sql(conn, text, tables, batch_rows, progress_callback, is_cancelled)
+                conn.rollback()
+            if written is None:
+                os.remove(path)
+                logger.info("SQL dump cancelled")
+                return None
+            stats = transfer_stats(written, os.path.getsize(path), time.perf_counter() - started)
+            logger.info(f"Dumped {written} rows to {path} "
+                        f"({stats['rows_per_sec']:,.0f} rows/s, {stats['bytes_per_sec'] / MB:.1f} MB/s out)")
+            return stats
+        finally:
+            conn.close()
+
+    RESTORE_TRANSACTION_BYTES = 256 * MB
+
+    @timed
+    def restore_sql(self, path, target_path=None, progress_callback=None, is_cancelled=None):
+        """Run a SQL script against this database, or ``target_path``, with the bulk_load profile; worker-safe.
+
+        The script's own BEGIN/COMMIT are ignored; statements run in
+        transactions of about RESTORE_TRANSACTION_BYTES of SQL, and PRAGMAs
+        between them. Progress is reported in KiB of the file read. On error
+        or cancel the current transaction is rolled back, but earlier ones
+        stay committed. Returns transfer stats (``rows`` counts statements),
+        or None if cancelled.
+        """
+        started = time.perf_counter()
+        total_kb = max(1, os.path.getsize(path) // 1024)
+        target = target_path or self.config['path']
+        conn = sqlite3.connect(target, check_same_thread=False, isolation_level=None)
+        try:
+            apply_profile(conn, 'bulk_load', target)
+            text, raw = open_text(path, 'r')
+            executed = pending = 0
+            with text:
+                conn.execute('BEGIN')
+                try:
+                    for statement in iter_statements(text):
+                        if is_cancelled and is_cancelled():
+                            conn.execute('ROLLBACK')
+                            logger.info(f"Restore from {path} cancelled after {executed} statements")
+                            return None
+                        if TRANSACTION_CONTROL.match(statement):
+                            continue
+                        if PRAGMA.match(statement):
+                            # Most PRAGMAs (e.g. foreign_keys) have no effect inside a transaction
+                            conn.execute('COMMIT')
+                            conn.execute(statement)
+                            conn.execute('BEGIN')
+                            continue
+                        try:
+                            conn.execute(statement)
+                        except sqlite3.Error as e:
+                            raise type(e)(f"{str(e)} (statement {executed + 1}: {statement[:120]})") from e
+                        executed += 1
+                        pending += len(statement)
+                        if pending >= self.RESTORE_TRANSACTION_BYTES:
+                            conn.execute('COMMIT')
+                            conn.execute('BEGIN')
+                            pending = 0
+                        if progress_callback and executed % 100 == 0:
+                            progress_callback(min(raw.tell() // 1024, total_kb), total_kb)
+                    conn.execute('COMMIT')
+                except Exception:
+                    if conn.in_transaction:
+                        conn.execute('ROLLBACK')
+                    raise
+            stats = transfer_stats(executed, os.path.getsize(path), time.perf_counter() - started)
+            logger.info(f"Restored {executed} statements from {path} "
+                        f"({stats['bytes_per_sec'] / MB:.1f} MB/s in)")
+            return stats
+        finally:
+            conn.close()
+
+    def set_query_cache(self, max_mb):
+        """Enable the SELECT result cache with a budget of ``max_mb`` megabytes (0 disables it)."""
+        self.query_cache = QueryCache(int(max_mb * 1024 * 1024)) if max_mb else None
+
+    def set_row_cache(self, max_mb):
+        """Budget for the row blocks shared by all open tabs, in megabytes (0 disables the cache)."""
+        self.row_cache = RowBlockCache(int(max_mb * 1024 * 1024)) if max_mb else None
+
+    def execute(self, query, params=(), use_cache=True):
+        try:
+            head = query.split(None, 1)[0].upper() if query.strip() else ''
+            if head in ('SELECT', 'WITH'):
+                self.workload.record(query, params)
+            cacheable = use_cache and self.query_cache is not None and is_cacheable(query)
+            if cacheable:
+                key = QueryCache.key(query, params)
+                token = self.change_token()
+                rows = self.query_cache.get(key, token)
+                if rows is not None:
+                    logger.debug(f"Query cache hit: {key[0][:80]}")
+                    return list(rows)
+
             with self.conn:
-                cursor = self.conn.execute(query)
-                if query.strip().upper().startswith('SELECT'):
-                    return cursor.fetchall()
+                cursor = self.conn.execute(query, params)
+                if cursor.description is not None:
+                    rows = cursor.fetchall()
+                    if cacheable:
+                        self.query_cache.put(key, token, rows)
+                    return rows
                 return cursor.rowcount
         except sqlite3.Error as e:
             logger.error(f"Query execution failed: {str(e)}")
@@ -0,0 +1,261 @@
+import csv
+import io
+import logging
+import multiprocessing
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from app.utils.database.transfer import CODECS, READ_SIZE, chunked, open_text
+
+logger = logging.getLogger(__name__)
+
+CHUNK_BYTES = 4 * 1024 * 1024
+SAMPLE_ROWS = 2000
+SAMPLE_BYTES = 64 * 1024
+MAX_SAMPLE_CHUNKS = 32
+INTEGER = re.compile(r'[+-]?(0|[1-9][0-9]*)')
+REAL = re.compile(r'[+-]?((0|[1-9][0-9]*)(\.[0-9]*)?|\.[0-9]+)([eE][+-]?[0-9]+)?')
+MAX_INTEGER = 2 ** 63 - 1
+
+
+def _record_ends(f, start, step):
+    """Yield offsets just past a newline outside quotes, each at least ``step`` bytes after the last.
+
+    Quote parity is tracked with ``bytes.count``, so finding record boundaries
+    costs one fast pass over the file even when fields contain newlines.
+    Doubled quotes inside a field leave the parity unchanged, as they should.
+    """
+    f.seek(start)
+    pos, odd, target = start, False, start + step
+    while block := f.read(READ_SIZE):
+        offset = 0
+        while target < pos + len(block):
+            skip = max(target - pos, offset)
+            odd ^= block.count(b'"', offset, skip) % 2 == 1
+            newline = block.find(b'\n', skip)
+            if newline < 0:
+                offset = skip
+                break
+            odd ^= block.count(b'"', skip, newline) % 2 == 1
+            offset = newline + 1
+            if odd:
+                target = pos + offset  # newline inside a quoted field; try the next one
+            else:
+                yield pos + offset
+                target = pos + offset + step
+        odd ^= block.count(b'"', offset) % 2 == 1
+        pos += len(block)
+
+
+def chunk_ranges(path, start, chunk_bytes=CHUNK_BYTES):
+    """``[(start, end)]`` byte ranges of about ``chunk_bytes`` that each hold whole CSV records"""
+    size = os.path.getsize(path)
+    ranges = []
+    with open(path, 'rb') as f:
+        for end in _record_ends(f, start, chunk_bytes):
+            if end >= size:
+                break
+            ranges.append((start, end))
+            start = end
+    if start < size:
+        ranges.append((start, size))
+    return ranges
+
+
+def column_names(header):
+    """Header fields as unique, non-empty column names"""
+    names, seen = [], set()
+    for i, name in enumerate(header, 1):
+        name = name.strip() or f'column_{i}'
+        base, n = name, 1
+        while name.lower() in seen:
+            n += 1
+            name = f'{base}_{n}'
+        seen.add(name.lower())
+        names.append(name)
+    return names
+
+
+def infer_type(values):
+    """INTEGER, REAL or TEXT for a column from sample values; empty strings are ignored.
+
+    Integers with leading zeros (e.g. ZIP codes) or outside SQLite's 64-bit
+    range keep the column TEXT so no value is changed by the conversion.
+    """
+    kind = None
+    for value in values:
+        value = value.strip()
+        if not value:
+            continue
+        if INTEGER.fullmatch(value) and abs(int(value)) <= MAX_INTEGER:
+            kind = kind or 'INTEGER'
+        elif REAL.fullmatch(value):
+            kind = 'REAL'
+        else:
+            return 'TEXT'
+    return kind or 'TEXT'
+
+
+def _integer(value):
+    if INTEGER.fullmatch(value):
+        number = int(value)
+        if abs(number) <= MAX_INTEGER:
+            return number
+    return value or None
+
+
+def _real(value):
+    if REAL.fullmatch(value):
+        return float(value)
+    return value or None
+
+
+CONVERTERS = {'INTEGER': _integer, 'REAL': _real, 'TEXT': str}
+
+
+def convert_rows(records, types):
+    """Row tuples from csv records, padded or cut to the columns and converted by type.
+
+    A value that does not match its inferred type is kept as text rather
+    than lost; empty numeric fields become NULL.
+    """
+    width = len(types)
+    converters = [CONVERTERS[kind] for kind in types]
+    rows = []
+    for record in records:
+        if not record:
+            continue  # blank line, skipped as csv.DictReader does
+        if len(record) != width:
+            record = (record + [''] * width)[:width]
+        rows.append(tuple([convert(value.strip() if convert is not str else value)
+                           for convert, value in zip(converters, record)]))
+    return rows
+
+
+def parse_range(path, start, end, types):
+    """Read, parse and convert one byte range; runs in a worker process"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        text = f.read(end - start).decode('utf-8')
+    return convert_rows(csv.reader(io.StringIO(text, newline='')), types), end - start
+
+
+def _read_header(path):
+    with open(path, 'rb') as f:
+        header_end = next(_record_ends(f, 0, 0), os.path.getsize(path))
+        f.seek(0)
+        text = f.read(header_end).decode('utf-8-sig')
+    header = next(csv.reader(io.StringIO(text, newline='')), [])
+    return header, header_end
+
+
+def _sample_range(f, start, end):
+    """Records from the first SAMPLE_BYTES of a range, cut at a record boundary"""
+    cut = min(next(_record_ends(f, start, SAMPLE_BYTES), end), end)
+    f.seek(start)
+    return list(csv.reader(io.StringIO(f.read(cut - start).decode('utf-8'), newline='')))
+
+
+def infer_schema(path, sample_rows=SAMPLE_ROWS):
+    """``(columns, types, ranges)`` for a CSV file; ``ranges`` is None for compressed files.
+
+    Plain files are sampled from up to MAX_SAMPLE_CHUNKS chunks spread over
+    the whole file, not just its head, so a column that only turns out to be
+    text far down the file is still typed TEXT. Compressed files cannot be
+    split or seeked, so only their first ``sample_rows`` records are used.
+    """
+    if os.path.splitext(path.lower())[1] in CODECS:
+        text, _ = open_text(path, 'r')
+        with text:
+            reader = csv.reader(text)
+            header = next(reader, [])
+            sample = [record for record in next(chunked(reader, sample_rows), []) if record]
+        ranges = None
+    else:
+        header, header_end = _read_header(path)
+        ranges = chunk_ranges(path, header_end)
+        picks = ranges[::max(1, len(ranges) // MAX_SAMPLE_CHUNKS)][:MAX_SAMPLE_CHUNKS]
+        per_chunk = max(1, sample_rows // max(1, len(picks)))
+        sample = []
+        with open(path, 'rb') as f:
+            for start, end in picks:
+                sample += [record for record in _sample_range(f, start, end) if record][:per_chunk]
+    if not header:
+        raise ValueError("The CSV file has no header row")
+    columns = column_names(header)
+    types = [infer_type(record[i] for record in sample if i < len(record)) for i in range(len(columns))]
+    return columns, types, ranges
+
+
+def _parallel_chunks(path, ranges, types, workers, is_cancelled):
+    """Yield ``(rows, bytes)`` per range in file order, parsed by a process pool.
+
+    At most two ranges per worker are in flight, so parsed rows never pile up
+    faster than the writer can insert them. ``spawn`` is used because forking
+    a process that runs Qt and worker threads is not safe.
+    """
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(workers, mp_context=context) as pool:
+        pending = deque()
+        remaining = iter(ranges)
+        try:
+            while True:
+                while len(pending) < workers * 2 and (item := next(remaining, None)):
+                    pending.append(pool.submit(parse_range, path, *item, types))
+                if not pending or (is_cancelled and is_cancelled()):
+                    return
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def _serial_chunks(path, ranges, types, chunk_rows=5000):
+    if ranges is not None:
+        for start, end in ranges:
+            yield parse_range(path, start, end, types)
+        return
+    text, raw = open_text(path, 'r')
+    with text:
+        reader = csv.reader(text)
+        next(reader, None)
+        read = 0
+        for records in chunked(reader, chunk_rows):
+            yield convert_rows(records, types), raw.tell() - read
+            read = raw.tell()
+
+
+def load_csv(conn, path, table_name, columns, types, ranges, workers=None,
+             progress_callback=None, is_cancelled=None):
+    """Insert a CSV file's records into an existing table; returns rows inserted, or None if cancelled.
+
+    Ranges are parsed and converted by ``workers`` processes (default: one per
+    core) while this thread, the only writer, inserts each chunk with
+    ``executemany`` in file order. Small files, compressed files and
+    ``workers=1`` are parsed in this process. The caller owns the transaction.
+    """
+    workers = workers or os.cpu_count() or 1
+    total = os.path.getsize(path)
+    if ranges is not None and len(ranges) < 2:
+        workers = 1
+    if workers > 1 and ranges is not None:
+        chunks = _parallel_chunks(path, ranges, types, min(workers, len(ranges)), is_cancelled)
+    else:
+        chunks = _serial_chunks(path, ranges, types)
+
+    names_sql = ', '.join('"' + name.replace('"', '""') + '"' for name in columns)
+    insert_sql = f'INSERT INTO "{table_name}" ({names_sql}) VALUES ({", ".join("?" for _ in columns)})'
+    inserted = done = 0
+    for rows, size in chunks:
+        if is_cancelled and is_cancelled():
+            return None
+        conn.executemany(insert_sql, rows)
+        inserted += len(rows)
+        done += size
+        if progress_callback:
+            progress_callback(min(done, total) // 1024, max(1, total // 1024))
+    if is_cancelled and is_cancelled():
+        return None
+    return inserted
@@ -0,0 +1,210 @@
+import logging
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+HASH_MASK = (1 << 63) - 1
+LOW_32 = (1 << 32) - 1
+
+
+def _row_hash(*values):
+    # Both sides are hashed in the same process, so Python's (C-speed) tuple hash is
+    # consistent between them; 63 bits keep SUM() of halves well inside int64.
+    return hash(values) & HASH_MASK
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _key_columns(conn, schema, table_name):
+    """``(names, numeric)``: the declared primary key columns, else rowid.
+
+    ``numeric`` is True for rowid and a single INTEGER PRIMARY KEY, whose
+    ranges can be split arithmetically.
+    """
+    pk = sorted((col for col in conn.execute(f'PRAGMA {schema}.table_info("{table_name}")') if col[5]),
+                key=lambda col: col[5])
+    if not pk:
+        return ['rowid'], True
+    return [col[1] for col in pk], len(pk) == 1 and pk[0][2].upper() == 'INTEGER'
+
+
+def sort_key(key):
+    """Orders keys the way SQLite does (NULL, numbers, text, blobs), so mixed types never clash"""
+    if isinstance(key, tuple):
+        return tuple(sort_key(value) for value in key)
+    if key is None:
+        return (0, 0)
+    if isinstance(key, (int, float)):
+        return (1, key)
+    return (2, key) if isinstance(key, str) else (3, key)
+
+
+class TableDiff:
+    """Merkle-style comparison of ``main.<table>`` against ``cmp.<other_table>``.
+
+    The key range is split into ``fanout`` sub-ranges whose row count and
+    hash sums are computed in SQL on both sides; only ranges that differ are
+    split again, down to ``leaf_rows`` rows, where the actual rows are read
+    and compared. Identical stretches of the table are hashed exactly once.
+
+    Rows are keyed by the declared primary key, else rowid. Integer keys are
+    split arithmetically; text and composite keys are split at every n-th
+    key of the larger side, found in one ordered pass over the range.
+    """
+
+    def __init__(self, conn, table_name, other_table=None, fanout=64, leaf_rows=256,
+                 max_details=10000, progress_callback=None, is_cancelled=None):
+        self.conn = conn
+        self.table_name = table_name
+        self.other_table = other_table or table_name
+        self.fanout = fanout
+        self.leaf_rows = leaf_rows
+        self.max_details = max_details
+        self.progress_callback = progress_callback
+        self.is_cancelled = is_cancelled
+        self.rows_hashed = 0
+
+        ours = [row[1] for row in conn.execute(f'PRAGMA main.table_info("{table_name}")')]
+        theirs = [row[1] for row in conn.execute(f'PRAGMA cmp.table_info("{self.other_table}")')]
+        if not theirs:
+            raise ValueError(f"Table '{self.other_table}' not found in the other database")
+        self.columns = [name for name in ours if name in theirs]
+        self.added_columns = [name for name in ours if name not in theirs]
+        self.removed_columns = [name for name in theirs if name not in ours]
+        self.keys, self.numeric = _key_columns(conn, 'main', table_name)
+        self.key = ', '.join(self.keys)
+        self.key_sql = 'rowid' if self.keys == ['rowid'] else ', '.join(_quote(name) for name in self.keys)
+
+        self.result = {
+            'key': self.key,
+            'columns': self.columns,
+            'added_columns': self.added_columns,
+            'removed_columns': self.removed_columns,
+            'inserted': [], 'deleted': [], 'changed': [],
+            'counts': {'inserted': 0, 'deleted': 0, 'changed': 0},
+        }
+
+    def _source(self, side):
+        return f'main."{self.table_name}"' if side == 'main' else f'cmp."{self.other_table}"'
+
+    def _range(self, lo, hi):
+        """WHERE clause and parameters for ``lo <= key < hi``; None bounds are open (key ranges only)"""
+        if self.numeric:
+            return f'{self.key_sql} >= ? AND {self.key_sql} < ?', (lo, hi)
+        placeholders = ', '.join('?' for _ in self.keys)
+        clauses, params = [], []
+        if lo is not None:
+            clauses.append(f'({self.key_sql}) >= ({placeholders})')
+            params += lo
+        if hi is not None:
+            clauses.append(f'({self.key_sql}) < ({placeholders})')
+            params += hi
+        return ' AND '.join(clauses) or '1', tuple(params)
+
+    def _summary(self, side, lo, hi):
+        # LIMIT -1 stops SQLite flattening the subquery, which would call row_hash() once per SUM
+        cols_sql = ', '.join(f'"{name}"' for name in self.columns)
+        where, params = self._range(lo, hi)
+        row = self.conn.execute(
+            f'SELECT COUNT(*), SUM(h & {LOW_32}), SUM(h >> 32) FROM '
+            f'(SELECT row_hash({self.key_sql}, {cols_sql}) AS h FROM {self._source(side)} '
+            f'WHERE {where} LIMIT -1)', params).fetchone()
+        self.rows_hashed += row[0]
+        return tuple(row)
+
+    def _rows(self, side, lo, hi):
+        cols_sql = ', '.join(f'"{name}"' for name in self.columns)
+        where, params = self._range(lo, hi)
+        cursor = self.conn.execute(
+            f'SELECT {self.key_sql}, {cols_sql} FROM {self._source(side)} WHERE {where}', params)
+        width = len(self.keys)
+        if width == 1:
+            return {row[0]: tuple(row)[1:] for row in cursor}
+        return {tuple(row[:width]): tuple(row)[width:] for row in cursor}
+
+    def _record(self, kind, item):
+        self.result['counts'][kind] += 1
+        if len(self.result[kind]) < self.max_details:
+            self.result[kind].append(item)
+
+    def _compare_leaf(self, lo, hi):
+        ours, theirs = self._rows('main', lo, hi), self._rows('cmp', lo, hi)
+        for key in sorted(ours.keys() | theirs.keys(), key=sort_key):
+            if key not in theirs:
+                self._record('inserted', (key, ours[key]))
+            elif key not in ours:
+                self._record('deleted', (key, theirs[key]))
+            elif ours[key] != theirs[key]:
+                self._record('changed', (key, theirs[key], ours[key]))
+
+    def _split(self, lo, hi):
+        width = -(-(hi - lo) // self.fanout)
+        return [(start, min(start + width, hi)) for start in reversed(range(lo, hi, width))]
+
+    def _split_keys(self, lo, hi, side, rows):
+        """Sub-ranges of a key range holding about ``rows / fanout`` of ``side``'s rows each, last first"""
+        where, params = self._range(lo, hi)
+        step = max(1, -(-rows // self.fanout))
+        cursor = self.conn.execute(
+            f'SELECT {self.key_sql} FROM (SELECT {self.key_sql}, row_number() OVER (ORDER BY {self.key_sql}) '
+            f'AS __rn FROM {self._source(side)} WHERE {where}) WHERE __rn % ? = 0', (*params, step))
+        bounds = [lo, *(tuple(row) for row in cursor), hi]
+        return [(start, end) for start, end in reversed(list(zip(bounds, bounds[1:]))) if start != end]
+
+    def _root(self):
+        """The first ranges to hash, or None if both tables are empty"""
+        if self.numeric:
+            bounds = self.conn.execute(
+                f'SELECT min(lo), max(hi) FROM ('
+                f'SELECT min({self.key_sql}) AS lo, max({self.key_sql}) AS hi FROM {self._source("main")} '
+                f'UNION ALL SELECT min({self.key_sql}), max({self.key_sql}) FROM {self._source("cmp")})').fetchone()
+            return self._split(bounds[0], bounds[1] + 1) if bounds[0] is not None else None
+        counts = {side: self.conn.execute(f'SELECT COUNT(*) FROM {self._source(side)}').fetchone()[0]
+                  for side in ('main', 'cmp')}
+        side = max(counts, key=counts.get)
+        return self._split_keys(None, None, side, counts[side]) if counts[side] else None
+
+    def run(self):
+        # The root is split straight away: hashing it first would cost a full pass and
+        # the children have to be hashed anyway whenever anything differs.
+        pending = self._root()
+        if not pending:
+            return self.result
+
+        while pending:
+            if self.is_cancelled and self.is_cancelled():
+                return None
+            lo, hi = pending.pop()
+            ours, theirs = self._summary('main', lo, hi), self._summary('cmp', lo, hi)
+            if ours == theirs:
+                continue
+            if max(ours[0], theirs[0]) <= self.leaf_rows or self.numeric and hi - lo <= 1:
+                self._compare_leaf(lo, hi)
+                continue
+
+            if self.numeric:
+                pending.extend(self._split(lo, hi))
+            else:
+                side = 'main' if ours[0] >= theirs[0] else 'cmp'
+                pending.extend(self._split_keys(lo, hi, side, max(ours[0], theirs[0])))
+            if self.progress_callback:
+                self.progress_callback(self.rows_hashed, 0)
+
+        logger.info(f"Compared '{self.table_name}': {self.result['counts']} ({self.rows_hashed} rows hashed)")
+        return self.result
+
+
+def compare_tables(conn, table_name, other_path, other_table=None, progress_callback=None, is_cancelled=None):
+    """Compare a table on ``conn`` with the same (or ``other_table``) in another database file.
+
+    ``conn`` must have been opened with ``uri=True`` so the other file can be attached read-only.
+    """
+    conn.create_function('row_hash', -1, _row_hash, deterministic=True)
+    conn.execute('ATTACH DATABASE ? AS cmp', (Path(other_path).resolve().as_uri() + '?mode=ro',))
+    try:
+        return TableDiff(conn, table_name, other_table, progress_callback=progress_callback,
+                         is_cancelled=is_cancelled).run()
+    finally:
+        conn.execute('DETACH DATABASE cmp')
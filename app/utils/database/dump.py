@@ -0,0 +1,164 @@
+import logging
+import math
+import re
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+MAX_STATEMENT_BYTES = 1024 * 1024
+TRANSACTION_CONTROL = re.compile(r'^\s*(BEGIN|COMMIT|END|ROLLBACK)\b(?!\s+TO\b)', re.IGNORECASE)
+PRAGMA = re.compile(r'^\s*PRAGMA\b', re.IGNORECASE)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def sql_value(value):
+    """SQL literal for a value read from SQLite"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if math.isinf(value):
+            return '1e999' if value > 0 else '-1e999'
+        return repr(value)
+    if isinstance(value, bytes):
+        return f"X'{value.hex()}'"
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _shadow_tables(conn):
+    # Shadow tables (e.g. FTS5 internals) are recreated by CREATE VIRTUAL TABLE
+    try:
+        return {row[1] for row in conn.execute('PRAGMA table_list') if row[0] == 'main' and row[2] == 'shadow'}
+    except sqlite3.Error:
+        return set()
+
+
+def _write_rows(conn, f, table_name, batch_rows, on_rows, is_cancelled):
+    columns = [row[1] for row in conn.execute(f'PRAGMA table_xinfo({_quote(table_name)})') if row[6] == 0]
+    head = f'INSERT INTO {_quote(table_name)} ({", ".join(_quote(name) for name in columns)}) VALUES\n'
+    cursor = conn.execute(f'SELECT {", ".join(_quote(name) for name in columns)} FROM {_quote(table_name)}')
+    while rows := cursor.fetchmany(batch_rows):
+        if is_cancelled and is_cancelled():
+            return False
+        values, size = [], 0
+        for row in rows:
+            values.append('(' + ','.join(sql_value(value) for value in row) + ')')
+            size += len(values[-1])
+            if size >= MAX_STATEMENT_BYTES:
+                f.write(head + ',\n'.join(values) + ';\n')
+                values, size = [], 0
+        if values:
+            f.write(head + ',\n'.join(values) + ';\n')
+        on_rows(len(rows))
+    return True
+
+
+def dump_sql(conn, f, tables=None, batch_rows=500, progress_callback=None, is_cancelled=None):
+    """Write a script recreating ``tables`` (default: the whole database) to the text stream ``f``.
+
+    Rows are read with ``fetchmany`` and written as multi-row INSERTs of up to
+    ``batch_rows`` rows (and about 1 MB), so memory use does not depend on the
+    table size. Indexes and triggers come after the data, which is faster to
+    restore than keeping them up to date row by row. A single-table dump
+    includes that table's indexes and triggers but no views. Returns the
+    number of rows written, or None if cancelled.
+    """
+    objects = conn.execute(
+        "SELECT type, name, tbl_name, sql FROM sqlite_master WHERE sql IS NOT NULL ORDER BY rowid").fetchall()
+    shadow = _shadow_tables(conn)
+    all_tables = [name for kind, name, _, _ in objects
+                  if kind == 'table' and not name.startswith('sqlite_') and name not in shadow]
+    if tables is None:
+        selected = all_tables
+    else:
+        selected = list(tables)
+        for name in selected:
+            if name not in all_tables:
+                raise ValueError(f"Table '{name}' not found")
+    creates = {name: sql for kind, name, _, sql in objects if kind == 'table'}
+
+    total = 0
+    for name in selected:
+        try:
+            total += conn.execute(f'SELECT max(rowid) FROM {_quote(name)}').fetchone()[0] or 0
+        except sqlite3.Error:
+            pass  # WITHOUT ROWID and virtual tables: progress just runs past the estimate
+    written = 0
+
+    def on_rows(count):
+        nonlocal written
+        written += count
+        if progress_callback:
+            progress_callback(written, max(total, written))
+
+    f.write('PRAGMA foreign_keys=OFF;\nBEGIN TRANSACTION;\n')
+    for name in selected:
+        f.write(f'{creates[name]};\n')
+        if not _write_rows(conn, f, name, batch_rows, on_rows, is_cancelled):
+            return None
+
+    if tables is None and 'sqlite_sequence' in creates:
+        f.write('DELETE FROM "sqlite_sequence";\n')
+        if not _write_rows(conn, f, 'sqlite_sequence', batch_rows, lambda count: None, is_cancelled):
+            return None
+
+    for kind, name, table, sql in objects:
+        if kind in ('index', 'trigger', 'view') and (tables is None or (kind != 'view' and table in selected)):
+            f.write(f'{sql};\n')
+    f.write('COMMIT;\n')
+    return written
+
+
+_TOKEN = re.compile(r"""['"`\[;]|--|/\*""")
+_CLOSE = {"'": "'", '"': '"', '`': '`', '[': ']', '/*': '*/'}
+
+
+def iter_statements(f):
+    """Yield complete SQL statements from a text stream, reading it line by line.
+
+    A small scanner skips quoted text and comments to find candidate
+    semicolons; ``sqlite3.complete_statement`` then decides which of those
+    end a statement, so trigger bodies are handled too. Each line is scanned
+    once, however long the statement it belongs to.
+    """
+    buffer, size, candidates, quote = [], 0, [], None
+    for line in f:
+        pos = 0
+        while True:
+            if quote:
+                end = line.find(_CLOSE[quote], pos)
+                if end < 0:
+                    break
+                pos, quote = end + len(_CLOSE[quote]), None
+            else:
+                match = _TOKEN.search(line, pos)
+                if not match or match.group() == '--':
+                    break
+                pos = match.end()
+                if match.group() == ';':
+                    candidates.append(size + match.start())
+                else:
+                    quote = match.group()
+        buffer.append(line)
+        size += len(line)
+        if not candidates:
+            continue
+
+        text, start = ''.join(buffer), 0
+        for end in candidates:
+            if sqlite3.complete_statement(text[start:end + 1]):
+                statement = text[start:end + 1].strip()
+                if statement != ';':
+                    yield statement
+                start = end + 1
+        # Semicolons that did not end a statement (e.g. inside a trigger) never will
+        text = text[start:]
+        buffer, size, candidates = ([text], len(text), []) if text.strip() else ([], 0, [])
+
+    rest = ''.join(buffer)
+    if any(line.strip() and not line.lstrip().startswith('--') for line in rest.splitlines()):
+        yield rest.strip()  # last statement without its semicolon
@@ -0,0 +1,110 @@
+import re
+from functools import lru_cache
+
+
+@lru_cache(maxsize=64)
+def _compile(pattern):
+    return re.compile(pattern)
+
+
+def _regexp(pattern, value):
+    # SQLite evaluates "X REGEXP Y" as regexp(Y, X)
+    if value is None or isinstance(value, bytes):
+        return False
+    return _compile(pattern).search(str(value)) is not None
+
+
+def _regexp_replace(value, pattern, replacement):
+    if value is None or isinstance(value, bytes):
+        return value  # BLOBs are never searched, so never rewritten through their repr
+    return _compile(pattern).sub(replacement, str(value))
+
+
+def register_functions(conn):
+    conn.create_function('REGEXP', 2, _regexp, deterministic=True)
+    conn.create_function('regexp_replace', 3, _regexp_replace, deterministic=True)
+
+
+def build_search_filter(columns, text):
+    """WHERE clause matching ``text`` anywhere in any of ``columns`` (the search box)."""
+    if not text or not columns:
+        return None, ()
+    pattern = '%' + text.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+    clause = ' OR '.join(f'"{col}" LIKE ? ESCAPE \'\\\'' for col in columns)
+    return f'({clause})', (pattern,) * len(columns)
+
+
+class FindSpec:
+    """Compiles one find/replace request into per-column SQL fragments.
+
+    Literal case-sensitive searches use instr()/REPLACE(), which SQLite runs
+    natively. Case-insensitive and regex searches go through the registered
+    REGEXP and regexp_replace() functions, because REPLACE() is always
+    case-sensitive and would otherwise disagree with LIKE about what matched.
+    """
+
+    def __init__(self, find, replacement='', regex=False, match_case=False):
+        self.find = find
+        self.replacement = replacement
+        self.literal = not regex and match_case
+        if regex:
+            self.pattern = find if match_case else f'(?i){find}'
+            re.compile(self.pattern)  # surface syntax errors before touching the database
+            self.repl = replacement
+        else:
+            self.pattern = f'(?i){re.escape(find)}'
+            self.repl = replacement.replace('\\', '\\\\')
+
+    def match_sql(self, column):
+        # BLOB cells are skipped: instr() would compare raw bytes and REPLACE()
+        # would turn the blob into text.
+        if self.literal:
+            return f'typeof("{column}") != \'blob\' AND instr("{column}", ?) > 0', (self.find,)
+        return f'typeof("{column}") != \'blob\' AND "{column}" REGEXP ?', (self.pattern,)
+
+    def replace_sql(self, column):
+        if self.literal:
+            return f'REPLACE("{column}", ?, ?)', (self.find, self.replacement)
+        return f'regexp_replace("{column}", ?, ?)', (self.pattern, self.repl)
+
+
+def _scope(match, match_params, where, params):
+    if where:
+        return f'({match}) AND ({where})', (*match_params, *params)
+    return match, tuple(match_params)
+
+
+def count_matches(conn, table_name, columns, spec, where=None, params=(),
+                  progress_callback=None, is_cancelled=None):
+    """Dry run: count matching rows for every column in a single table scan."""
+    sums, sum_params = [], []
+    for column in columns:
+        match, match_params = spec.match_sql(column)
+        sums.append(f'COALESCE(SUM({match}), 0)')
+        sum_params.extend(match_params)
+
+    query = f'SELECT {", ".join(sums)} FROM "{table_name}"'
+    if where:
+        query += f' WHERE {where}'
+    row = conn.execute(query, (*sum_params, *params)).fetchone()
+    return dict(zip(columns, row))
+
+
+def replace_all(conn, table_name, columns, spec, snapshot, where=None, params=()):
+    """Run one UPDATE per column; the caller owns the surrounding transaction.
+
+    Old values of every touched cell are captured in ``snapshot`` first.
+    Returns ``{column: rows_changed}``.
+    """
+    changed = {}
+    for column in columns:
+        match, match_params = spec.match_sql(column)
+        scope_sql, scope_params = _scope(match, match_params, where, params)
+        snapshot.capture(conn, column, scope_sql, scope_params)
+
+        expr, expr_params = spec.replace_sql(column)
+        cursor = conn.execute(
+            f'UPDATE "{table_name}" SET "{column}" = {expr} WHERE {scope_sql}',
+            (*expr_params, *scope_params))
+        changed[column] = cursor.rowcount
+    return changed
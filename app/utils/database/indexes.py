@@ -0,0 +1,226 @@
+import logging
+import re
+import sqlite3
+import threading
+
+from app.utils.database.find_replace import register_functions
+
+logger = logging.getLogger(__name__)
+
+_IDENT = r'(?:"(?:[^"]|"")*"|\[[^\]]*\]|`[^`]*`|[A-Za-z_][\w$]*)'
+_COLUMN = rf'(?:{_IDENT}\s*\.\s*)?({_IDENT})'
+_FROM = re.compile(rf'\bFROM\s+(?:{_IDENT}\s*\.\s*)?({_IDENT})', re.IGNORECASE)
+_WHERE = re.compile(r'\bWHERE\b(.*?)(?=\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bHAVING\b|\bWINDOW\b|$)',
+                    re.IGNORECASE | re.DOTALL)
+_ORDER_BY = re.compile(r'\bORDER\s+BY\b(.*?)(?=\bLIMIT\b|$)', re.IGNORECASE | re.DOTALL)
+_PREDICATE = re.compile(rf'{_COLUMN}\s*(==|=|\bIS\b(?!\s+NOT)|\bIN\b|<=|>=|<|>|\bBETWEEN\b)', re.IGNORECASE)
+_ORDER_TERM = re.compile(rf'^\s*{_COLUMN}\s*(ASC|DESC)?\s*$', re.IGNORECASE)
+_SELECT = re.compile(r'^\s*SELECT\s+(?:DISTINCT\s+|ALL\s+)?(.*?)\bFROM\b', re.IGNORECASE | re.DOTALL)
+_SELECT_TERM = re.compile(rf'^\s*{_COLUMN}(?:\s+(?:AS\s+)?{_IDENT})?\s*$', re.IGNORECASE)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+
+EQUALITY_OPS = {'=', '==', 'IS', 'IN'}
+
+
+def _unquote(name):
+    if name[0] in '"`[':
+        return name[1:-1].replace('""', '"')
+    return name
+
+
+def extract_shape(sql):
+    """Return ``(table, equality_cols, range_cols, order_cols, selected_cols)`` for a query, or None.
+
+    This is a deliberately small heuristic, not a parser: it reads the first
+    FROM target and the column-vs-operator predicates of the top-level WHERE.
+    ``selected_cols`` is None unless the select list is plain column names.
+    Candidate indexes are always checked with EXPLAIN QUERY PLAN before being
+    suggested, so a misread shape costs nothing but a discarded candidate.
+    """
+    text = _STRINGS.sub("''", sql)
+    if not (source := _FROM.search(text)):
+        return None
+    table = _unquote(source.group(1))
+    tail = text[source.end():]
+
+    equality, ranges = [], []
+    if where := _WHERE.search(tail):
+        for column, op in _PREDICATE.findall(where.group(1)):
+            column = _unquote(column)
+            target = equality if op.upper() in EQUALITY_OPS else ranges
+            if column not in equality and column not in ranges:
+                target.append(column)
+
+    order = []
+    if order_by := _ORDER_BY.search(tail):
+        for term in order_by.group(1).split(','):
+            if not (match := _ORDER_TERM.match(term)):
+                break
+            order.append(_unquote(match.group(1)))
+
+    if not (equality or ranges or order):
+        return None
+
+    selected = None
+    if select := _SELECT.match(text[:source.end()]):
+        terms = [_SELECT_TERM.match(term) for term in select.group(1).split(',')]
+        if all(terms):
+            selected = tuple(_unquote(term.group(1)) for term in terms)
+    return table, tuple(equality), tuple(ranges), tuple(order), selected
+
+
+class WorkloadRecorder:
+    """Counts the WHERE/ORDER BY shapes the app issues, keeping one sample query per shape.
+
+    record() runs on the main thread while for_table() is read by the index
+    advisor on a worker, so both hold ``lock``.
+    """
+
+    def __init__(self, max_shapes=500):
+        self.max_shapes = max_shapes
+        self.shapes = {}
+        self.lock = threading.Lock()
+
+    def record(self, sql, params=()):
+        shape = extract_shape(sql)
+        if shape is None:
+            return
+        with self.lock:
+            entry = self.shapes.get(shape)
+            if entry:
+                entry['count'] += 1
+            elif len(self.shapes) < self.max_shapes:
+                self.shapes[shape] = {'count': 1, 'sql': sql, 'params': tuple(params)}
+
+    def for_table(self, table_name):
+        """A snapshot of the shapes recorded for ``table_name``, most frequent first"""
+        with self.lock:
+            found = [(shape, dict(entry)) for shape, entry in self.shapes.items() if shape[0] == table_name]
+        return sorted(found, key=lambda item: item[1]['count'], reverse=True)
+
+
+def list_indexes(conn, table_name):
+    indexes = []
+    for row in conn.execute(f'PRAGMA index_list("{table_name}")'):
+        name, unique, origin, partial = row[1], row[2], row[3], row[4]
+        columns = [info[2] for info in conn.execute(f'PRAGMA index_info("{name}")')]
+        indexes.append({'name': name, 'columns': columns, 'unique': bool(unique),
+                        'origin': origin, 'partial': bool(partial), 'size': index_size(conn, name)})
+    return indexes
+
+
+def index_size(conn, name):
+    """Bytes used by a table or index according to dbstat, or None if it is unavailable."""
+    try:
+        row = conn.execute('SELECT pgsize FROM dbstat WHERE name = ? AND aggregate = TRUE', (name,)).fetchone()
+        return row[0] if row else 0
+    except sqlite3.Error:
+        return None
+
+
+def explain(conn, sql, params=()):
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+
+def _schema_copy(conn):
+    """Empty in-memory copy of the schema and planner statistics, for what-if plans."""
+    mem = sqlite3.connect(':memory:')
+    register_functions(mem)
+    for (sql,) in conn.execute("SELECT sql FROM sqlite_master WHERE sql IS NOT NULL "
+                               "AND type IN ('table', 'index', 'view') AND name NOT LIKE 'sqlite_%' "
+                               "ORDER BY type = 'table' DESC"):
+        try:
+            mem.execute(sql)
+        except sqlite3.Error:
+            pass  # e.g. virtual tables whose module is not loaded here
+
+    has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+    if has_stats:
+        mem.execute('ANALYZE')
+        mem.execute('DELETE FROM sqlite_stat1')
+        mem.executemany('INSERT INTO sqlite_stat1 VALUES (?, ?, ?)',
+                        conn.execute('SELECT tbl, idx, stat FROM sqlite_stat1'))
+        mem.execute('ANALYZE sqlite_schema')  # makes the planner reload the copied statistics
+    return mem
+
+
+def candidate_columns(shape, columns, rowid_alias=None, max_width=6, max_covering=3):
+    """Equality columns first, then one range column or the ORDER BY columns.
+
+    When the query only needs a few more columns, they are appended so the
+    index covers it and the table b-tree is never visited. Every index entry
+    already carries the rowid, so the rowid alias is never added.
+    """
+    _, equality, ranges, order, selected = shape
+    key = [col for col in equality if col in columns]
+    if ranges and ranges[0] in columns:
+        key.append(ranges[0])
+    else:
+        key.extend(col for col in order if col in columns and col not in key)
+    if not key:
+        return key
+    if selected is not None:
+        needed = [col for col in (*ranges, *order, *selected)
+                  if col in columns and col != rowid_alias and col not in key]
+        extra = list(dict.fromkeys(needed))
+        if len(extra) <= max_covering and len(key) + len(extra) <= max_width:
+            return key + extra
+    return key[:max_width]
+
+
+def _covered(existing, key):
+    return any(index['columns'][:len(key)] == key for index in existing)
+
+
+def suggest_indexes(conn, recorder, table_name):
+    """Candidate indexes for the recorded workload, each validated with a what-if plan."""
+    info = conn.execute(f'PRAGMA table_info("{table_name}")').fetchall()
+    columns = [row[1] for row in info]
+    pk = [row for row in info if row[5]]
+    rowid_alias = pk[0][1] if len(pk) == 1 and pk[0][2].upper() == 'INTEGER' else None
+    existing = list_indexes(conn, table_name)
+    suggestions, seen = [], set()
+    mem = _schema_copy(conn)
+    try:
+        for shape, entry in recorder.for_table(table_name):
+            key = candidate_columns(shape, columns, rowid_alias)
+            if not key or tuple(key) in seen or _covered(existing, key):
+                continue
+            seen.add(tuple(key))
+            try:
+                before = explain(mem, entry['sql'], entry['params'])
+                mem.execute('SAVEPOINT candidate')
+                cols_sql = ', '.join(f'"{col}"' for col in key)
+                mem.execute(f'CREATE INDEX advisor_candidate ON "{table_name}" ({cols_sql})')
+                after = explain(mem, entry['sql'], entry['params'])
+                mem.execute('ROLLBACK TO candidate')
+                mem.execute('RELEASE candidate')
+            except sqlite3.Error as e:
+                logger.debug(f"Skipping candidate {key}: {str(e)}")
+                continue
+            if any('advisor_candidate' in step for step in after):
+                suggestions.append({'columns': key, 'uses': entry['count'], 'sql': entry['sql'],
+                                    'before': before, 'after': after})
+    finally:
+        mem.close()
+    return suggestions
+
+
+def create_index(conn, table_name, columns, name=None, unique=False, is_cancelled=None):
+    """Build an index on ``conn`` (normally a worker connection); returns the index name or None."""
+    name = name or f"idx_{table_name}_{'_'.join(columns)}"
+    cols_sql = ', '.join(f'"{col}"' for col in columns)
+    conn.set_progress_handler(lambda: 1 if is_cancelled and is_cancelled() else 0, 100000)
+    try:
+        conn.execute(f'CREATE {"UNIQUE " if unique else ""}INDEX "{name}" ON "{table_name}" ({cols_sql})')
+        conn.commit()
+    except sqlite3.OperationalError:
+        if is_cancelled and is_cancelled():
+            return None
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+    conn.execute(f'ANALYZE "{name}"')
+    conn.commit()
+    logger.info(f"Created index {name} on {table_name}({', '.join(columns)})")
+    return name
@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import struct
+import time
+from array import array
+
+logger = logging.getLogger(__name__)
+
+MAX_PROBLEMS = 100
+WAL_HEADER = 32
+WAL_FRAME_HEADER = 24
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def checkable_tables(conn):
+    """User tables in name order; virtual tables have no b-tree of their own to check"""
+    return [row[0] for row in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' "
+        "AND sql NOT LIKE 'CREATE VIRTUAL%' ORDER BY name")]
+
+
+def _wal_pages(path, page_size):
+    """``{pageno: offset}`` of the newest committed frame for each page in the WAL, if any.
+
+    Frames are taken up to the last commit frame whose salts match the WAL
+    header, i.e. what a reader opening the database now would see.
+    """
+    try:
+        wal = open(path + '-wal', 'rb')
+    except OSError:
+        return {}
+    with wal:
+        header = wal.read(WAL_HEADER)
+        if len(header) < WAL_HEADER or struct.unpack('>I', header[8:12])[0] != page_size:
+            return {}
+        salts = header[16:24]
+        pages, pending, offset = {}, {}, WAL_HEADER
+        while len(frame := wal.read(WAL_FRAME_HEADER)) == WAL_FRAME_HEADER and frame[8:16] == salts:
+            pageno, commit_size = struct.unpack('>II', frame[:8])
+            pending[pageno] = offset + WAL_FRAME_HEADER
+            if commit_size:
+                pages.update(pending)
+                pending.clear()
+            offset += WAL_FRAME_HEADER + page_size
+            wal.seek(offset)
+        return pages
+
+
+def table_digests(conn, path, tables, is_cancelled=None):
+    """Checksum of the pages of each table and its indexes, or None without the dbstat table.
+
+    Pages are mapped to their b-tree by dbstat and read straight from the
+    database file, with newer copies taken from the WAL. A digest changes
+    when any page of the table changes, including by silent corruption.
+    """
+    try:
+        page_size = conn.execute('PRAGMA page_size').fetchone()[0]
+        page_count = conn.execute('PRAGMA page_count').fetchone()[0]
+        owners = {row[0]: row[1] for row in conn.execute(
+            "SELECT name, tbl_name FROM sqlite_master WHERE type IN ('table', 'index')")}
+        slots = {name: i for i, name in enumerate(tables)}
+        owner = array('i', [-1]) * (page_count + 1)
+        for name, pageno in conn.execute('SELECT name, pageno FROM dbstat'):
+            slot = slots.get(owners.get(name, name))
+            if slot is not None and pageno <= page_count:
+                owner[pageno] = slot
+    except sqlite3.Error as e:
+        logger.info(f"Page checksums unavailable: {str(e)}")
+        return None
+
+    hashes = [hashlib.blake2b(digest_size=16) for _ in tables]
+    wal_pages = _wal_pages(path, page_size)
+    with open(path, 'rb') as db, open(path + '-wal', 'rb') if wal_pages else open(os.devnull, 'rb') as wal:
+        for pageno in range(1, page_count + 1):
+            if pageno % 4096 == 0 and is_cancelled and is_cancelled():
+                return None
+            if owner[pageno] < 0:
+                continue
+            if pageno in wal_pages:
+                wal.seek(wal_pages[pageno])
+                page = wal.read(page_size)
+            else:
+                db.seek((pageno - 1) * page_size)
+                page = db.read(page_size)
+            hashes[owner[pageno]].update(page)
+    return {name: hashes[slot].hexdigest() for name, slot in slots.items()}
+
+
+def check_table(conn, table_name, full=False):
+    """Problems found by quick_check/integrity_check and foreign_key_check on one table"""
+    pragma = 'integrity_check' if full else 'quick_check'
+    cursor = conn.execute(f'PRAGMA {pragma}({_quote(table_name)})')
+    # Some versions return all messages as one multi-line row
+    problems = [line for row in cursor.fetchmany(MAX_PROBLEMS) for line in row[0].splitlines()
+                if line != 'ok' and not line.startswith('*** in database')][:MAX_PROBLEMS]
+    foreign_keys = [{'rowid': row[1], 'parent': row[2], 'constraint': row[3]}
+                    for row in conn.execute(f'PRAGMA foreign_key_check({_quote(table_name)})').fetchmany(MAX_PROBLEMS)]
+    return problems, foreign_keys
+
+
+def check_database(conn, path, full=False, baseline=None, progress_callback=None, is_cancelled=None):
+    """Check every table in turn on ``conn``; returns a report dict, or None if cancelled.
+
+    With ``baseline`` (the ``digests`` of an earlier report) tables whose page
+    checksums still match are reported as ``unchanged`` and not re-checked.
+    The report's own ``digests`` only cover tables that passed, and only those
+    whose pages were the same before and after their check, so a later fast
+    check never skips content that was not actually verified.
+    """
+    def check_cancel():
+        return 1 if is_cancelled and is_cancelled() else 0
+
+    started = time.perf_counter()
+    tables = checkable_tables(conn)
+    steps = len(tables) + 2
+    before = table_digests(conn, path, tables, is_cancelled)
+    if check_cancel():
+        return None
+    if progress_callback:
+        progress_callback(1, steps)
+
+    results = []
+    conn.set_progress_handler(check_cancel, 100000)
+    try:
+        for done, table in enumerate(tables, start=2):
+            if baseline and before and baseline.get(table) == before[table]:
+                results.append({'table': table, 'status': 'unchanged', 'problems': [], 'foreign_keys': [],
+                                'seconds': 0.0})
+            else:
+                table_started = time.perf_counter()
+                try:
+                    problems, foreign_keys = check_table(conn, table, full)
+                except sqlite3.DatabaseError as e:
+                    if check_cancel():
+                        raise
+                    problems, foreign_keys = [str(e)], []  # e.g. a page too damaged to read
+                results.append({'table': table, 'status': 'error' if problems or foreign_keys else 'ok',
+                                'problems': problems, 'foreign_keys': foreign_keys,
+                                'seconds': time.perf_counter() - table_started})
+            if progress_callback:
+                progress_callback(done, steps)
+    except sqlite3.Error:
+        if check_cancel():
+            logger.info("Integrity check cancelled")
+            return None
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+
+    after = table_digests(conn, path, tables, is_cancelled) if before else None
+    if check_cancel():
+        return None
+    if progress_callback:
+        progress_callback(steps, steps)
+
+    digests = {}
+    if before and after:
+        digests = {result['table']: after[result['table']] for result in results
+                   if result['status'] != 'error' and before[result['table']] == after[result['table']]}
+    report = {
+        'mode': 'integrity_check' if full else 'quick_check',
+        'ok': all(result['status'] != 'error' for result in results),
+        'tables': results,
+        'checked': sum(result['status'] != 'unchanged' for result in results),
+        'skipped': sum(result['status'] == 'unchanged' for result in results),
+        'digests': digests,
+        'seconds': time.perf_counter() - started,
+    }
+    logger.info(f"{report['mode']}: {report['checked']} tables checked, {report['skipped']} unchanged, "
+                f"{'ok' if report['ok'] else 'problems found'}")
+    return report
@@ -0,0 +1,504 @@
+import logging
+import re
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+# Oldest SQLite releases with ALTER TABLE ... RENAME COLUMN / DROP COLUMN
+NATIVE_RENAME = (3, 25, 0)
+NATIVE_DROP = (3, 35, 0)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _mentions(sql, names):
+    """True if ``sql`` refers to any of ``names`` as an identifier (quoted or bare)"""
+    text = re.sub(r"'(?:[^']|'')*'", "''", sql)
+    return any(re.search(rf'(?<![\w$]){re.escape(name)}(?![\w$])', text, re.IGNORECASE) for name in names)
+
+
+TOKEN = re.compile(r"""\s+|--[^\n]*|/\*.*?(\*/|$)|'(?:[^']|'')*'|"(?:[^"]|"")*"|`(?:[^`]|``)*`|\[[^\]]*\]|\w+|.""",
+                   re.DOTALL)
+# Words that open a column constraint; the type name is everything before the first of them
+COLUMN_CONSTRAINTS = {'CONSTRAINT', 'PRIMARY', 'NOT', 'NULL', 'UNIQUE', 'CHECK', 'DEFAULT', 'COLLATE',
+                      'REFERENCES', 'GENERATED', 'AS'}
+
+
+def _tokens(sql):
+    """``(text, depth, spaced)`` for each token that is not whitespace or a comment.
+
+    ``spaced`` records whether whitespace or a comment came before the token,
+    so _join() can put clauses back together without splitting ``>=``.
+    """
+    depth, tokens, spaced = 0, [], False
+    for match in TOKEN.finditer(sql):
+        text = match.group()
+        if text.isspace() or text.startswith(('--', '/*')):
+            spaced = True
+            continue
+        if text == ')':
+            depth -= 1
+        tokens.append((text, depth, spaced))
+        spaced = False
+        if text == '(':
+            depth += 1
+    return tokens
+
+
+def _join(tokens):
+    return ''.join((' ' if spaced and i else '') + text for i, (text, _, spaced) in enumerate(tokens))
+
+
+def _unquote(token):
+    if token[:1] in ('"', '`'):
+        return token[1:-1].replace(token[0] * 2, token[0])
+    if token[:1] == '[':
+        return token[1:-1]
+    return token
+
+
+def _definitions(create_sql):
+    """Token lists of the column definitions and table constraints of a CREATE TABLE statement"""
+    tokens = _tokens(create_sql)
+    start = next(i for i, (text, depth, _) in enumerate(tokens) if text == '(' and depth == 0)
+    parts, current = [], []
+    for text, depth, spaced in tokens[start + 1:]:
+        depth -= 1  # relative to the definition list
+        if text == ',' and depth == 0 or text == ')' and depth < 0:
+            parts.append(current)
+            current = []
+            if text == ')':
+                break
+        else:
+            current.append((text, depth, spaced))
+    return parts
+
+
+def _clauses(tokens):
+    """Split a column definition's constraints into clauses, each with its leading CONSTRAINT name.
+
+    Inside a REFERENCES clause, SET NULL, SET DEFAULT and NOT DEFERRABLE
+    belong to the foreign key rather than starting a new constraint, and
+    GENERATED ALWAYS AS is one clause.
+    """
+    clauses = []
+    for i, (text, depth, _) in enumerate(tokens):
+        word = text.upper()
+        previous = tokens[i - 1][0].upper() if i else ''
+        following = tokens[i + 1][0].upper() if i + 1 < len(tokens) else ''
+        starts = depth == 0 and word in COLUMN_CONSTRAINTS and not (
+            (word == 'NULL' and previous in ('NOT', 'SET')) or
+            (word == 'DEFAULT' and previous == 'SET') or
+            (word == 'NOT' and following == 'DEFERRABLE') or
+            (word == 'AS' and previous == 'ALWAYS') or
+            (clauses and len(clauses[-1]) == 2 and clauses[-1][0][0].upper() == 'CONSTRAINT'))
+        if starts:
+            clauses.append([])
+        if clauses:
+            clauses[-1].append(tokens[i])
+    return clauses
+
+
+def _kind(clause):
+    """The keyword a constraint clause is about, after any ``CONSTRAINT name``"""
+    offset = 2 if clause[0][0].upper() == 'CONSTRAINT' else 0
+    return clause[offset][0].upper() if len(clause) > offset else ''
+
+
+def _rename(tokens, renamed):
+    """Tokens with identifiers in ``renamed`` (lower-cased old name -> new name) replaced, quoted"""
+    return [(_quote(renamed[_unquote(text).lower()]) if text[:1] != "'" and _unquote(text).lower() in renamed
+             else text, depth, spaced) for text, depth, spaced in tokens]
+
+
+def sql_literal(value):
+    """SQL text for a Python default value"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class SchemaEdit:
+    """Queue of column changes to one table, applied together.
+
+    Operations are validated as they are queued against the table as it will
+    look after the previous ones, so the queue never contains a step that
+    cannot run. apply() uses native ``ALTER TABLE`` statements when every
+    queued step allows it and otherwise rebuilds the table exactly once:
+    one ``CREATE``, one ``INSERT ... SELECT``, ``DROP``, ``RENAME`` and the
+    indexes and triggers recreated, all in one transaction.
+
+    A rebuild keeps column types, NOT NULL, DEFAULT, generated columns, the
+    primary key with AUTOINCREMENT and its sequence, COLLATE, CHECK and
+    REFERENCES clauses and FOREIGN KEY constraints (with renamed columns
+    renamed), UNIQUE constraints (as unique indexes), indexes, triggers and
+    rowids.
+    Constraints that use a dropped column, and expression/partial indexes
+    and triggers that mention a dropped or renamed column, are not carried
+    over; skipped() lists those.
+    """
+
+    def __init__(self, conn, table_name):
+        self.table_name = table_name
+        self.operations = []
+        # table_xinfo also lists generated columns (hidden 2 = VIRTUAL, 3 = STORED), which table_info omits
+        self.columns = [
+            {'name': row[1], 'type': row[2] or '', 'notnull': bool(row[3]), 'default': row[4],
+             'pk': row[5], 'source': row[1], 'generated': None}
+            for row in conn.execute(f'PRAGMA table_xinfo({_quote(table_name)})') if row[6] in (0, 2, 3)
+        ]
+        if not self.columns:
+            raise ValueError(f"Table '{table_name}' not found")
+        generated = self._generated(self._create_sql(conn))
+        for col in self.columns:
+            col['generated'] = generated.get(col['name'].lower())
+        self.original = [dict(col) for col in self.columns]
+
+    @staticmethod
+    def _generated(create_sql):
+        """``{column name (lower-cased): "AS (...)" clause}`` for the generated columns of a CREATE TABLE"""
+        generated = {}
+        for definition in _definitions(create_sql):
+            for clause in _clauses(definition[1:]):
+                if _kind(clause) in ('GENERATED', 'AS'):
+                    generated[_unquote(definition[0][0]).lower()] = _join(clause)
+        return generated
+
+    def _find(self, name):
+        for col in self.columns:
+            if col['name'] == name:
+                return col
+        raise ValueError(f"No column named '{name}'")
+
+    def _check_new_name(self, name):
+        if not name:
+            raise ValueError("Column name is required")
+        if any(col['name'].lower() == name.lower() for col in self.columns):
+            raise ValueError(f"Column '{name}' already exists")
+
+    def add_column(self, name, column_type='TEXT', default=None, not_null=False):
+        self._check_new_name(name)
+        default_sql = None if default is None else sql_literal(default)
+        if not_null and default_sql is None:
+            raise ValueError("A NOT NULL column needs a default value")
+        self.columns.append({'name': name, 'type': column_type, 'notnull': not_null,
+                             'default': default_sql, 'pk': 0, 'source': None, 'generated': None})
+        self.operations.append(('add', name, column_type, default_sql, not_null))
+
+    def drop_column(self, name):
+        col = self._find(name)
+        if len(self.columns) == 1:
+            raise ValueError("Cannot drop the only column")
+        if col['pk']:
+            raise ValueError(f"Cannot drop primary key column '{name}'")
+        for other in self.columns:
+            if other is not col and other['generated'] and _mentions(other['generated'], [col['source'] or name]):
+                raise ValueError(f"Column '{other['name']}' is generated from '{name}'; drop it first")
+        self.columns.remove(col)
+        self.operations.append(('drop', name))
+
+    def rename_column(self, old_name, new_name):
+        col = self._find(old_name)
+        if old_name != new_name:
+            self._check_new_name(new_name)
+            col['name'] = new_name
+            self.operations.append(('rename', old_name, new_name))
+
+    def retype_column(self, name, column_type):
+        col = self._find(name)
+        if col['type'] != column_type:
+            col['type'] = column_type
+            self.operations.append(('retype', name, column_type))
+
+    def move_column(self, name, position):
+        col = self._find(name)
+        position = max(0, min(position, len(self.columns) - 1))
+        if self.columns.index(col) != position:
+            self.columns.remove(col)
+            self.columns.insert(position, col)
+            self.operations.append(('move', name, position))
+
+    def describe(self):
+        """One line per queued operation, for display"""
+        labels = {
+            'add': lambda op: f"Add {op[1]} {op[2]}" + (f" DEFAULT {op[3]}" if op[3] else ""),
+            'drop': lambda op: f"Drop {op[1]}",
+            'rename': lambda op: f"Rename {op[1]} to {op[2]}",
+            'retype': lambda op: f"Change type of {op[1]} to {op[2]}",
+            'move': lambda op: f"Move {op[1]} to position {op[2] + 1}",
+        }
+        return [labels[op[0]](op) for op in self.operations]
+
+    def can_alter_natively(self, version=None):
+        """True if every queued operation has a native ALTER TABLE form in this SQLite"""
+        version = version or sqlite3.sqlite_version_info
+        for op in self.operations:
+            if op[0] in ('retype', 'move'):
+                return False
+            if op[0] == 'rename' and version < NATIVE_RENAME:
+                return False
+            if op[0] == 'drop' and version < NATIVE_DROP:
+                return False
+        return True
+
+    def native_statements(self):
+        table = _quote(self.table_name)
+        statements = []
+        for op in self.operations:
+            if op[0] == 'add':
+                _, name, column_type, default_sql, not_null = op
+                statements.append(f'ALTER TABLE {table} ADD COLUMN {self._column_sql(name, column_type, not_null, default_sql)}')
+            elif op[0] == 'drop':
+                statements.append(f'ALTER TABLE {table} DROP COLUMN {_quote(op[1])}')
+            elif op[0] == 'rename':
+                statements.append(f'ALTER TABLE {table} RENAME COLUMN {_quote(op[1])} TO {_quote(op[2])}')
+        return statements
+
+    @staticmethod
+    def _column_sql(name, column_type, not_null=False, default_sql=None, primary_key=False, extra=()):
+        parts = [_quote(name)]
+        if column_type:
+            parts.append(column_type)
+        if primary_key:
+            parts.append(primary_key if isinstance(primary_key, str) else 'PRIMARY KEY')
+        if not_null:
+            parts.append('NOT NULL')
+        if default_sql is not None:
+            parts.append(f'DEFAULT {default_sql}')
+        parts.extend(extra)
+        return ' '.join(parts)
+
+    def _constraints(self, create_sql):
+        """``(column_clauses, table_constraints, skipped)`` to carry into the rebuilt table.
+
+        ``column_clauses`` maps an original column name to its COLLATE, CHECK
+        and REFERENCES clauses and whether its key is AUTOINCREMENT.
+        PRIMARY KEY, UNIQUE, NOT NULL and DEFAULT are rebuilt from
+        ``columns`` and the indexes instead. Constraints that use a dropped
+        column end up in ``skipped`` as SQL text.
+        """
+        kept = {col['source'].lower(): col['name'] for col in self.columns if col['source']}
+        renamed = {old: new for old, new in kept.items() if old != new.lower()}
+        dropped = {name.lower() for name in self._changed_names()} - set(kept)
+
+        def uses_dropped(tokens):
+            return any(text[:1] != "'" and _unquote(text).lower() in dropped for text, _, _ in tokens)
+
+        columns, table, skipped = {}, [], []
+        for definition in _definitions(create_sql):
+            if not definition:
+                continue
+            if definition[0][0].upper() not in ('CONSTRAINT', 'PRIMARY', 'UNIQUE', 'CHECK', 'FOREIGN'):
+                name = _unquote(definition[0][0]).lower()
+                if name not in kept:
+                    continue  # a dropped column takes its own constraints with it
+                start = next((i for i, (text, depth, _) in enumerate(definition[1:], 1)
+                              if depth == 0 and text.upper() in COLUMN_CONSTRAINTS), len(definition))
+                extra, autoincrement = [], False
+                for clause in _clauses(definition[start:]):
+                    kind = _kind(clause)
+                    if kind == 'PRIMARY':
+                        autoincrement = any(text.upper() == 'AUTOINCREMENT' for text, _, _ in clause)
+                    elif kind in ('COLLATE', 'REFERENCES'):
+                        extra.append(_join(clause))
+                    elif kind in ('GENERATED', 'AS'):
+                        extra.append(_join(_rename(clause, renamed)))
+                    elif kind == 'CHECK':
+                        if uses_dropped(clause):
+                            skipped.append(_join(clause))
+                        else:
+                            extra.append(_join(_rename(clause, renamed)))
+                columns[name] = (extra, autoincrement)
+                continue
+            kind = _kind(definition)
+            if kind == 'CHECK':
+                target = definition
+            elif kind == 'FOREIGN':
+                # Only the child columns, up to REFERENCES, are this table's
+                refs = next(i for i, (text, depth, _) in enumerate(definition)
+                            if depth == 0 and text.upper() == 'REFERENCES')
+                target = definition[:refs]
+            else:
+                continue  # PRIMARY KEY and UNIQUE are rebuilt from the columns and indexes
+            if uses_dropped(target):
+                skipped.append(_join(definition))
+            else:
+                table.append(_join(_rename(target, renamed) + definition[len(target):]))
+        return columns, table, skipped
+
+    def _changed_names(self):
+        """Original names of columns that were dropped or renamed"""
+        kept = {col['source'] for col in self.columns if col['source'] == col['name']}
+        return [col['name'] for col in self.original if col['name'] not in kept]
+
+    def _index_statements(self, conn, new_table):
+        """CREATE INDEX statements for the indexes that survive, with columns renamed"""
+        renamed = {col['source']: col['name'] for col in self.columns if col['source']}
+        changed = self._changed_names()
+        statements = []
+        for index in conn.execute(f'PRAGMA index_list({_quote(self.table_name)})').fetchall():
+            name, unique, origin, partial = index[1], index[2], index[3], index[4]
+            if origin == 'pk':
+                continue  # part of the column definitions
+            keys = [row for row in conn.execute(f'PRAGMA index_xinfo({_quote(name)})') if row[5]]
+            sql = conn.execute('SELECT sql FROM sqlite_master WHERE type = ? AND name = ?',
+                               ('index', name)).fetchone()[0]
+            if partial or any(row[1] < 0 for row in keys):
+                # Expression or partial index: its SQL is reused unless it names a changed column
+                if sql and not _mentions(sql, changed):
+                    statements.append(sql)
+                continue
+            if any(row[2] not in renamed for row in keys):
+                continue  # indexes a dropped column
+            index_name = name if sql else f"{self.table_name}_{'_'.join(renamed[row[2]] for row in keys)}_unique"
+            cols_sql = ', '.join(f'{_quote(renamed[row[2]])} COLLATE {row[4]}{" DESC" if row[3] else ""}'
+                                 for row in keys)
+            statements.append(f'CREATE {"UNIQUE " if unique else ""}INDEX {_quote(index_name)} '
+                              f'ON {_quote(new_table)} ({cols_sql})')
+        return statements
+
+    def _create_sql(self, conn):
+        return conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+                            (self.table_name,)).fetchone()[0]
+
+    def rebuild_statements(self, conn):
+        table, temp = _quote(self.table_name), _quote(f'__rebuild_{self.table_name}')
+        create_sql = self._create_sql(conn)
+        column_clauses, table_constraints, _ = self._constraints(create_sql)
+        pk = sorted((col for col in self.columns if col['pk']), key=lambda col: col['pk'])
+        single_pk = pk[0] if len(pk) == 1 else None
+        definitions = []
+        for col in self.columns:
+            extra, autoincrement = column_clauses.get((col['source'] or '').lower(), ((), False))
+            primary_key = col is single_pk and ('PRIMARY KEY AUTOINCREMENT' if autoincrement else True)
+            definitions.append(self._column_sql(col['name'], col['type'], col['notnull'], col['default'],
+                                                primary_key=primary_key, extra=extra))
+        if len(pk) > 1:
+            definitions.append(f'PRIMARY KEY ({", ".join(_quote(col["name"]) for col in pk)})')
+        definitions += table_constraints
+        without_rowid = 'WITHOUT ROWID' in create_sql.upper()
+
+        # Generated columns are computed by the new table, and cannot be inserted into
+        copied = [col for col in self.columns if col['source'] and not col['generated']]
+        targets = ', '.join(_quote(col['name']) for col in copied)
+        sources = ', '.join(_quote(col['source']) for col in copied)
+        if not without_rowid:
+            targets, sources = f'rowid, {targets}', f'rowid, {sources}'
+
+        statements = [
+            f'CREATE TABLE {temp} ({", ".join(definitions)}){" WITHOUT ROWID" if without_rowid else ""}',
+            f'INSERT INTO {temp} ({targets}) SELECT {sources} FROM {table}',
+            f'DROP TABLE {table}',
+            f'ALTER TABLE {temp} RENAME TO {table}',
+        ]
+        if 'AUTOINCREMENT' in ' '.join(definitions).upper():
+            # The new table's sequence starts at max(rowid); keep the old high-water mark
+            seq = conn.execute('SELECT seq FROM sqlite_sequence WHERE name = ?', (self.table_name,)).fetchone()
+            if seq and seq[0]:
+                statements.append(f'UPDATE sqlite_sequence SET seq = {int(seq[0])} '
+                                  f'WHERE name = {sql_literal(self.table_name)} AND seq < {int(seq[0])}')
+        statements += self._index_statements(conn, self.table_name)
+        statements += [sql for _, sql in self._triggers(conn) if not _mentions(sql, self._changed_names())]
+        return statements
+
+    def _triggers(self, conn):
+        return conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ? "
+                            "AND sql IS NOT NULL", (self.table_name,)).fetchall()
+
+    def skipped(self, conn):
+        """Names of indexes and triggers, and SQL of constraints, a rebuild would not recreate"""
+        if self.can_alter_natively():
+            return []
+        changed = self._changed_names()
+        names = self._constraints(self._create_sql(conn))[2]
+        names += [name for name, sql in self._triggers(conn) if _mentions(sql, changed)]
+        for index in conn.execute(f'PRAGMA index_list({_quote(self.table_name)})').fetchall():
+            keys = [row for row in conn.execute(f'PRAGMA index_xinfo({_quote(index[1])})') if row[5]]
+            if index[4] or any(row[1] < 0 for row in keys):
+                sql = conn.execute("SELECT sql FROM sqlite_master WHERE name = ?", (index[1],)).fetchone()[0]
+                if _mentions(sql, changed):
+                    names.append(index[1])
+        return names
+
+    def preview(self, conn):
+        """The DDL apply() would run, with a comment saying which path it takes"""
+        if not self.operations:
+            return "-- No changes queued"
+        if self.can_alter_natively():
+            return '-- Native ALTER TABLE, no table copy\n' + ';\n'.join(self.native_statements()) + ';'
+        header = '-- Single rebuild in one transaction\n'
+        if skipped := self.skipped(conn):
+            header += f"-- Not carried over (they use dropped or changed columns): {', '.join(skipped)}\n"
+        return header + ';\n'.join(self.rebuild_statements(conn)) + ';'
+
+    @staticmethod
+    def _check_views(conn):
+        """Refuse, like a native DROP/RENAME COLUMN would, to leave a view that no longer compiles"""
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'view'").fetchall():
+            try:
+                conn.execute(f'SELECT * FROM {_quote(name)} LIMIT 0')
+            except sqlite3.OperationalError as e:
+                raise sqlite3.OperationalError(f"View '{name}' would no longer work: {str(e)}") from None
+
+    def apply(self, conn, progress_callback=None, is_cancelled=None):
+        """Run the queued changes in one transaction; returns 'native', 'rebuild' or None if cancelled.
+
+        A native attempt that SQLite refuses (e.g. dropping an indexed column)
+        is rolled back and replaced by the rebuild.
+        """
+        if not self.operations:
+            return 'native'
+
+        def check_cancel():
+            return 1 if is_cancelled and is_cancelled() else 0
+
+        foreign_keys = conn.execute('PRAGMA foreign_keys').fetchone()[0]
+        legacy_alter = conn.execute('PRAGMA legacy_alter_table').fetchone()[0]
+        if foreign_keys:
+            conn.execute('PRAGMA foreign_keys = OFF')
+        conn.set_progress_handler(check_cancel, 100000)
+        try:
+            if self.can_alter_natively():
+                try:
+                    conn.execute('BEGIN')  # DDL does not open a transaction implicitly
+                    for statement in self.native_statements():
+                        conn.execute(statement)
+                    conn.commit()
+                    logger.info(f"Altered '{self.table_name}' natively: {'; '.join(self.describe())}")
+                    return 'native'
+                except sqlite3.OperationalError as e:
+                    conn.rollback()
+                    if check_cancel():
+                        return None
+                    logger.info(f"Native ALTER not possible ({str(e)}), rebuilding instead")
+
+            # Views naming the table must not be re-checked while it is briefly missing
+            conn.execute('PRAGMA legacy_alter_table = ON')
+            statements = self.rebuild_statements(conn)
+            conn.execute('BEGIN')
+            try:
+                for step, statement in enumerate(statements, 1):
+                    conn.execute(statement)
+                    if progress_callback:
+                        progress_callback(step, len(statements))
+                if foreign_keys and conn.execute('PRAGMA foreign_key_check').fetchone():
+                    raise sqlite3.IntegrityError("Foreign key check failed after rebuild")
+                self._check_views(conn)
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                if check_cancel():
+                    logger.info(f"Schema edit of '{self.table_name}' cancelled")
+                    return None
+                raise
+            logger.info(f"Rebuilt '{self.table_name}' once for: {'; '.join(self.describe())}")
+            return 'rebuild'
+        finally:
+            conn.set_progress_handler(None, 0)
+            conn.execute(f'PRAGMA legacy_alter_table = {legacy_alter}')
+            if foreign_keys:
+                conn.execute('PRAGMA foreign_keys = ON')
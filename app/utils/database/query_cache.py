@@ -0,0 +1,99 @@
+import re
+import sys
+from collections import OrderedDict
+
+_TOKENS = re.compile(r"('(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|`[^`]*`|\[[^\]]*\])|\s+")
+_VOLATILE = re.compile(r'\b(random|randomblob|changes|last_insert_rowid|total_changes)\s*\(|'
+                       r"\b(current_(date|time|timestamp))\b|'now'", re.IGNORECASE)
+_WRITES = re.compile(r'\b(insert|update|delete|replace|create|drop|alter|attach|detach|pragma|vacuum)\b',
+                     re.IGNORECASE)
+
+
+def normalize_sql(query):
+    """Collapse whitespace outside quoted literals and drop a trailing semicolon."""
+    normalized = _TOKENS.sub(lambda m: m.group(1) or ' ', query).strip()
+    return normalized.rstrip(';').rstrip()
+
+
+def is_cacheable(query):
+    """Only plain, deterministic reads may be served from the cache."""
+    head = query.lstrip().split(None, 1)[0].upper() if query.strip() else ''
+    if head not in ('SELECT', 'WITH', 'VALUES'):
+        return False
+    unquoted = _TOKENS.sub(lambda m: "''" if m.group(1) else ' ', query)
+    return not _WRITES.search(unquoted) and not _VOLATILE.search(query)
+
+
+def _estimate_size(rows):
+    size = sys.getsizeof(rows)
+    for row in rows:
+        size += 64 + sum(sys.getsizeof(value) for value in row)
+    return size
+
+
+class QueryCache:
+    """LRU of SELECT results bounded by an estimated byte budget.
+
+    Each entry remembers the controller's change token at the time it was
+    stored and is only served while the token is unchanged, so results can
+    never be stale.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(query, params=()):
+        return normalize_sql(query), tuple(params)
+
+    def get(self, key, token):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        entry_token, rows, size = entry
+        if entry_token != token:
+            self._remove(key)
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return rows
+
+    def put(self, key, token, rows):
+        size = _estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self._remove(key)
+        self.entries[key] = (token, rows, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            oldest = next(iter(self.entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
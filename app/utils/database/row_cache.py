@@ -0,0 +1,94 @@
+import sys
+from collections import OrderedDict
+
+BLOCK_ROWS = 256
+
+
+def _row_size(row):
+    return sys.getsizeof(row) + sum(sys.getsizeof(value) for value in row.values())
+
+
+class _Block:
+    __slots__ = ('token', 'rowids', 'rows', 'columns', 'size')
+
+    def __init__(self, token, rowids, rows, columns):
+        self.token = token
+        self.rowids = rowids
+        self.rows = rows
+        self.columns = set(columns)
+        self.size = sys.getsizeof(rowids) + sum(_row_size(row) for row in rows)
+
+
+class RowBlockCache:
+    """LRU of BLOCK_ROWS-row blocks of table pages, shared by every open tab under one byte budget.
+
+    A block is keyed by ``(table, where, params, block_number)`` and holds the
+    columns read for it so far, so a tab that scrolls sideways or comes back
+    later only reads the columns it lacks. As in ``QueryCache``, a block is
+    only served while the change token it was read at is unchanged.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.blocks = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, token):
+        block = self.blocks.get(key)
+        if block is None or block.token != token:
+            if block is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self.blocks.move_to_end(key)
+        self.hits += 1
+        return block
+
+    def put(self, key, token, rowids, rows, columns):
+        if key in self.blocks:
+            self._remove(key)
+        block = _Block(token, rowids, rows, columns)
+        if block.size > self.max_bytes:
+            return block
+        self.blocks[key] = block
+        self.bytes += block.size
+        self._evict()
+        return block
+
+    def add_columns(self, key, block, values, columns):
+        """Merge ``{rowid: {column: value}}`` for newly read ``columns`` into ``block``"""
+        for rowid, row in zip(block.rowids, block.rows):
+            row.update(values.get(rowid, ()))
+        block.columns.update(columns)
+        size = sys.getsizeof(block.rowids) + sum(_row_size(row) for row in block.rows)
+        if self.blocks.get(key) is block:
+            self.bytes += size - block.size
+        block.size = size
+        self._evict()
+
+    def _evict(self):
+        while self.bytes > self.max_bytes and self.blocks:
+            self._remove(next(iter(self.blocks)))
+            self.evictions += 1
+
+    def _remove(self, key):
+        self.bytes -= self.blocks.pop(key).size
+
+    def clear(self):
+        self.blocks.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.blocks),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_ratio': self.hits / lookups if lookups else 0.0,
+        }
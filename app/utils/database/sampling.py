@@ -0,0 +1,113 @@
+import logging
+import math
+import random
+
+logger = logging.getLogger(__name__)
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def rowid_range(conn, table_name):
+    """``(min, max)`` rowid, each a single b-tree seek (min() and max() in one SELECT would scan)"""
+    low = conn.execute(f'SELECT min(rowid) FROM {_quote(table_name)}').fetchone()[0]
+    high = conn.execute(f'SELECT max(rowid) FROM {_quote(table_name)}').fetchone()[0]
+    return low, high
+
+
+def _probe_rowids(conn, table_name, size, low, high, where=None, params=(), rng=None, is_cancelled=None,
+                  max_probes=None):
+    """Up to ``size`` distinct rowids, each the first matching row at or after a random point.
+
+    A probe that runs off the end wraps around to ``low``. Rows right after a
+    gap are more likely to be hit, in proportion to the gap; without ``where``
+    each hit is kept with probability 1/gap, which makes the sample uniform
+    at the cost of more probes on a table with many deleted rows. Gives up
+    after ``max_probes``, so a small table or stratum returns all of its rows.
+    """
+    rng = rng or random.Random()
+    table = _quote(table_name)
+    where_sql = f' AND ({where})' if where else ''
+    query = f'SELECT rowid FROM {table} WHERE rowid >= ?{where_sql} ORDER BY rowid LIMIT 1'
+    previous = f'SELECT max(rowid) FROM {table} WHERE rowid < ?'
+    found = set()
+    for _ in range(max_probes or 3 * size):
+        if len(found) >= size or (is_cancelled and is_cancelled()):
+            break
+        point = rng.randint(low, high)
+        row = conn.execute(query, (point, *params)).fetchone()
+        if row is None:
+            row = conn.execute(query, (low, *params)).fetchone()
+            if row is None:
+                break
+        rowid = row[0]
+        if not where and rowid != point and rowid != low:
+            gap = rowid - conn.execute(previous, (rowid,)).fetchone()[0]
+            if rng.random() * gap >= 1:
+                continue
+        found.add(rowid)
+    return sorted(found)
+
+
+def sample_rowids(conn, table_name, size, seed=None):
+    """Rowids of about ``size`` random rows in rowid order, a few index seeks per row.
+
+    Unlike ``ORDER BY RANDOM()`` this never reads the whole table, so it is
+    instant on any size of table. Fewer rows come back if most of the rowid
+    range has been deleted.
+    """
+    low, high = rowid_range(conn, table_name)
+    if low is None:
+        return []
+    if high - low < size:
+        return [row[0] for row in conn.execute(f'SELECT rowid FROM {_quote(table_name)} ORDER BY rowid')]
+    return _probe_rowids(conn, table_name, size, low, high, rng=random.Random(seed), max_probes=20 * size)
+
+
+def stratified_rowids(conn, table_name, column, size, max_strata=50, seed=None,
+                      progress_callback=None, is_cancelled=None):
+    """About ``size`` rowids split evenly across the values of ``column``.
+
+    The values are those seen in a uniform pilot sample of ``10 * size`` rows,
+    so values rarer than that are not represented. Probes within a value are
+    index seeks when ``column`` leads an index, otherwise a forward scan to the
+    next match; run this on a worker. Returns ``[(value, rowids), ...]`` with
+    the most common values first, or ``None`` if cancelled.
+    """
+    low, high = rowid_range(conn, table_name)
+    if low is None:
+        return []
+    rng = random.Random(seed)
+    pilot = _probe_rowids(conn, table_name, 10 * size, low, high, rng=rng, max_probes=200 * size)
+    counts = {}
+    for start in range(0, len(pilot), 500):
+        chunk = pilot[start:start + 500]
+        placeholders = ', '.join('?' for _ in chunk)
+        for (value,) in conn.execute(f'SELECT {_quote(column)} FROM {_quote(table_name)} '
+                                     f'WHERE rowid IN ({placeholders})', chunk):
+            counts[value] = counts.get(value, 0) + 1
+    values = sorted(counts, key=counts.get, reverse=True)[:max_strata]
+    per_value = max(1, math.ceil(size / max(1, len(values))))
+
+    def check_cancel():
+        return 1 if is_cancelled and is_cancelled() else 0
+
+    strata = []
+    conn.set_progress_handler(check_cancel, 100000)
+    try:
+        for done, value in enumerate(values):
+            strata.append((value, _probe_rowids(conn, table_name, per_value, low, high, f'{_quote(column)} IS ?',
+                                                (value,), rng, is_cancelled)))
+            if check_cancel():
+                return None
+            if progress_callback:
+                progress_callback(done + 1, len(values))
+    except Exception:
+        if check_cancel():
+            logger.info(f"Stratified sample of '{table_name}' cancelled")
+            return None
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+    return strata
@@ -0,0 +1,171 @@
+import math
+import random
+
+MASK_64 = (1 << 64) - 1
+
+
+def _mix64(value):
+    # splitmix64 finaliser: spreads Python's hash() (identity for small ints)
+    # over all 64 bits so the register index and rank are independent.
+    z = (value + 0x9E3779B97F4A7C15) & MASK_64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+def _sort_key(value):
+    # SQLite orders NULL < numbers < text < blob
+    if isinstance(value, (int, float)):
+        return 0, value
+    if isinstance(value, str):
+        return 1, value
+    return 2, bytes(value)
+
+
+class HyperLogLog:
+    def __init__(self, precision=14):
+        self.precision = precision
+        self.m = 1 << precision
+        self.registers = bytearray(self.m)
+
+    def add(self, value):
+        h = _mix64(hash(value) & MASK_64)
+        index = h >> (64 - self.precision)
+        rest = (h << self.precision) & MASK_64
+        rank = 64 - self.precision + 1 if rest == 0 else 65 - rest.bit_length()
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def count(self):
+        m = self.m
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            return round(m * math.log(m / zeros))
+        return round(estimate)
+
+
+class QuantileSketch:
+    """Uniform reservoir sample; quantiles are read off the sorted sample."""
+
+    def __init__(self, size=2048, seed=0):
+        self.size = size
+        self.seen = 0
+        self.sample = []
+        self._random = random.Random(seed)
+
+    def add(self, value):
+        self.seen += 1
+        if len(self.sample) < self.size:
+            self.sample.append(value)
+        else:
+            slot = self._random.randrange(self.seen)
+            if slot < self.size:
+                self.sample[slot] = value
+
+    def quantiles(self, points=(0.25, 0.5, 0.75)):
+        if not self.sample:
+            return {}
+        ordered = sorted(self.sample)
+        last = len(ordered) - 1
+        return {p: ordered[min(last, int(round(p * last)))] for p in points}
+
+
+class TopK:
+    """Misra-Gries heavy hitters with batched decrements."""
+
+    def __init__(self, k=10, capacity=None):
+        self.k = k
+        self.capacity = capacity or k * 20
+        self.counters = {}
+
+    def add(self, value):
+        counters = self.counters
+        if value in counters:
+            counters[value] += 1
+            return
+        counters[value] = 1
+        if len(counters) > 2 * self.capacity:
+            self._prune()
+
+    def _prune(self):
+        threshold = sorted(self.counters.values(), reverse=True)[self.capacity]
+        self.counters = {v: c - threshold for v, c in self.counters.items() if c > threshold}
+
+    def top(self):
+        ranked = sorted(self.counters.items(), key=lambda item: item[1], reverse=True)
+        return ranked[:self.k]
+
+
+class ColumnProfiler:
+    def __init__(self, name, top_k=10):
+        self.name = name
+        self.rows = 0
+        self.nulls = 0
+        self.min_key = None
+        self.max_key = None
+        self.distinct = HyperLogLog()
+        self.quantiles = QuantileSketch()
+        self.top_values = TopK(top_k)
+
+    def add(self, value):
+        self.rows += 1
+        if value is None:
+            self.nulls += 1
+            return
+        if isinstance(value, memoryview):
+            value = bytes(value)
+        key = _sort_key(value)
+        if self.min_key is None or key < self.min_key:
+            self.min_key = key
+        if self.max_key is None or key > self.max_key:
+            self.max_key = key
+        self.distinct.add(value)
+        if key[0] == 0:
+            self.quantiles.add(value)
+        self.top_values.add(value)
+
+    def result(self):
+        return {
+            'name': self.name,
+            'rows': self.rows,
+            'nulls': self.nulls,
+            'null_ratio': self.nulls / self.rows if self.rows else 0.0,
+            'min': self.min_key[1] if self.min_key else None,
+            'max': self.max_key[1] if self.max_key else None,
+            'distinct': self.distinct.count(),
+            'quantiles': self.quantiles.quantiles(),
+            'top': self.top_values.top(),
+        }
+
+
+def profile_table(conn, table_name, columns, sample_fraction=None, chunk_size=5000,
+                  progress_callback=None, is_cancelled=None):
+    """Profile every column of ``table_name`` in a single streaming pass.
+
+    Returns a list of per-column dicts, or ``None`` if cancelled.
+    """
+    profilers = [ColumnProfiler(name) for name in columns]
+    cols_sql = ', '.join(f'"{name}"' for name in columns)
+    query = f'SELECT {cols_sql} FROM "{table_name}"'
+    if sample_fraction:
+        # Bernoulli sample evaluated inside SQLite, so skipped rows never reach Python
+        query += f' WHERE abs(random() % 1000000) < {int(sample_fraction * 1000000)}'
+
+    cursor = conn.execute(query)
+    processed = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        for row in rows:
+            for profiler, value in zip(profilers, row):
+                profiler.add(value)
+        processed += len(rows)
+        if progress_callback:
+            progress_callback(processed, 0)
+        if is_cancelled and is_cancelled():
+            return None
+
+    return [profiler.result() for profiler in profilers]
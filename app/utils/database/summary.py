@@ -0,0 +1,117 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+AGGREGATES = {
+    'count': 'COUNT({})',
+    'sum': 'SUM({})',
+    'avg': 'AVG({})',
+    'min': 'MIN({})',
+    'max': 'MAX({})',
+    'distinct count': 'COUNT(DISTINCT {})',
+}
+MAX_PIVOT_VALUES = 20
+MAX_GROUPS = 10000
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def aggregate_label(func, column=None):
+    return f"{func}({column or '*'})"
+
+
+def _aggregate_sql(func, column, pivot=None):
+    if func not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate: {func}")
+    if column is None and func != 'count':
+        raise ValueError(f"{func} needs a column")
+    value = _quote(column) if column else '1'
+    if pivot:
+        # CASE rather than FILTER (WHERE ...) so older SQLite builds can run it
+        value = f'CASE WHEN {_quote(pivot)} IS ? THEN {value} END'
+    elif column is None:
+        value = '*'
+    return AGGREGATES[func].format(value)
+
+
+def build_summary_query(table_name, group_by, aggregates, where=None, params=(), pivot=None, pivot_values=()):
+    """Compile a summary to one ``GROUP BY`` statement; returns ``(sql, params, headers)``.
+
+    ``aggregates`` is a list of ``(func, column)`` with column None for
+    ``count(*)``. With ``pivot`` each aggregate becomes one column per value in
+    ``pivot_values``, computed in the same pass over the table.
+    """
+    if not aggregates:
+        raise ValueError("Choose at least one aggregate")
+    select, select_params, headers = [_quote(name) for name in group_by], [], list(group_by)
+    for func, column in aggregates:
+        if pivot:
+            for value in pivot_values:
+                select.append(_aggregate_sql(func, column, pivot))
+                select_params.append(value)
+                headers.append(f"{aggregate_label(func, column)} [{pivot}={value}]")
+        else:
+            select.append(_aggregate_sql(func, column))
+            headers.append(aggregate_label(func, column))
+
+    sql = f'SELECT {", ".join(select)} FROM {_quote(table_name)}'
+    if where:
+        sql += f' WHERE {where}'
+    if group_by:
+        positions = ', '.join(str(i + 1) for i in range(len(group_by)))
+        sql += f' GROUP BY {positions} ORDER BY {positions}'
+    sql += ' LIMIT ?'
+    return sql, (*select_params, *params, MAX_GROUPS + 1), headers
+
+
+def summarize(conn, table_name, group_by, aggregates, where=None, params=(), pivot=None, is_cancelled=None):
+    """Run a summary on ``conn``; only the aggregated rows come back to Python.
+
+    Returns ``{'headers', 'rows', 'pivot_values', 'truncated'}`` or ``None`` if
+    cancelled. A pivot over more than MAX_PIVOT_VALUES values is refused.
+    """
+    def check_cancel():
+        return 1 if is_cancelled and is_cancelled() else 0
+
+    conn.set_progress_handler(check_cancel, 100000)
+    try:
+        pivot_values = []
+        if pivot:
+            where_sql = f' WHERE {where}' if where else ''
+            pivot_values = [row[0] for row in conn.execute(
+                f'SELECT DISTINCT {_quote(pivot)} FROM {_quote(table_name)}{where_sql} '
+                f'ORDER BY 1 LIMIT {MAX_PIVOT_VALUES + 1}', params)]
+            if len(pivot_values) > MAX_PIVOT_VALUES:
+                raise ValueError(f"'{pivot}' has more than {MAX_PIVOT_VALUES} values to pivot on")
+        sql, sql_params, headers = build_summary_query(table_name, group_by, aggregates, where, params,
+                                                       pivot, pivot_values)
+        rows = [tuple(row) for row in conn.execute(sql, sql_params)]
+    except Exception:
+        if check_cancel():
+            logger.info(f"Summary of '{table_name}' cancelled")
+            return None
+        raise
+    finally:
+        conn.set_progress_handler(None, 0)
+
+    return {
+        'headers': headers,
+        'rows': rows[:MAX_GROUPS],
+        'pivot_values': pivot_values,
+        'truncated': len(rows) > MAX_GROUPS,
+    }
+
+
+def drill_down_filter(group_by, key, where=None, params=(), pivot=None, pivot_value=None):
+    """``(where, params)`` selecting the rows behind one summary cell, within the current filter"""
+    clauses = [f'({where})'] if where else []
+    values = list(params)
+    for name, value in zip(group_by, key):
+        clauses.append(f'{_quote(name)} IS ?')
+        values.append(value)
+    if pivot:
+        clauses.append(f'{_quote(pivot)} IS ?')
+        values.append(pivot_value)
+    return ' AND '.join(clauses) or None, tuple(values)
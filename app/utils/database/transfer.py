@@ -0,0 +1,295 @@
+import bz2
+import csv
+import gzip
+import io
+import json
+import logging
+import lzma
+import os
+import queue
+import threading
+from itertools import islice
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.jsonl': 'ndjson',
+    '.ndjson': 'ndjson',
+}
+
+CODECS = {
+    '.gz': lambda f, mode: gzip.GzipFile(fileobj=f, mode=mode, compresslevel=6),
+    '.xz': lambda f, mode: lzma.LZMAFile(f, mode, preset=3 if 'w' in mode else None),
+    '.bz2': lambda f, mode: bz2.BZ2File(f, mode),
+}
+
+READ_SIZE = 1024 * 1024
+PIPELINE_DEPTH = 8
+
+
+def split_path(path):
+    """Return ``(format, codec_extension)`` for e.g. ``data.csv.gz`` -> ``('csv', '.gz')``."""
+    base, ext = os.path.splitext(path.lower())
+    codec = ext if ext in CODECS else None
+    if codec:
+        base, ext = os.path.splitext(base)
+    fmt = FORMATS.get(ext)
+    if fmt is None:
+        raise ValueError(f"Unsupported file type: {path}")
+    return fmt, codec
+
+
+def detect_format(path):
+    return split_path(path)[0]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def transfer_stats(rows, file_bytes, seconds):
+    seconds = max(seconds, 1e-9)
+    return {'rows': rows, 'bytes': file_bytes, 'seconds': seconds,
+            'rows_per_sec': rows / seconds, 'bytes_per_sec': file_bytes / seconds}
+
+
+def _json_default(value):
+    if isinstance(value, bytes):
+        return value.hex()
+    return str(value)
+
+
+def iter_ndjson(f):
+    for line_no, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_no}: {e.msg}") from None
+
+
+def iter_json_array(f, read_size=READ_SIZE):
+    """Yield the elements of a top-level JSON array without loading the whole document.
+
+    Only the current element and at most one read's worth of text are held in
+    memory; an element larger than the buffer simply makes the buffer grow.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    def fill():
+        nonlocal buf, pos, eof
+        data = f.read(read_size)
+        eof = not data
+        buf = buf[pos:] + data
+        pos = 0
+
+    def skip(chars):
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            fill()
+
+    fill()
+    skip(' \t\r\n')
+    if buf[pos:pos + 1] != '[':
+        raise ValueError("Expected a JSON array")
+    pos += 1
+
+    expect_value, empty = True, True
+    while True:
+        skip(' \t\r\n')
+        if pos >= len(buf):
+            raise ValueError("Unexpected end of JSON array")
+        if buf[pos] == ']':
+            if expect_value and not empty:
+                raise ValueError("Trailing ',' in JSON array")
+            return
+        if not expect_value:
+            if buf[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, found {buf[pos]!r}")
+            pos += 1
+            expect_value = True
+            continue
+        try:
+            value, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Invalid JSON: {e.msg}") from None
+            fill()
+            continue
+        if not eof and (end == len(buf) or buf[end] not in ' \t\r\n,]'):
+            # A number such as 1.5e3 may continue in the next read; decode it again with more text
+            fill()
+            continue
+        pos = end
+        expect_value, empty = False, False
+        yield value
+
+
+def iter_csv(f):
+    yield from csv.DictReader(f)
+
+
+READERS = {'csv': iter_csv, 'json': iter_json_array, 'ndjson': iter_ndjson}
+
+
+def iter_records(f, fmt):
+    """Records (dicts) from an open text stream in the given format."""
+    return READERS[fmt](f)
+
+
+def write_records(f, fmt, columns, chunks, on_chunk=None):
+    """Write row tuples from ``chunks`` (an iterable of lists) to an open text stream.
+
+    JSON arrays are written element by element, so no format needs the whole
+    table in memory. ``on_chunk(rows)`` is called after each chunk is written.
+    """
+    if fmt == 'csv':
+        writer = csv.writer(f)
+        writer.writerow(columns)
+    elif fmt == 'json':
+        f.write('[')
+
+    first = True
+    for rows in chunks:
+        if fmt == 'csv':
+            writer.writerows(rows)
+        else:
+            lines = [json.dumps(dict(zip(columns, row)), default=_json_default, ensure_ascii=False)
+                     for row in rows]
+            if fmt == 'ndjson':
+                f.write('\n'.join(lines) + '\n')
+            elif lines:
+                f.write(('\n' if first else ',\n') + ',\n'.join(lines))
+                first = False
+        if on_chunk:
+            on_chunk(rows)
+
+    if fmt == 'json':
+        f.write('\n]\n')
+
+
+class _PipelineWriter(io.RawIOBase):
+    """Hands written blocks to a thread that compresses them into ``target``.
+
+    zlib, bz2 and lzma release the GIL while compressing, so the producer
+    (fetching rows and formatting text) and the compressor run in parallel.
+    The queue is bounded, so a slow compressor throttles the producer rather
+    than buffering the export in memory.
+    """
+
+    def __init__(self, target, raw):
+        super().__init__()
+        self.target = target
+        self.raw = raw
+        self.blocks = queue.Queue(PIPELINE_DEPTH)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name='compress', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while (block := self.blocks.get()) is not None:
+            if self.error is None:
+                try:
+                    self.target.write(block)
+                except Exception as e:
+                    self.error = e
+
+    def writable(self):
+        return True
+
+    def write(self, block):
+        if self.error:
+            raise self.error
+        self.blocks.put(bytes(block))
+        return len(block)
+
+    def close(self):
+        if not self.closed:
+            self.blocks.put(None)
+            self.thread.join()
+            self.target.close()
+            self.raw.close()
+            super().close()
+            if self.error:
+                raise self.error
+
+
+class _PipelineReader(io.RawIOBase):
+    """Decompresses ``source`` on a thread, ``PIPELINE_DEPTH`` blocks ahead of the reader."""
+
+    def __init__(self, source, raw):
+        super().__init__()
+        self.source = source
+        self.raw = raw
+        self.blocks = queue.Queue(PIPELINE_DEPTH)
+        self.pending = b''
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='decompress', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        try:
+            while not self.stopped.is_set():
+                block = self.source.read(READ_SIZE)
+                self.blocks.put(block)
+                if not block:
+                    return
+        except Exception as e:
+            self.blocks.put(e)
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if not self.pending:
+            block = self.blocks.get()
+            if isinstance(block, Exception):
+                raise block
+            if not block:
+                self.blocks.put(block)  # keep reporting end of file
+                return 0
+            self.pending = block
+        size = min(len(buffer), len(self.pending))
+        buffer[:size] = self.pending[:size]
+        self.pending = self.pending[size:]
+        return size
+
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            while self.thread.is_alive():
+                try:
+                    self.blocks.get(timeout=0.1)  # unblock the thread if the queue is full
+                except queue.Empty:
+                    pass
+            self.source.close()
+            self.raw.close()
+            super().close()
+
+
+def open_text(path, mode):
+    """Open ``path`` as UTF-8 text, (de)compressing by extension; returns ``(text_stream, raw_file)``.
+
+    ``raw_file.tell()`` gives the position in the file on disk, which is what
+    progress is measured against.
+    """
+    codec = os.path.splitext(path.lower())[1]
+    codec = codec if codec in CODECS else None
+    raw = open(path, mode + 'b')
+    if codec is None:
+        binary = raw
+    elif mode == 'w':
+        binary = io.BufferedWriter(_PipelineWriter(CODECS[codec](raw, 'wb'), raw), READ_SIZE)
+    else:
+        binary = io.BufferedReader(_PipelineReader(CODECS[codec](raw, 'rb'), raw), READ_SIZE)
+    encoding = 'utf-8-sig' if mode == 'r' else 'utf-8'
+    return io.TextIOWrapper(binary, encoding=encoding, newline=''), raw
@@ -0,0 +1,98 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# cache_size is given in bytes here and converted to SQLite's negative-KiB form when applied
+PROFILES = {
+    'interactive': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': 64 * MB,
+        'mmap_size': 256 * MB,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'bulk_load': {
+        'journal_mode': 'WAL',
+        'synchronous': 'OFF',
+        'cache_size': 256 * MB,
+        'mmap_size': 1024 * MB,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000,
+    },
+    # Editing a multi-GB file: the interactive settings with a working set to match
+    'large_file': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': 256 * MB,
+        'mmap_size': 2048 * MB,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    'read_only': {
+        'cache_size': 128 * MB,
+        'mmap_size': 1024 * MB,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+    },
+    # SQLite's own defaults, kept for comparison in benchmarks
+    'default': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'cache_size': 2 * MB,
+        'mmap_size': 0,
+        'temp_store': 'DEFAULT',
+        'busy_timeout': 0,
+    },
+}
+
+# Files at least this big are edited with the 'large_file' profile
+LARGE_FILE = 1024 * MB
+
+OPERATION_PROFILES = {
+    'import': 'bulk_load',
+    'restore': 'bulk_load',
+    'clone': 'bulk_load',
+    'export': 'read_only',
+    'analyze': 'read_only',
+}
+
+
+def database_size(path):
+    return os.path.getsize(path) if path and os.path.exists(path) else 0
+
+
+def choose_profile(operation=None, file_size=0):
+    """Profile the auto mode uses for ``operation`` (None means normal editing)."""
+    if operation in OPERATION_PROFILES:
+        return OPERATION_PROFILES[operation]
+    return 'large_file' if file_size >= LARGE_FILE else 'interactive'
+
+
+def resolve_settings(name, file_size=0):
+    """PRAGMA values for ``name``, with cache and mmap scaled to the database file.
+
+    A 10 MB file gains nothing from a 1 GB map; a huge file gets the full budget.
+    Bulk loads keep the full budget because the file is about to grow.
+    """
+    settings = dict(PROFILES[name])
+    if file_size and settings.get('mmap_size') and name != 'bulk_load':
+        headroom = max(file_size * 2, 64 * MB)
+        settings['mmap_size'] = min(settings['mmap_size'], headroom)
+        settings['cache_size'] = min(settings['cache_size'], headroom)
+    return settings
+
+
+def apply_profile(conn, name, path=None):
+    settings = resolve_settings(name, database_size(path))
+    for pragma, value in settings.items():
+        if pragma == 'cache_size':
+            value = -(value // 1024)
+        if pragma == 'journal_mode' and conn.in_transaction:
+            continue  # cannot change journal mode mid-transaction
+        conn.execute(f'PRAGMA {pragma} = {value}')
+    logger.debug(f"Applied '{name}' connection profile: {settings}")
+    return settings
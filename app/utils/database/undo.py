@@ -0,0 +1,177 @@
+import itertools
+import logging
+import sqlite3
+
+logger = logging.getLogger(__name__)
+
+_table_ids = itertools.count(1)
+
+# Deletes larger than this run without a snapshot; the caller asks first
+MAX_UNDO_ROWS = 200000
+# Total size of the TEMP tables kept on the stack (RAM with temp_store=MEMORY)
+MAX_UNDO_BYTES = 128 * 1024 * 1024
+
+
+def store_bytes(conn, store):
+    """Bytes used by a TEMP snapshot table, or a rough guess without dbstat."""
+    try:
+        return conn.execute(
+            "SELECT coalesce(sum(pgsize), 0) FROM dbstat('temp') WHERE name = ?", (store,)).fetchone()[0]
+    except sqlite3.Error:
+        return conn.execute(f'SELECT count(*) FROM temp."{store}"').fetchone()[0] * 256
+
+
+class CellSnapshot:
+    """Undo entry holding the previous values of a set of cells in a TEMP table.
+
+    Undo and redo are the same operation: the stored values are swapped
+    with the ones currently in the table, so no cell data passes through Python.
+    """
+
+    def __init__(self, conn, table_name, description):
+        self.table_name = table_name
+        self.description = description
+        self.store = f'undo_cells_{next(_table_ids)}'
+        self.columns = []
+        conn.execute(f'CREATE TEMP TABLE "{self.store}" (rid INTEGER, col TEXT, val)')
+
+    def capture(self, conn, column, where_sql, params=()):
+        """Remember the current value of ``column`` in every row matching ``where_sql``."""
+        conn.execute(
+            f'INSERT INTO temp."{self.store}" (rid, col, val) '
+            f'SELECT rowid, ?, "{column}" FROM main."{self.table_name}" WHERE {where_sql}',
+            (column, *params))
+        if column not in self.columns:
+            self.columns.append(column)
+
+    def capture_rows(self, conn, column, rowids):
+        """Remember the current value of ``column`` for each of ``rowids``."""
+        conn.executemany(
+            f'INSERT INTO temp."{self.store}" (rid, col, val) '
+            f'SELECT rowid, ?, "{column}" FROM main."{self.table_name}" WHERE rowid = ?',
+            ((column, rowid) for rowid in rowids))
+        if column not in self.columns:
+            self.columns.append(column)
+
+    def _swap(self, conn):
+        swap = f'{self.store}_swap'
+        for column in self.columns:
+            # rid is the swap table's rowid, so the write-back below is a keyed lookup
+            conn.execute(f'CREATE TEMP TABLE "{swap}" (rid INTEGER PRIMARY KEY, val)')
+            conn.execute(
+                f'INSERT OR REPLACE INTO temp."{swap}" (rid, val) SELECT u.rid, t."{column}" '
+                f'FROM temp."{self.store}" u JOIN main."{self.table_name}" t ON t.rowid = u.rid '
+                f'WHERE u.col = ?', (column,))
+            conn.execute(
+                f'UPDATE main."{self.table_name}" SET "{column}" = u.val FROM temp."{self.store}" u '
+                f'WHERE u.col = ? AND u.rid = main."{self.table_name}".rowid', (column,))
+            conn.execute(
+                f'UPDATE temp."{self.store}" SET val = s.val FROM temp."{swap}" s '
+                f'WHERE temp."{self.store}".col = ? AND temp."{self.store}".rid = s.rid', (column,))
+            conn.execute(f'DROP TABLE temp."{swap}"')
+
+    def undo(self, conn):
+        self._swap(conn)
+
+    def redo(self, conn):
+        self._swap(conn)
+
+    def discard(self, conn):
+        conn.execute(f'DROP TABLE IF EXISTS temp."{self.store}"')
+
+
+class RowSnapshot:
+    """Undo entry holding whole rows (with their rowids) in a TEMP table.
+
+    ``removed`` says whether the rows are currently absent from the table:
+    true after a delete, false after an insert. Undo and redo both flip it.
+    """
+
+    def __init__(self, conn, table_name, description, removed):
+        self.table_name = table_name
+        self.description = description
+        self.removed = removed
+        self.store = f'undo_rows_{next(_table_ids)}'
+        self.columns = [row[1] for row in conn.execute(f'PRAGMA table_info("{table_name}")')]
+        conn.execute(
+            f'CREATE TEMP TABLE "{self.store}" AS SELECT rowid AS __rowid__, * FROM main."{table_name}" WHERE 0')
+
+    def capture(self, conn, where_sql, params=()):
+        conn.execute(
+            f'INSERT INTO temp."{self.store}" SELECT rowid, * FROM main."{self.table_name}" WHERE {where_sql}',
+            params)
+
+    def _toggle(self, conn):
+        if self.removed:
+            cols_sql = ', '.join(f'"{name}"' for name in self.columns)
+            conn.execute(
+                f'INSERT INTO main."{self.table_name}" (rowid, {cols_sql}) '
+                f'SELECT __rowid__, {cols_sql} FROM temp."{self.store}"')
+        else:
+            conn.execute(
+                f'DELETE FROM main."{self.table_name}" '
+                f'WHERE rowid IN (SELECT __rowid__ FROM temp."{self.store}")')
+        self.removed = not self.removed
+
+    def undo(self, conn):
+        self._toggle(conn)
+
+    def redo(self, conn):
+        self._toggle(conn)
+
+    def discard(self, conn):
+        conn.execute(f'DROP TABLE IF EXISTS temp."{self.store}"')
+
+
+class UndoStack:
+    """Keeps at most ``limit`` entries and ``max_bytes`` of snapshot data."""
+
+    def __init__(self, limit=50, max_bytes=MAX_UNDO_BYTES):
+        self.limit = limit
+        self.max_bytes = max_bytes
+        self.done = []
+        self.undone = []
+        self.sizes = {}
+
+    def push(self, conn, entry):
+        self.clear_redo(conn)
+        self.sizes[entry.store] = store_bytes(conn, entry.store)
+        self.done.append(entry)
+        while self.done and (len(self.done) > self.limit or sum(self.sizes.values()) > self.max_bytes):
+            oldest = self.done.pop(0)
+            if oldest is entry:
+                logger.warning(f"Not keeping '{entry.description}' for undo: snapshot too large")
+            self._discard(conn, oldest)
+
+    def clear_redo(self, conn):
+        for stale in self.undone:
+            self._discard(conn, stale)
+        self.undone.clear()
+
+    def _discard(self, conn, entry):
+        entry.discard(conn)
+        self.sizes.pop(entry.store, None)
+
+    def undo(self, conn):
+        if not self.done:
+            return None
+        entry = self.done.pop()
+        entry.undo(conn)
+        self.undone.append(entry)
+        logger.info(f"Undid: {entry.description}")
+        return entry
+
+    def redo(self, conn):
+        if not self.undone:
+            return None
+        entry = self.undone.pop()
+        entry.redo(conn)
+        self.done.append(entry)
+        logger.info(f"Redid: {entry.description}")
+        return entry
+
+    def clear(self, conn):
+        for entry in self.done + self.undone:
+            self._discard(conn, entry)
+        self.done.clear()
+        self.undone.clear()
@@ -0,0 +1,209 @@
+"""Opt-in profiling: named timing spans, cProfile and tracemalloc over a marked interval.
+
+Start and stop it from Tools > Profiler, or set ``DB_EDITOR_PROFILE=<dir>`` to
+profile a whole (e.g. headless) run and write the report to ``<dir>`` at exit.
+Each report is a text file for reading, a ``.json`` file for comparing
+versions and a ``.pstats`` file for pstats/snakeviz:
+
+    python -m app.utils.profiler diff old.json new.json
+"""
+import atexit
+import cProfile
+import functools
+import json
+import logging
+import os
+import platform
+import pstats
+import sqlite3
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+ENV_VAR = 'DB_EDITOR_PROFILE'
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+
+def _short_path(path):
+    return os.path.relpath(path, ROOT) if path.startswith(ROOT) else os.path.basename(path)
+
+
+class Profiler:
+    def __init__(self):
+        self.active = False
+        self.lock = threading.Lock()
+        self.spans = {}
+        self.profile = None
+        self.snapshot = None
+        self.started = None
+        self.started_tracemalloc = False
+
+    def start(self):
+        if self.active:
+            return
+        self.spans = {}
+        self.profile = cProfile.Profile()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+            self.started_tracemalloc = True
+        self.snapshot = tracemalloc.take_snapshot()
+        self.started = time.perf_counter()
+        self.active = True
+        self.profile.enable()
+        logger.info("Profiler started")
+
+    def record(self, name, seconds):
+        with self.lock:
+            span = self.spans.get(name)
+            if span is None:
+                self.spans[name] = [1, seconds, seconds]
+            else:
+                span[0] += 1
+                span[1] += seconds
+                span[2] = max(span[2], seconds)
+
+    def stop(self, report_dir):
+        """Stop profiling and write the reports; returns the path of the text report"""
+        if not self.active:
+            return None
+        self.profile.disable()
+        self.active = False
+        wall = time.perf_counter() - self.started
+        snapshot = tracemalloc.take_snapshot()
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+
+        stats = pstats.Stats(self.profile)
+        functions = sorted(
+            ((f"{_short_path(file)}:{line}({func})", calls, total, cumulative)
+             for (file, line, func), (_, calls, total, cumulative, _) in stats.stats.items()),
+            key=lambda item: item[3], reverse=True)[:TOP_FUNCTIONS]
+        filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+        allocations = snapshot.filter_traces(filters).compare_to(self.snapshot.filter_traces(filters), 'lineno')
+        allocations = [(f"{_short_path(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+                        stat.size_diff, stat.count_diff) for stat in allocations[:TOP_ALLOCATIONS]]
+
+        report = {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'wall_seconds': wall,
+            'profiled_seconds': stats.total_tt,
+            'spans': {name: {'count': count, 'total': total, 'max': longest}
+                      for name, (count, total, longest) in sorted(self.spans.items())},
+            'functions': [{'function': name, 'calls': calls, 'total': total, 'cumulative': cumulative}
+                          for name, calls, total, cumulative in functions],
+            'allocations': [{'line': line, 'size_diff': size, 'count_diff': count}
+                            for line, size, count in allocations],
+        }
+
+        os.makedirs(report_dir, exist_ok=True)
+        base = os.path.join(report_dir, f"profile-{datetime.now():%Y%m%d-%H%M%S}")
+        stats.dump_stats(base + '.pstats')
+        with open(base + '.json', 'w') as f:
+            json.dump(report, f, indent=2)
+        with open(base + '.txt', 'w') as f:
+            f.write(format_report(report))
+        logger.info(f"Profile written to {base}.txt")
+        return base + '.txt'
+
+
+def format_report(report):
+    lines = [
+        f"Profile {report['created']}  Python {report['python']}  SQLite {report['sqlite']}",
+        f"{report['platform']}",
+        "",
+        f"Wall time:            {report['wall_seconds']:10.3f} s",
+        f"In Python code:       {report['profiled_seconds']:10.3f} s (main thread, includes SQLite calls)",
+        f"Outside Python:       {report['wall_seconds'] - report['profiled_seconds']:10.3f} s "
+        f"(Qt event loop: painting, layout and idle)",
+        "",
+        "Spans (all threads)",
+        f"{'name':<40} {'count':>8} {'total s':>10} {'mean ms':>10} {'max ms':>10}",
+    ]
+    for name, span in report['spans'].items():
+        lines.append(f"{name:<40} {span['count']:>8} {span['total']:>10.3f} "
+                     f"{span['total'] / span['count'] * 1000:>10.2f} {span['max'] * 1000:>10.2f}")
+    lines += ["", "Functions by cumulative time (main thread)",
+              f"{'calls':>10} {'total s':>10} {'cum s':>10}  function"]
+    for item in report['functions']:
+        lines.append(f"{item['calls']:>10} {item['total']:>10.3f} {item['cumulative']:>10.3f}  {item['function']}")
+    lines += ["", "Allocations since start (net)", f"{'KiB':>10} {'blocks':>8}  line"]
+    for item in report['allocations']:
+        lines.append(f"{item['size_diff'] / 1024:>10.1f} {item['count_diff']:>8}  {item['line']}")
+    return '\n'.join(lines) + '\n'
+
+
+def diff_reports(old, new):
+    """Span and function timing changes between two ``.json`` reports, biggest first"""
+    lines = [f"{'span':<40} {'old s':>10} {'new s':>10} {'change':>8}"]
+    for name in sorted(old['spans'].keys() | new['spans'].keys()):
+        before = old['spans'].get(name, {}).get('total', 0.0)
+        after = new['spans'].get(name, {}).get('total', 0.0)
+        change = f"{(after - before) / before * 100:+.0f}%" if before else "new"
+        lines.append(f"{name:<40} {before:>10.3f} {after:>10.3f} {change:>8}")
+
+    old_functions = {item['function']: item['cumulative'] for item in old['functions']}
+    new_functions = {item['function']: item['cumulative'] for item in new['functions']}
+    changes = sorted(((new_functions.get(name, 0.0) - old_functions.get(name, 0.0), name)
+                      for name in old_functions.keys() | new_functions.keys()),
+                     key=lambda item: abs(item[0]), reverse=True)
+    lines += ["", f"{'cum s change':>12}  function"]
+    lines += [f"{delta:>+12.3f}  {name}" for delta, name in changes[:TOP_FUNCTIONS]]
+    return '\n'.join(lines) + '\n'
+
+
+profiler = Profiler()
+
+
+@contextmanager
+def span(name):
+    """Time a block under ``name`` while the profiler is running; next to free otherwise"""
+    if not profiler.active:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profiler.record(name, time.perf_counter() - started)
+
+
+def timed(fn):
+    """Decorator recording each call of ``fn`` as a span named after its qualified name"""
+    name = fn.__qualname__
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not profiler.active:
+            return fn(*args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            profiler.record(name, time.perf_counter() - started)
+    return wrapper
+
+
+def start_from_env():
+    """Profile the whole run when ``DB_EDITOR_PROFILE`` names a report directory"""
+    report_dir = os.environ.get(ENV_VAR)
+    if report_dir:
+        profiler.start()
+        atexit.register(profiler.stop, report_dir)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 4 or sys.argv[1] != 'diff':
+        sys.exit("usage: python -m app.utils.profiler diff OLD.json NEW.json")
+    with open(sys.argv[2]) as old_file, open(sys.argv[3]) as new_file:
+        sys.stdout.write(diff_reports(json.load(old_file), json.load(new_file)))
@@ -1,17 +1,32 @@
 # toolbar_functions.py (Complete Implementation)
 from PyQt6.QtWidgets import (QInputDialog, QMessageBox, QFileDialog,
-                             QTableWidgetItem, QDialog, QLineEdit)
-from PyQt6.QtCore import QItemSelectionModel
+                             QTableWidgetItem, QDialog, QLineEdit, QApplication, QProgressDialog)
+from PyQt6.QtCore import QElapsedTimer, QItemSelectionModel, QSettings, Qt
 import csv
-import json
+import io
+import os
 import sqlite3
 
+from app.ui.dialogs.clone_table import CloneTableDialog
+from app.ui.dialogs.column_sets import ColumnSetDialog
+from app.ui.dialogs.compare import CompareDialog
+from app.ui.dialogs.find_replace import FindReplaceDialog
+from app.ui.dialogs.index_manager import IndexManagerDialog
+from app.ui.dialogs.integrity_check import IntegrityCheckDialog
+from app.ui.dialogs.intial_setup import NewDatabaseDialog
+from app.ui.dialogs.schema_editor import SchemaEditorDialog
+from app.ui.dialogs.summary import SummaryDialog
+from app.ui.dialogs.table_properties import TablePropertiesDialog
+from app.utils.database.controller import DatabaseController
+from app.utils.profiler import profiler, span
+from app.utils.worker import Worker
+
 
 def new_database(parent):
     dlg = NewDatabaseDialog(mode="new")
     if dlg.exec() == QDialog.DialogCode.Accepted:
         try:
-            config = dlg.get_config()
+            config = parent.connection_config(dlg.get_config())
             parent.db_controller = DatabaseController(config)
             if config['is_new']:
                 parent.db_controller.create_table(
@@ -31,11 +46,11 @@ def open_database(parent):
     )
     if path:
         try:
-            parent.db_controller = DatabaseController({
+            parent.db_controller = DatabaseController(parent.connection_config({
                 'type': 'SQLite',
                 'path': path,
                 'is_new': False
-            })
+            }))
             parent.update_ui_state()
             parent.statusBar().showMessage(f"Opened {path}", 3000)
         except Exception as e:
@@ -57,6 +72,111 @@ def optimize_database(parent):
             parent.show_error(f"Optimization failed: {str(e)}")
 
 
+def check_integrity(parent):
+    if parent.db_controller:
+        IntegrityCheckDialog(parent.db_controller, parent).exec()
+
+
+def set_connection_profile(parent, name):
+    QSettings("YourCompany", "DatabaseEditor").setValue("connection_profile", name)
+    if parent.db_controller:
+        try:
+            parent.db_controller.set_profile(name)
+            parent.statusBar().showMessage(f"Connection profile: {parent.db_controller.active_profile}", 3000)
+        except Exception as e:
+            parent.show_error(f"Profile change failed: {str(e)}")
+
+
+def toggle_query_cache(parent, enabled):
+    QSettings("YourCompany", "DatabaseEditor").setValue("query_cache", enabled)
+    if parent.db_controller:
+        parent.db_controller.set_query_cache(64 if enabled else 0)
+
+
+def column_sets(parent):
+    if parent.model:
+        ColumnSetDialog(parent.model, parent).exec()
+
+
+def sample_rows(parent):
+    if not parent.model:
+        return
+    settings = QSettings("YourCompany", "DatabaseEditor")
+    size, ok = QInputDialog.getInt(parent, "Sample Rows", "Number of rows:",
+                                   settings.value("sample_size", 100, type=int), 1, 10000)
+    if not ok:
+        return
+    none = "(none - uniform sample)"
+    column, ok = QInputDialog.getItem(parent, "Sample Rows", "Stratify by column:",
+                                      [none] + parent.db_controller.get_column_names(parent.model.table_name),
+                                      0, False)
+    if ok:
+        settings.setValue("sample_size", size)
+        try:
+            parent.show_sample(size, None if column == none else column)
+        except Exception as e:
+            parent.show_error(f"Sampling failed: {str(e)}")
+
+
+def summarize_table(parent):
+    if not parent.model:
+        return
+    table = parent.model.table_name
+    dlg = SummaryDialog(parent.db_controller, parent.model, parent)
+    dlg.drill_down.connect(lambda where, params: drill_down(parent, table, where, params))
+    dlg.setAttribute(Qt.WidgetAttribute.WA_DeleteOnClose)
+    dlg.show()  # modeless, so several cells can be drilled into in turn
+
+
+def drill_down(parent, table, where, params):
+    if not parent.model or parent.model.table_name != table:
+        parent.table_combo.setCurrentText(table)
+        parent.load_table(table)
+    parent.apply_filter(where, params)
+
+
+def toggle_profiler(parent, enabled):
+    """Start profiling, or stop and write the report for the interval since it was started"""
+    if enabled:
+        profiler.start()
+        parent.statusBar().showMessage("Profiling... untick Tools > Profiler to write the report")
+        return
+    report_dir = QSettings("YourCompany", "DatabaseEditor").value(
+        "profile_dir", os.path.join(os.path.expanduser("~"), "db_editor_profiles"))
+    try:
+        path = profiler.stop(report_dir)
+    except Exception as e:
+        parent.show_error(f"Writing profile failed: {str(e)}")
+        return
+    if path:
+        QMessageBox.information(parent, "Profiler", f"Profile written to:\n{path}")
+
+
+def toggle_change_watch(parent, enabled):
+    QSettings("YourCompany", "DatabaseEditor").setValue("watch_changes", enabled)
+    parent.start_change_watcher()
+
+
+def query_cache_stats(parent):
+    if not parent.db_controller:
+        return
+    sections = []
+    for title, cache in (("Query results", parent.db_controller.query_cache),
+                         ("Table rows (shared by all tabs)", parent.db_controller.row_cache)):
+        if cache is None:
+            sections.append(f"{title}: disabled")
+            continue
+        stats = cache.stats()
+        sections.append(
+            f"{title}\n"
+            f"Entries: {stats['entries']}\n"
+            f"Memory: {stats['bytes'] / 1048576:.1f} of {stats['max_bytes'] / 1048576:.0f} MB\n"
+            f"Hits: {stats['hits']}  Misses: {stats['misses']}  ({stats['hit_ratio']:.0%} hit ratio)\n"
+            f"Evictions: {stats['evictions']}"
+        )
+    QMessageBox.information(parent, "Cache Statistics", "\n\n".join(sections))
+
+
 def change_table(parent):
     current_table = parent.current_table()
     tables = parent.db_controller.get_tables()
@@ -92,6 +212,16 @@ def rename_table(parent):
             parent.show_error(f"Rename failed: {str(e)}")
 
 
+def clone_table(parent):
+    if not (table := parent.current_table()):
+        return
+    dlg = CloneTableDialog(parent.db_controller, table, parent)
+    if dlg.exec() == QDialog.DialogCode.Accepted:
+        if not dlg.target_path():
+            parent.load_tables()
+        parent.statusBar().showMessage(f"Cloned {table}", 3000)
+
+
 def delete_table(parent):
     table = parent.current_table()
     reply = QMessageBox.question(
@@ -107,13 +237,25 @@ def delete_table(parent):
 
 
 def properties_table(parent):
-    table = parent.current_table()
-    schema = parent.db_controller.get_schema(table)
-    QMessageBox.information(
-        parent,
-        "Table Properties",
-        f"Name: {table}\nColumns: {len(schema)}\nRows: {parent.model.rowCount()}"
-    )
+    if not (table := parent.current_table()):
+        return
+    dlg = TablePropertiesDialog(parent.db_controller, table, parent)
+    dlg.exec()
+
+
+def manage_indexes(parent):
+    if not (table := parent.current_table()):
+        return
+    dlg = IndexManagerDialog(parent.db_controller, table, parent)
+    dlg.exec()
+
+
+def edit_schema(parent):
+    if not (table := parent.current_table()):
+        return
+    dlg = SchemaEditorDialog(parent.db_controller, table, parent)
+    if dlg.exec():
+        parent.load_table(table)
 
 
 def edit_record(parent):
@@ -122,18 +264,203 @@ def edit_record(parent):
         parent.table.edit(index)
 
 
+def writable(parent):
+    """True if there is a table open that can be edited; says why not in the status bar otherwise"""
+    if parent.model and parent.model.read_only:
+        parent.statusBar().showMessage(
+            f"{parent.model.table_name} is a WITHOUT ROWID table and is shown read-only", 5000)
+        return False
+    return bool(parent.model)
+
+
+def insert_rows(parent, count=1, duplicate=False):
+    model = parent.model
+    if not writable(parent):
+        return
+    source_rowids = None
+    if duplicate:
+        rows = sorted({row for row, _ in selected_cells(parent)})
+        if not rows:
+            return
+        source_rowids = [model.rowids[row] for row in rows]
+
+    try:
+        room = model.room_at_end()
+        inserted, rowids, rows = parent.db_controller.insert_rows(model.table_name, count, source_rowids,
+                                                                  limit=room or 0)
+        if room is None:
+            model.refresh()
+        else:
+            model.append_rows(rowids, rows)
+        parent.update_page_count()
+        if rowids:
+            parent.table.scrollToBottom()
+            parent.table.selectRow(model.rowCount() - 1)
+        if inserted > len(rowids):
+            parent.statusBar().showMessage(f"Inserted {inserted:,} rows", 3000)
+    except Exception as e:
+        parent.show_error(f"Insert failed: {str(e)}")
+
+
+def add_row(parent):
+    insert_rows(parent)
+
+
+def add_rows(parent):
+    if not writable(parent):
+        return
+    count, ok = QInputDialog.getInt(parent, "Add Rows", "Number of blank rows:", 10, 1, 1000000)
+    if ok:
+        insert_rows(parent, count)
+
+
+def duplicate_rows(parent):
+    insert_rows(parent, duplicate=True)
+
+
+def confirm_delete(parent, question, undoable):
+    if not undoable:
+        question += "\n\nThat is too many rows to keep for undo, so this can't be undone."
+    reply = QMessageBox.question(
+        parent, "Delete Rows", question,
+        QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+    )
+    return reply == QMessageBox.StandardButton.Yes
+
+
 def delete_record(parent):
-    if not (table := parent.current_table()):
+    """Delete every row that has a selected cell, or the current row"""
+    model = parent.model
+    if not writable(parent):
+        return
+    rows = {row for row, _ in selected_cells(parent)} or {parent.table.currentIndex().row()}
+    rowids = {model.rowids[row] for row in rows if 0 <= row < model.rowCount()}
+    if not rowids:
+        return
+    undoable = parent.db_controller.delete_undoable(len(rowids))
+    if not confirm_delete(parent, f"Delete {len(rowids):,} row(s)?", undoable):
         return
-    row = parent.table.currentIndex().row()
-    if row < 0: return
 
     try:
-        record_id = parent.model.data[row]['id']
-        parent.db_controller.delete_record(table, record_id)
-        parent.model.refresh()
+        parent.db_controller.delete_rows(model.table_name, rowids=rowids, undoable=undoable)
+        model.remove_rowids(rowids)
+        parent.update_page_count()
+    except Exception as e:
+        parent.show_error(f"Delete failed: {str(e)}")
+
+
+def delete_matching(parent):
+    model = parent.model
+    if not writable(parent):
+        return
+    if not model.where:
+        parent.statusBar().showMessage("Apply a filter first", 3000)
+        return
+    controller = parent.db_controller
+    try:
+        count = controller.cached_row_count(model.table_name, model.where, model.params)
+        if count is None:
+            count = controller.count_rows(model.table_name, controller.change_token(), model.where, model.params)
     except Exception as e:
         parent.show_error(f"Delete failed: {str(e)}")
+        return
+    undoable = controller.delete_undoable(count)
+    if not confirm_delete(parent, f"Delete all {count:,} rows matching the current filter?", undoable):
+        return
+
+    try:
+        deleted = controller.delete_rows(model.table_name, where=model.where, params=model.params,
+                                         undoable=undoable)
+        model.refresh()
+        parent.update_page_count()
+        parent.statusBar().showMessage(f"Deleted {deleted:,} rows", 3000)
+    except Exception as e:
+        parent.show_error(f"Delete failed: {str(e)}")
+
+
+def find_text(parent):
+    if parent.model:
+        FindReplaceDialog(parent, replace=False).exec()
+
+
+def replace_text(parent):
+    if writable(parent):
+        FindReplaceDialog(parent, replace=True).exec()
+
+
+def selected_cells(parent):
+    return sorted((index.row(), index.column()) for index in parent.table.selectionModel().selectedIndexes())
+
+
+def copy_cells(parent):
+    if not parent.model or not (cells := selected_cells(parent)):
+        return
+    rows = sorted({row for row, _ in cells})
+    cols = sorted({col for _, col in cells})
+    parent.model.ensure_columns(cols[0], cols[-1])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter='\t', lineterminator='\n')
+    for row in rows:
+        values = parent.model.rows[row]
+        writer.writerow(['' if values[parent.model.columns[col]] is None else values[parent.model.columns[col]]
+                         for col in cols])
+    QApplication.clipboard().setText(buffer.getvalue())
+
+
+def paste_cells(parent):
+    """Paste a TSV block (e.g. from a spreadsheet) at the current cell in one transaction.
+
+    A single copied value is written into every selected cell instead. Cells
+    that fall past the end of the page or the last column are not written;
+    the status bar says how many.
+    """
+    model = parent.model
+    text = QApplication.clipboard().text()
+    if not writable(parent) or not text:
+        return
+    block = list(csv.reader(io.StringIO(text.rstrip('\r\n')), delimiter='\t'))
+
+    cut = 0
+    if len(block) == 1 and len(block[0]) == 1:
+        updates = [(row, col, block[0][0]) for row, col in selected_cells(parent)]
+    else:
+        anchor = parent.table.currentIndex()
+        if not anchor.isValid():
+            return
+        updates = [
+            (anchor.row() + r, anchor.column() + c, value)
+            for r, values in enumerate(block)
+            for c, value in enumerate(values)
+            if anchor.row() + r < model.rowCount() and anchor.column() + c < model.columnCount()
+        ]
+        cut = sum(len(values) for values in block) - len(updates)
+    if updates and not model.set_cells(updates):
+        parent.show_error("Paste failed")
+    elif cut:
+        parent.statusBar().showMessage(
+            f"Pasted {len(updates):,} cells; {cut:,} past the end of the page or the last column "
+            f"were not written", 8000)
+
+
+def fill_down(parent):
+    model = parent.model
+    if not writable(parent) or not (cells := selected_cells(parent)):
+        return
+    top = {}
+    for row, col in cells:
+        top.setdefault(col, row)
+    model.ensure_columns(min(top), max(top))
+    updates = [(row, col, model.rows[top[col]][model.columns[col]]) for row, col in cells if row != top[col]]
+    if updates and not model.set_cells(updates):
+        parent.show_error("Fill down failed")
+
+
+def set_selected_cells(parent):
+    if not writable(parent) or not (cells := selected_cells(parent)):
+        return
+    value, ok = QInputDialog.getText(parent, "Set Cells", f"Value for {len(cells)} selected cells:")
+    if ok and not parent.model.set_cells([(row, col, value) for row, col in cells]):
+        parent.show_error("Update failed")
 
 
 def undo_record(parent):
@@ -224,49 +551,202 @@ def rename_column(parent):
             parent.show_error(f"Rename failed: {str(e)}")
 
 
+def _file_filter(name, extensions):
+    patterns = [f"*{ext}{codec}" for ext in extensions for codec in ("", ".gz", ".xz", ".bz2")]
+    return f"{name} ({' '.join(patterns)})"
+
+
+TRANSFER_FILTER = ";;".join([
+    _file_filter("CSV", [".csv"]),
+    _file_filter("JSON", [".json"]),
+    _file_filter("JSON Lines", [".jsonl", ".ndjson"]),
+])
+
+
+def transfer_summary(stats):
+    return (f"{stats['rows']:,} rows in {stats['seconds']:.1f}s "
+            f"({stats['rows_per_sec']:,.0f} rows/s, {stats['bytes_per_sec'] / 1048576:.1f} MB/s)")
+
+
+def run_transfer(parent, label, fn, *args, unit="rows", on_done=None, span_name=None):
+    """Run an import/export on a worker with a cancellable progress dialog
+
+    ``span_name`` times the transfer itself, on the worker thread, for the profiler.
+    """
+    progress = QProgressDialog(label, "Cancel", 0, 0, parent)
+    progress.setWindowModality(Qt.WindowModality.WindowModal)
+    progress.setMinimumDuration(500)
+
+    def run(*fn_args, **kwargs):
+        with span(span_name):
+            return fn(*fn_args, **kwargs)
+
+    worker = Worker(run if span_name else fn, *args)
+    timer = QElapsedTimer()
+    timer.start()
+
+    def on_progress(done, total):
+        progress.setMaximum(total)
+        progress.setValue(done)
+        seconds = max(timer.elapsed() / 1000, 0.001)
+        progress.setLabelText(f"{label}  {done:,} {unit} ({done / seconds:,.0f} {unit}/s)")
+
+    def on_result(stats):
+        progress.close()
+        if on_done:
+            on_done(stats)
+
+    def on_error(message):
+        progress.close()
+        parent.show_error(f"{label.rstrip('.')} failed: {message}")
+
+    worker.signals.progress.connect(on_progress)
+    worker.signals.result.connect(on_result)
+    worker.signals.error.connect(on_error)
+    progress.canceled.connect(worker.cancel)
+    parent.transfer_worker = worker.start()
+
+
+# Slots connected with partial() must not be wrapped: PyQt would pass triggered's ``checked``
+# to the wrapper's *args, so they have run_transfer time the worker with span() instead
 def export_data(parent):
     if not (table := parent.current_table()):
         return
-    path, _ = QFileDialog.getSaveFileName(
-        parent, "Export Data", "", "CSV (*.csv);;JSON (*.json)"
-    )
+    path, _ = QFileDialog.getSaveFileName(parent, "Export Data", "", TRANSFER_FILTER)
     if path:
-        try:
-            columns, data = parent.db_controller.get_table_data(table)
-            if path.endswith('.csv'):
-                with open(path, 'w', newline='') as f:
-                    writer = csv.DictWriter(f, fieldnames=columns)
-                    writer.writeheader()
-                    writer.writerows(data)
-            elif path.endswith('.json'):
-                with open(path, 'w') as f:
-                    json.dump(data, f, indent=2)
-            parent.statusBar().showMessage(f"Exported to {path}", 3000)
-        except Exception as e:
-            parent.show_error(f"Export failed: {str(e)}")
+        def done(stats):
+            if stats is not None:
+                parent.statusBar().showMessage(f"Exported {transfer_summary(stats)} to {path}", 5000)
+
+        # The export reads through its own connection, so it must see our edits
+        parent.db_controller.commit()
+        run_transfer(parent, "Exporting...", parent.db_controller.export_table, table, path,
+                     on_done=done, span_name="export_data")
 
 
 def import_data(parent):
+    if not (table := parent.current_table()):
+        return
+    path, _ = QFileDialog.getOpenFileName(parent, "Import Data", "", TRANSFER_FILTER)
+    if path:
+        def done(stats):
+            if parent.model:
+                parent.model.refresh()
+            if stats is not None:
+                parent.statusBar().showMessage(f"Imported {transfer_summary(stats)} from {path}", 5000)
+
+        parent.db_controller.commit()
+        run_transfer(parent, "Importing...", parent.db_controller.import_file, table, path,
+                     unit="KiB", on_done=done, span_name="import_data")
+
+
+CSV_FILTER = _file_filter("CSV", [".csv"])
+
+
+def import_new_table(parent):
+    if not parent.db_controller:
+        return
+    path, _ = QFileDialog.getOpenFileName(parent, "Import CSV as New Table", "", CSV_FILTER)
+    if not path:
+        return
+    default_name = os.path.basename(path).split('.')[0]
+    name, ok = QInputDialog.getText(parent, "Import CSV as New Table", "Table name:", text=default_name)
+    if not ok or not name:
+        return
+    if name in parent.db_controller.get_tables():
+        parent.show_error(f"Table '{name}' already exists")
+        return
+
+    def done(stats):
+        if stats is None:
+            return
+        parent.reload_table_list()
+        parent.table_combo.setCurrentText(name)
+        parent.load_table(name)
+        types = ", ".join(f"{column} {kind}" for column, kind in stats['columns'])
+        parent.statusBar().showMessage(f"Imported {transfer_summary(stats)} into {name} ({types})", 10000)
+
+    parent.db_controller.commit()
+    run_transfer(parent, "Importing...", parent.db_controller.import_new_table, name, path,
+                 unit="KiB", on_done=done, span_name="import_new_table")
+
+
+SQL_FILTER = "SQL Scripts (*.sql *.sql.gz *.sql.xz *.sql.bz2);;All Files (*)"
+
+
+def dump_database(parent):
+    if not parent.db_controller:
+        return
+    table = parent.current_table()
+    whole = "Whole database"
+    scopes = [whole] + ([f"Table '{table}'"] if table else [])
+    scope, ok = QInputDialog.getItem(parent, "Dump to SQL", "Dump:", scopes, 0, False)
+    if not ok:
+        return
+    settings = QSettings("YourCompany", "DatabaseEditor")
+    batch_rows, ok = QInputDialog.getInt(parent, "Dump to SQL", "Rows per INSERT statement:",
+                                         settings.value("dump_batch_rows", 500, type=int), 1, 100000)
+    if not ok:
+        return
+    settings.setValue("dump_batch_rows", batch_rows)
+    path, _ = QFileDialog.getSaveFileName(parent, "Dump to SQL", "dump.sql", SQL_FILTER)
+    if path:
+        def done(stats):
+            if stats is not None:
+                parent.statusBar().showMessage(f"Dumped {transfer_summary(stats)} to {path}", 5000)
+
+        parent.db_controller.commit()
+        run_transfer(parent, "Dumping...", parent.db_controller.dump_sql, path,
+                     None if scope == whole else [table], batch_rows,
+                     on_done=done, span_name="dump_database")
+
+
+def restore_database(parent):
+    if not parent.db_controller:
+        return
+    path, _ = QFileDialog.getOpenFileName(parent, "Restore from SQL", "", SQL_FILTER)
+    if not path:
+        return
+    current, new = "Current database", "New database file..."
+    target, ok = QInputDialog.getItem(parent, "Restore from SQL", "Run the script against:", [current, new], 0, False)
+    if not ok:
+        return
+    target_path = None
+    if target == new:
+        target_path, _ = QFileDialog.getSaveFileName(parent, "New Database", "",
+                                                     "SQLite Databases (*.db *.sqlite);;All Files (*)")
+        if not target_path:
+            return
+        if os.path.realpath(target_path) == os.path.realpath(parent.db_controller.config['path']):
+            parent.show_error("Choose a file other than the open database, or restore into the current database")
+            return
+        # The save dialog has already confirmed overwriting it; stale WAL/journal files would be replayed
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(target_path + suffix):
+                os.remove(target_path + suffix)
+
+    def done(stats):
+        if target_path is None:
+            parent.db_controller.schema_changed()
+            parent.reload_table_list()
+        if stats is not None:
+            parent.statusBar().showMessage(
+                f"Restored {stats['rows']:,} statements in {stats['seconds']:.1f}s "
+                f"({stats['bytes_per_sec'] / 1048576:.1f} MB/s) from {path}", 5000)
+
+    parent.db_controller.commit()
+    run_transfer(parent, "Restoring...", parent.db_controller.restore_sql, path, target_path,
+                 unit="KiB", on_done=done, span_name="restore_database")
+
+
+def compare_database(parent):
+    if not (table := parent.current_table()):
+        return
     path, _ = QFileDialog.getOpenFileName(
-        parent, "Import Data", "", "CSV (*.csv);;JSON (*.json)"
+        parent, "Compare With Database", "", "SQLite Databases (*.db *.sqlite);;All Files (*)"
     )
     if path:
-        try:
-            table = parent.current_table()
-            columns = parent.model.columns
-
-            if path.endswith('.csv'):
-                with open(path, 'r') as f:
-                    reader = csv.DictReader(f)
-                    data = [row for row in reader]
-            elif path.endswith('.json'):
-                with open(path, 'r') as f:
-                    data = json.load(f)
-
-            parent.db_controller.batch_insert(table, data)
-            parent.model.refresh()
-        except Exception as e:
-            parent.show_error(f"Import failed: {str(e)}")
+        CompareDialog(parent.db_controller, table, path, parent).exec()
 
 
 def commit(parent):
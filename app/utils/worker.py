@@ -0,0 +1,50 @@
+import logging
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerSignals(QObject):
+    progress = pyqtSignal(int, int)  # done, total (0 when unknown)
+    result = pyqtSignal(object)
+    error = pyqtSignal(str)
+    finished = pyqtSignal()
+
+
+class Worker(QRunnable):
+    """Run ``fn`` on the global thread pool.
+
+    ``fn`` is called with two extra keyword arguments, ``progress_callback``
+    and ``is_cancelled``, so long jobs can report progress and stop early.
+    """
+
+    def __init__(self, fn, *args, **kwargs):
+        super().__init__()
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = WorkerSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def start(self):
+        QThreadPool.globalInstance().start(self)
+        return self
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, progress_callback=self.signals.progress.emit,
+                             is_cancelled=self.is_cancelled, **self.kwargs)
+        except Exception as e:
+            logger.error(f"Background task failed: {str(e)}")
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.result.emit(result)
+        finally:
+            self.signals.finished.emit()
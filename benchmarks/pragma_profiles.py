@@ -0,0 +1,83 @@
+"""Compare connection PRAGMA profiles on a scratch database.
+
+Run from the repository root:
+
+    python -m benchmarks.pragma_profiles [rows]
+"""
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from app.utils.database.tuning import PROFILES, apply_profile
+
+COLUMNS = 8
+
+
+def _connect(path, profile):
+    conn = sqlite3.connect(path)
+    apply_profile(conn, profile, path)
+    return conn
+
+
+def bench_bulk_insert(path, profile, rows):
+    conn = _connect(path, profile)
+    cols = ', '.join(f'c{i}' for i in range(COLUMNS))
+    conn.execute(f'CREATE TABLE t (id INTEGER PRIMARY KEY, {cols})')
+    conn.execute('CREATE INDEX t_c0 ON t (c0)')
+    placeholders = ', '.join('?' for _ in range(COLUMNS))
+    data = ((f'k{i % 997}', i, i * 0.5, 'x' * 20, i % 7, None, f'v{i}', i) for i in range(rows))
+
+    start = time.perf_counter()
+    # Chunked commits, as the import pipeline does
+    batch = []
+    for row in data:
+        batch.append(row)
+        if len(batch) == 10000:
+            with conn:
+                conn.executemany(f'INSERT INTO t ({cols}) VALUES ({placeholders})', batch)
+            batch.clear()
+    with conn:
+        conn.executemany(f'INSERT INTO t ({cols}) VALUES ({placeholders})', batch)
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def bench_small_commits(path, profile, commits=500):
+    conn = _connect(path, profile)
+    start = time.perf_counter()
+    for i in range(commits):
+        with conn:
+            conn.execute('UPDATE t SET c1 = c1 + 1 WHERE id = ?', (i + 1,))
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def bench_aggregate(path, profile, repeat=3):
+    conn = _connect(path, profile)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute('SELECT c0, COUNT(*), AVG(c2) FROM t GROUP BY c0 ORDER BY 2 DESC').fetchall()
+        conn.execute('SELECT * FROM t ORDER BY c6 LIMIT 100').fetchall()  # sorts via temp b-tree
+    elapsed = time.perf_counter() - start
+    conn.close()
+    return elapsed
+
+
+def main(rows=300000):
+    benches = (('bulk insert', bench_bulk_insert, (rows,)),
+               ('500 small commits', bench_small_commits, ()),
+               ('aggregate + sort', bench_aggregate, ()))
+    print(f"{'profile':<12}" + ''.join(f'{name:>20}' for name, _, _ in benches))
+    for profile in PROFILES:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bench.db')
+            results = [bench(path, profile, *args) for _, bench, args in benches]
+        print(f'{profile:<12}' + ''.join(f'{seconds:>19.3f}s' for seconds in results))
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:2]))